@@ -0,0 +1,217 @@
+"""
+Benchmark suite for analytics, history, rendering and cache purging.
+
+Usage (from the repo root):
+    PYTHONPATH=src python benchmarks/run.py                 # compare against baselines.json
+    PYTHONPATH=src python benchmarks/run.py --quick         # smallest sizes only
+    PYTHONPATH=src python benchmarks/run.py --update-baseline
+
+Each case reports the best of ``--repeat`` runs. A case regresses when it is slower
+than its stored baseline by more than ``--tolerance`` (default 25%) and by more than
+``--min-delta`` seconds, so timer noise on millisecond cases is ignored; the script then
+exits with status 1. Baselines are machine-specific: refresh them with
+``--update-baseline`` on the machine you compare on.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from community_health_bot.core.models import HistoryEntry
+from community_health_bot.services.analytics import collect_weekly_report
+from community_health_bot.services.cache import purge_older_than
+from community_health_bot.services.history import (
+    append_history,
+    read_history,
+    recent_history_for_subreddit,
+)
+from community_health_bot.services.mock_data import generate_mock_report
+from community_health_bot.services.reporting import build_markdown
+from community_health_bot.services.synthetic import SyntheticProfile, SyntheticReddit
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+# (setup, timed body); setup runs before every repeat and is not timed.
+Case = Tuple[Callable[[], object], Callable[[object], object]]
+
+
+class _ListingReddit:
+    """Pre-generated synthetic listings, so only the analytics pass is timed."""
+
+    def __init__(self, posts: list) -> None:
+        self.posts = posts
+
+    def subreddit(self, name: str) -> "_ListingReddit":
+        return self
+
+    def new(self, limit: Optional[int] = 100, **_: object):
+        return islice(iter(self.posts), limit)
+
+    def top(self, time_filter: str = "week", limit: Optional[int] = 100, **_: object):
+        return iter(sorted(self.posts, key=lambda p: p.score, reverse=True)[:limit])
+
+
+def analytics_case(posts: int) -> Case:
+    profile = SyntheticProfile(posts_per_day=posts / 10.0, horizon_days=10.0, max_posts=posts)
+    listing = _ListingReddit(list(SyntheticReddit(seed=1, profile=profile).subreddit("r/bench").iter_posts()))
+    # recent_listing_limit() scans 5x the larger limit, so this scans every generated post.
+    unanswered_limit = max(posts // 5, 10)
+
+    def body(_: object) -> object:
+        return collect_weekly_report(listing, "r/bench", top_posts_limit=10, unanswered_limit=unanswered_limit)
+
+    return (lambda: None), body
+
+
+def history_case(rows: int, workdir: Path) -> Case:
+    path = workdir / f"history_{rows}.csv"
+    if not path.exists():
+        subreddits = [f"r/sub{i}" for i in range(50)]
+        start = date(2020, 1, 1)
+        batch: List[HistoryEntry] = []
+        for i in range(rows):
+            batch.append(
+                HistoryEntry(
+                    date=(start + timedelta(days=i // len(subreddits))).isoformat(),
+                    subreddit=subreddits[i % len(subreddits)],
+                    total_posts=100 + i % 37,
+                    unanswered=i % 11,
+                    unanswered_rate=(i % 11) / 100.0,
+                    median_ttf_minutes=None if i % 13 == 0 else 10.0 + i % 7,
+                )
+            )
+            if len(batch) >= 100_000:
+                append_history(path, batch)
+                batch = []
+        append_history(path, batch)
+
+    def body(_: object) -> object:
+        entries = read_history(path)
+        return recent_history_for_subreddit(entries, "r/sub7")
+
+    return (lambda: None), body
+
+
+def render_case(subreddits: int) -> Case:
+    names = [f"r/sub{i}" for i in range(subreddits)]
+    reports = {name: generate_mock_report(name, top_posts_limit=10, unanswered_limit=10) for name in names}
+
+    def body(_: object) -> object:
+        return build_markdown(names, reports)
+
+    return (lambda: None), body
+
+
+def purge_case(files: int, workdir: Path) -> Case:
+    directory = workdir / f"purge_{files}"
+
+    def setup() -> object:
+        directory.mkdir(exist_ok=True)
+        old = time.time() - 3 * 24 * 3600
+        for i in range(files):
+            path = directory / f"summary_{i}.md"
+            path.write_text("x")
+            if i % 2 == 0:
+                os.utime(path, (old, old))
+        return None
+
+    def body(_: object) -> object:
+        return purge_older_than(directory, days=2)
+
+    return setup, body
+
+
+def build_cases(workdir: Path, quick: bool, full: bool) -> Dict[str, Callable[[], Case]]:
+    analytics_sizes = [1_000] if quick else [1_000, 10_000, 100_000]
+    history_sizes = [10_000] if quick else [10_000, 100_000, 1_000_000] + ([5_000_000] if full else [])
+    render_sizes = [10] if quick else [10, 100, 1_000]
+    purge_sizes = [1_000] if quick else [1_000, 10_000]
+
+    cases: Dict[str, Callable[[], Case]] = {}
+    for n in analytics_sizes:
+        cases[f"analytics.collect_weekly_report[{n}]"] = lambda n=n: analytics_case(n)
+    for n in history_sizes:
+        cases[f"history.read_recent[{n}]"] = lambda n=n: history_case(n, workdir)
+    for n in render_sizes:
+        cases[f"reporting.build_markdown[{n}]"] = lambda n=n: render_case(n)
+    for n in purge_sizes:
+        cases[f"cache.purge_older_than[{n}]"] = lambda n=n: purge_case(n, workdir)
+    return cases
+
+
+def run_case(case: Case, repeat: int) -> float:
+    setup, body = case
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        body(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(
+    results: Dict[str, float], baselines: Dict[str, float], tolerance: float, min_delta: float = 0.0
+) -> List[str]:
+    regressions = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline and seconds > baseline * (1 + tolerance) and seconds - baseline > min_delta:
+            regressions.append(f"{name}: {seconds:.4f}s vs baseline {baseline:.4f}s (+{seconds / baseline - 1:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Community health bot benchmarks.")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest size of each case")
+    parser.add_argument("--full", action="store_true", help="Include the 5M-row history case")
+    parser.add_argument("--only", help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.01, help="Ignore slowdowns smaller than this (seconds)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--output", type=Path, help="Also write results as JSON to this path")
+    args = parser.parse_args()
+
+    stored = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    baselines: Dict[str, float] = stored.get("results", {})
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="chb-bench-") as tmp:
+        for name, make_case in build_cases(Path(tmp), args.quick, args.full).items():
+            if args.only and args.only not in name:
+                continue
+            seconds = run_case(make_case(), args.repeat)
+            results[name] = seconds
+            baseline = baselines.get(name)
+            versus = f"  (baseline {baseline:.4f}s, {seconds / baseline:.2f}x)" if baseline else ""
+            print(f"{name:<45} {seconds:.4f}s{versus}", flush=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    if args.update_baseline:
+        merged = {**baselines, **results}
+        payload = {"python": platform.python_version(), "machine": platform.machine(), "results": merged}
+        BASELINE_PATH.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        print(f"Updated {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance, args.min_delta)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
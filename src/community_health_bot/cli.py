@@ -1,4 +1,6 @@
 import argparse
+import dataclasses
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
@@ -7,14 +9,31 @@ from .config.settings import SubredditConfig, load_settings, validate_user_agent
 from .core.models import HistoryEntry, SubredditReport
 from .reddit.client import create_reddit_client
 from .services.analytics import collect_weekly_report
+from .services.archive import ARCHIVE_DIRNAME, DEFAULT_RETENTION_DAYS, SummaryArchive
 from .services.cache import purge_older_than
+from .services.export import export_reports
+from .services.heatmap import HEATMAP_FILENAME, HeatmapStore
 from .services.history import append_history, read_history, recent_history_for_subreddit
+from .services.instrumentation import RunInstrumentation
 from .services.logging import log_json, log_rate_limit, setup_logger
 from .services.rate_limit import maybe_backoff_if_low
+from .services.planner import format_plan, plan_run
+from .services.profiling import RunProfiler
 from .services.publisher import submit_summary
-from .services.reporting import build_markdown, write_output
-from .services.webhook import send_webhook
+from .services.reporting import iter_markdown, stream_output
+from .services.server import serve
+from .services.webhook import WebhookDispatcher
 from .services.mock_data import generate_mock_report
+from .services.synthetic import SYNTHETIC_OUTPUT_DIRNAME, SyntheticReddit
+from .services.titles import TITLE_MEMO_FILENAME, TitleMemoStore
+from .services.trends import TREND_STATE_FILENAME, TrendEngine
+from .services.tracking import (
+    TRACKED_POSTS_FILENAME,
+    TrackedPostStore,
+    TrackedRefresher,
+    settle_heatmap_posts,
+)
+from .services.velocity import SCORE_SNAPSHOTS_FILENAME, VelocityStore
 
 
 from . import __version__
@@ -31,8 +50,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--subreddits",
         nargs="+",
-        required=True,
-        help="List of subreddits to summarize (e.g., r/example1 r/example2)",
+        help="List of subreddits to summarize (e.g., r/example1 r/example2); not needed with --serve",
     )
     parser.add_argument(
         "--mode",
@@ -60,84 +78,233 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Generate mock data instead of calling Reddit (good for testing output)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--synthetic-data",
+        action="store_true",
+        help="Run the real analytics against seeded synthetic Reddit data (no Reddit calls; report mode only)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for --synthetic-data",
+    )
+    parser.add_argument(
+        "--export",
+        nargs="+",
+        choices=["ndjson", "columnar"],
+        default=[],
+        help="Also export full report data to OUTPUT_DIR as newline-delimited JSON and/or a columnar file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile collection, rendering and history I/O; writes profile_*.prof and a hot-function summary to OUTPUT_DIR",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Estimate Reddit requests and run time for these subreddits without calling Reddit",
+    )
+    parser.add_argument(
+        "--schedule-minutes",
+        type=int,
+        default=60,
+        help="Minutes between scheduled runs, used by --plan to check the request budget",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the latest reports, summary and history from OUTPUT_DIR over read-only HTTP (no Reddit calls)",
+    )
+    parser.add_argument(
+        "--archive-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS,
+        help="Days to keep compressed summary versions in OUTPUT_DIR/archive (default 2, per the 48h data policy)",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address for --serve")
+    parser.add_argument("--port", type=int, default=8080, help="Port for --serve")
+    args = parser.parse_args()
+    if not args.serve and not args.subreddits:
+        parser.error("--subreddits is required unless --serve is given")
+    return args
 
 
 def run() -> None:
     args = parse_args()
     config_path = Path(args.config).expanduser() if args.config else None
     env_path = Path(args.env_file).expanduser() if args.env_file else None
-    settings = load_settings(env_file=env_path, config_file=config_path, allow_missing=args.mock_data)
-    if not args.mock_data:
+    settings = load_settings(
+        env_file=env_path,
+        config_file=config_path,
+        allow_missing=args.mock_data or args.synthetic_data or args.plan or args.serve,
+    )
+    logger = setup_logger(log_file=settings.log_file)
+    if args.serve:
+        serve(settings.output_dir, host=args.host, port=args.port, logger=logger)
+        return
+    if args.plan:
+        plan = plan_run(
+            args.subreddits,
+            settings.subreddit_configs,
+            read_history(settings.output_dir / "metrics_history.csv"),
+            default_top_limit=args.limit,
+            schedule_minutes=args.schedule_minutes,
+            tracked_counts=TrackedPostStore.load(settings.output_dir / TRACKED_POSTS_FILENAME).counts_by_subreddit(),
+            pending_heatmap_counts=HeatmapStore.load(settings.output_dir / HEATMAP_FILENAME).pending_counts(),
+        )
+        print(format_plan(plan))
+        log_json(
+            logger,
+            "run_plan",
+            total_requests=plan.total_requests,
+            estimated_seconds=round(plan.estimated_seconds, 1),
+            warnings=plan.warnings,
+        )
+        return
+    if not (args.mock_data or args.synthetic_data):
         validate_user_agent(settings.user_agent)
-    logger = setup_logger()
+    if args.synthetic_data:
+        settings = dataclasses.replace(settings, output_dir=settings.output_dir / SYNTHETIC_OUTPUT_DIRNAME)
     run_date = datetime.now().date().isoformat()
+    profiler = RunProfiler(settings.output_dir, enabled=args.profile)
     history_path = settings.output_dir / "metrics_history.csv"
-    existing_history = read_history(history_path)
+    with profiler.profile("history"):
+        existing_history = read_history(history_path)
     new_history_entries: List[HistoryEntry] = []
+    trend_engine = TrendEngine.load(settings.output_dir / TREND_STATE_FILENAME)
+    # One-off replay when there is no saved state yet; later runs only fold in their own rows.
+    trend_engine.bootstrap(existing_history)
 
     if args.mode == "post" and not args.post_to:
         raise SystemExit("--post-to is required in post mode")
     if args.mock_data and args.mode == "post":
         raise SystemExit("--mock-data can only be used in report mode")
+    if args.synthetic_data and args.mode == "post":
+        raise SystemExit("--synthetic-data can only be used in report mode")
 
-    reddit = None if args.mock_data else create_reddit_client(settings)
+    instrumentation = RunInstrumentation()
+    if args.mock_data:
+        reddit = None
+    elif args.synthetic_data:
+        reddit = SyntheticReddit(seed=args.seed, subreddits=args.subreddits)
+    else:
+        reddit = create_reddit_client(settings)
+    if reddit:
+        instrumentation.attach(reddit)
+    # Start early so outbox replays overlap with collection.
+    dispatcher = WebhookDispatcher(
+        settings.webhook_urls, outbox_path=settings.output_dir / "webhook_outbox.jsonl", logger=logger
+    ).start()
     reports: Dict[str, SubredditReport] = {}
+    tracked_store = TrackedPostStore.load(settings.output_dir / TRACKED_POSTS_FILENAME) if reddit else None
+    velocity_store = VelocityStore.load(settings.output_dir / SCORE_SNAPSHOTS_FILENAME) if reddit else None
+    title_memo = TitleMemoStore.load(settings.output_dir / TITLE_MEMO_FILENAME) if reddit else None
+    heatmaps = HeatmapStore.load(settings.output_dir / HEATMAP_FILENAME) if reddit else None
+    # Tracked posts that came back deleted or removed; archived summaries citing them are dropped.
+    deleted_permalinks: List[str] = []
 
     for name in args.subreddits:
         sub_cfg: SubredditConfig = settings.subreddit_configs.get(
             name, SubredditConfig(name=name, top_posts_limit=args.limit)
         )
-        if args.mock_data:
-            report = generate_mock_report(
-                name,
-                top_posts_limit=sub_cfg.top_posts_limit,
-                unanswered_limit=sub_cfg.unanswered_limit,
-                include_sections=sub_cfg.include_sections,
-            )
-        else:
-            report = collect_weekly_report(
-                reddit,
-                name,
-                top_posts_limit=sub_cfg.top_posts_limit,
-                unanswered_limit=sub_cfg.unanswered_limit,
-                include_sections=sub_cfg.include_sections,
-            )
+        with profiler.profile("collect"):
+            if args.mock_data:
+                report = generate_mock_report(
+                    name,
+                    top_posts_limit=sub_cfg.top_posts_limit,
+                    unanswered_limit=sub_cfg.unanswered_limit,
+                    include_sections=sub_cfg.include_sections,
+                )
+            else:
+                with instrumentation.stage(name, "refresh"):
+                    settle_heatmap_posts(reddit, heatmaps.for_subreddit(name))
+                # Looks up only the tracked posts the /new scan does not return.
+                refresher = TrackedRefresher(reddit, tracked_store.for_subreddit(name))
+                report = collect_weekly_report(
+                    reddit,
+                    name,
+                    top_posts_limit=sub_cfg.top_posts_limit,
+                    unanswered_limit=sub_cfg.unanswered_limit,
+                    include_sections=sub_cfg.include_sections,
+                    instrumentation=instrumentation,
+                    tracked_posts=refresher.records(),
+                    refresh_tracked=refresher,
+                    velocity=velocity_store,
+                    classifier=title_memo.classifier_for(name, sub_cfg.question_keywords),
+                    heatmap=heatmaps.for_subreddit(name),
+                )
+                tracked_store.replace_subreddit(name, report)
+                deleted_permalinks.extend(post.permalink for post in refresher.gone)
         report.history = recent_history_for_subreddit(existing_history, name)
         reports[name] = report
-        new_history_entries.append(
-            HistoryEntry(
-                date=run_date,
-                subreddit=name,
-                total_posts=report.metrics.total_posts,
-                unanswered=report.metrics.unanswered,
-                unanswered_rate=report.metrics.unanswered_rate,
-                median_ttf_minutes=report.metrics.median_time_to_first_comment_minutes,
-            )
+        entry = HistoryEntry(
+            date=run_date,
+            subreddit=name,
+            total_posts=report.metrics.total_posts,
+            unanswered=report.metrics.unanswered,
+            unanswered_rate=report.metrics.unanswered_rate,
+            median_ttf_minutes=report.metrics.median_time_to_first_comment_minutes,
         )
+        report.anomalies = trend_engine.update(entry)
+        new_history_entries.append(entry)
         if reddit:
-            maybe_backoff_if_low(reddit, logger)
+            instrumentation.record_sleep(name, maybe_backoff_if_low(reddit, logger))
 
-    append_history(history_path, new_history_entries)
+    with profiler.profile("history"):
+        append_history(history_path, new_history_entries)
+        trend_engine.save()
+    if tracked_store is not None:
+        tracked_store.prune()
+        tracked_store.save()
+    if velocity_store is not None:
+        velocity_store.prune()
+        velocity_store.save()
+    if title_memo is not None:
+        title_memo.save()
+    if heatmaps is not None:
+        heatmaps.save()
 
-    markdown = build_markdown(args.subreddits, reports)
-    print(markdown)
-    out_path = write_output(settings.output_dir, markdown)
+    with instrumentation.stage("", "render"), profiler.profile("render"):
+        archive = SummaryArchive(settings.output_dir / ARCHIVE_DIRNAME)
+        archive_writer = archive.writer()
+        out_path, excerpt = stream_output(
+            settings.output_dir, iter_markdown(args.subreddits, reports), echo=sys.stdout, archive=archive_writer
+        )
     print(f"\nSaved summary to {out_path}")
+    log_json(logger, "archived_summary", digest=archive_writer.entry.digest, size=archive_writer.size)
+    dispatcher.submit("Community Health Summary", excerpt)
     log_json(logger, "generated_summary", output=str(out_path), subreddits=args.subreddits)
+    if args.export:
+        exported = export_reports(settings.output_dir, args.subreddits, reports, formats=args.export)
+        log_json(logger, "exported_reports", outputs=[str(path) for path in exported])
     removed = purge_older_than(settings.output_dir, days=2)
     if removed:
         log_json(logger, "purged_old_summaries", removed=removed)
+    removed_versions = archive.purge(days=args.archive_days) + archive.drop_citing(deleted_permalinks)
+    if removed_versions:
+        log_json(logger, "purged_archived_summaries", removed=removed_versions)
 
     if args.mode == "post":
         title = f"Weekly community summary - {datetime.now().date()}"
-        permalink = submit_summary(reddit, args.post_to, title, markdown)
+        markdown = out_path.read_text(encoding="utf-8")
+        with instrumentation.stage("", "post"):
+            permalink = submit_summary(reddit, args.post_to, title, markdown)
         print(f"Posted summary to {permalink}")
         log_json(logger, "posted_summary", permalink=permalink, subreddit=args.post_to)
 
     if reddit:
         log_rate_limit(logger, reddit)
-    send_webhook(settings.webhook_url, "Community Health Summary", markdown[:1500])
+    with instrumentation.stage("", "webhook"):
+        dispatcher.close(timeout=30.0)
+    if dispatcher.delivered or dispatcher.failed:
+        log_json(logger, "webhook_deliveries", delivered=dispatcher.delivered, failed=dispatcher.failed)
+
+    log_json(logger, "run_summary", **instrumentation.summary())
+    instrumentation.write_prometheus(settings.output_dir)
+    if args.profile:
+        log_json(logger, "profile_written", outputs=[str(path) for path in profiler.write()])
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ import os
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Sequence
+from typing import Dict, List, Optional, Sequence
 
 import yaml
 from dotenv import load_dotenv
@@ -19,8 +19,11 @@ class SubredditConfig:
             "trends": True,
             "top_posts": True,
             "unanswered": True,
+            "heatmap": True,
         }
     )
+    # Extra words or phrases that mark a title as a question, e.g. ["help", "eli5"].
+    question_keywords: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -33,6 +36,10 @@ class Settings:
     output_dir: Path
     subreddit_configs: Dict[str, SubredditConfig]
     webhook_url: Optional[str] = None
+    webhook_urls: List[str] = field(default_factory=list)
+    log_file: Optional[Path] = None
+    # Override Reddit's API/OAuth host, e.g. to point at the local simulator.
+    reddit_api_url: Optional[str] = None
 
 
 def load_settings(
@@ -66,9 +73,19 @@ def load_settings(
         output_dir=output_dir,
         subreddit_configs=subreddit_configs,
         webhook_url=os.getenv("WEBHOOK_URL"),
+        webhook_urls=_parse_webhook_urls(os.getenv("WEBHOOK_URL")),
+        log_file=Path(os.environ["LOG_FILE"]).expanduser() if os.getenv("LOG_FILE") else None,
+        reddit_api_url=os.getenv("REDDIT_API_URL") or None,
     )
 
 
+def _parse_webhook_urls(value: Optional[str]) -> List[str]:
+    # WEBHOOK_URL may list several targets separated by commas or whitespace.
+    if not value:
+        return []
+    return [url for url in value.replace(",", " ").split() if url]
+
+
 def _load_subreddit_configs(config_file: Optional[Path]) -> Dict[str, SubredditConfig]:
     if not config_file:
         return {}
@@ -92,7 +109,9 @@ def _load_subreddit_configs(config_file: Optional[Path]) -> Dict[str, SubredditC
                 "trends": include_sections.get("trends", True),
                 "top_posts": include_sections.get("top_posts", True),
                 "unanswered": include_sections.get("unanswered", True),
+                "heatmap": include_sections.get("heatmap", True),
             },
+            question_keywords=[str(word) for word in entry.get("question_keywords") or []],
         )
     return configs
 
@@ -9,6 +9,8 @@ class PostSummary:
     score: int
     comments: int
     permalink: str
+    post_id: Optional[str] = None
+    created_utc: Optional[float] = None
 
 
 @dataclass
@@ -16,6 +18,8 @@ class UnansweredSummary:
     title: str
     permalink: str
     question_like: bool = False
+    post_id: Optional[str] = None
+    created_utc: Optional[float] = None
 
 
 @dataclass
@@ -36,6 +40,25 @@ class Trend:
     delta: float
 
 
+@dataclass
+class Anomaly:
+    metric: str
+    value: float
+    mean: float
+    stddev: float
+    zscore: float
+    ewma: float
+
+
+@dataclass
+class ResponseHeatmap:
+    # 7x24 cells indexed weekday * 24 + hour of posting (UTC, Monday first).
+    posts: List[int]
+    unanswered: List[int]
+    median_ttf_minutes: List[Optional[float]]
+    ttf_samples: List[int]
+
+
 @dataclass
 class SubredditReport:
     top_posts: List[PostSummary]
@@ -45,12 +68,15 @@ class SubredditReport:
     trends: List[Trend]
     aging_unanswered: List[UnansweredSummary] = field(default_factory=list)
     history: List["HistoryEntry"] = field(default_factory=list)
+    anomalies: List[Anomaly] = field(default_factory=list)
+    heatmap: Optional[ResponseHeatmap] = None
     include_sections: Dict[str, bool] = field(
         default_factory=lambda: {
             "stats": True,
             "trends": True,
             "top_posts": True,
             "unanswered": True,
+            "heatmap": True,
         }
     )
 
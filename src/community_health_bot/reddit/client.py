@@ -4,10 +4,16 @@ from ..config.settings import Settings
 
 
 def create_reddit_client(settings: Settings) -> praw.Reddit:
+    overrides = {}
+    if settings.reddit_api_url:
+        # Serve both OAuth API calls and the token endpoint from the same host.
+        base_url = settings.reddit_api_url.rstrip("/")
+        overrides = {"oauth_url": base_url, "reddit_url": base_url}
     return praw.Reddit(
         client_id=settings.client_id,
         client_secret=settings.client_secret,
         username=settings.username,
         password=settings.password,
         user_agent=settings.user_agent,
+        **overrides,
     )
@@ -1,11 +1,30 @@
+import heapq
+import itertools
 from collections import Counter
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from statistics import median
-from typing import List, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
 import praw
 
 from ..core.models import MetricsSnapshot, PostSummary, SubredditReport, Trend, UnansweredSummary
+from .heatmap import SubredditHeatmap
+from .instrumentation import NULL_INSTRUMENTATION, RunInstrumentation
+from .titles import DEFAULT_CLASSIFIER, TitleClassifier
+from .velocity import VelocityStore
+
+# Limit time-to-first-comment sampling to avoid excessive API calls (one request per sampled post).
+TTF_SAMPLE_CAP = 30
+# Records classified together by the title stage; one /new listing page.
+TITLE_BATCH_SIZE = 100
+# Minimum points per hour for a post under 48h old to count as rising.
+RISING_MIN_VELOCITY = 5.0
+
+
+def recent_listing_limit(top_posts_limit: int, unanswered_limit: int) -> int:
+    """Number of /new posts scanned for metrics and unanswered detection."""
+    return max(max(top_posts_limit, unanswered_limit) * 5, 50)
 
 
 def _detect_post_type(post: praw.models.Submission) -> str:
@@ -37,10 +56,256 @@ def _time_to_first_comment_minutes(post: praw.models.Submission) -> Optional[flo
     return max(delta_seconds, 0) / 60.0
 
 
-def _looks_like_question(title: str) -> bool:
-    lowered = title.lower()
-    interrogatives = ("who", "what", "when", "where", "why", "how", "does", "is", "are", "can", "should")
-    return "?" in title or lowered.startswith(interrogatives)
+def _top_time_filter(window_days: int) -> str:
+    if window_days <= 1:
+        return "day"
+    if window_days <= 7:
+        return "week"
+    if window_days <= 30:
+        return "month"
+    return "year"
+
+
+class PostRecord:
+    """
+    The fields the analytics pass needs from one submission.
+
+    A plain slotted class rather than a dataclass: one is built per scanned post.
+    """
+
+    __slots__ = (
+        "title",
+        "score",
+        "num_comments",
+        "created_utc",
+        "flair",
+        "post_type",
+        "permalink",
+        "id",
+        "question_like",
+        "submission",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        score: int,
+        num_comments: int,
+        created_utc: float,
+        flair: str,
+        post_type: str,
+        permalink: str,
+        id: Optional[str] = None,  # noqa: A002 - mirrors the Reddit attribute
+        question_like: Optional[bool] = None,
+        submission: object = None,
+    ) -> None:
+        self.title = title
+        self.score = score
+        self.num_comments = num_comments
+        self.created_utc = created_utc
+        self.flair = flair
+        self.post_type = post_type
+        self.permalink = permalink
+        self.id = id
+        # Set by the title stage for posts without comments.
+        self.question_like = question_like
+        # Kept only so time-to-first-comment can be sampled; dropped with the record.
+        self.submission = submission
+
+
+def iter_post_records(posts: Iterable[praw.models.Submission]) -> Iterator[PostRecord]:
+    for post in posts:
+        yield PostRecord(
+            post.title,
+            post.score,
+            post.num_comments,
+            post.created_utc,
+            post.link_flair_text or "None",
+            _detect_post_type(post),
+            f"https://reddit.com{post.permalink}",
+            getattr(post, "id", None),
+            None,
+            post,
+        )
+
+
+def _classified(records: Iterable[PostRecord], classifier: TitleClassifier) -> Iterator[PostRecord]:
+    """Title stage: classify unanswered posts a batch at a time, then pass records on in order."""
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, TITLE_BATCH_SIZE))
+        if not batch:
+            return
+        classifier.annotate(record for record in batch if record.num_comments == 0)
+        yield from batch
+
+
+class TopK:
+    """
+    The ``k`` largest items seen so far, in O(k) memory and O(log k) per push.
+
+    Ties keep the item pushed first, matching a stable descending sort.
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self._heap: List[Tuple[Any, int, Any]] = []
+        self._seq = itertools.count()
+
+    def push(self, key: Any, item: Any) -> None:
+        if self.k <= 0:
+            return
+        entry = (key, -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def would_keep(self, key: Any) -> bool:
+        """Whether an item with this key would enter the heap (lets callers skip building it)."""
+        return self.k > 0 and (len(self._heap) < self.k or key > self._heap[0][0])
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def items(self) -> List[Any]:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+@dataclass
+class WindowStats:
+    """Constant-memory aggregates for the current and previous window."""
+
+    ttf_cap: int = TTF_SAMPLE_CAP
+    total_posts: int = 0
+    unanswered: int = 0
+    prev_total_posts: int = 0
+    prev_unanswered: int = 0
+    post_type_mix: Counter = field(default_factory=Counter)
+    flair_distribution: Counter = field(default_factory=Counter)
+    ttf_samples: List[float] = field(default_factory=list)
+    ttf_checked: int = 0
+
+    def add_current(self, record: PostRecord) -> None:
+        self.total_posts += 1
+        self.flair_distribution[record.flair] += 1
+        self.post_type_mix[record.post_type] += 1
+
+    def add_previous(self, record: PostRecord) -> None:
+        self.prev_total_posts += 1
+        if record.num_comments == 0:
+            self.prev_unanswered += 1
+
+    def wants_ttf_sample(self) -> bool:
+        return self.ttf_checked < self.ttf_cap
+
+    def add_ttf(self, minutes: Optional[float]) -> None:
+        self.ttf_checked += 1
+        if minutes is not None:
+            self.ttf_samples.append(minutes)
+
+    @property
+    def unanswered_rate(self) -> float:
+        return (self.unanswered / self.total_posts) if self.total_posts else 0.0
+
+    def metrics(self) -> MetricsSnapshot:
+        return MetricsSnapshot(
+            total_posts=self.total_posts,
+            unanswered=self.unanswered,
+            unanswered_rate=self.unanswered_rate,
+            median_time_to_first_comment_minutes=median(self.ttf_samples) if self.ttf_samples else None,
+            post_type_mix=dict(self.post_type_mix),
+            flair_distribution=dict(self.flair_distribution),
+        )
+
+    def trends(self) -> List[Trend]:
+        if not self.prev_total_posts:
+            return []
+        prev_unanswered_rate = self.prev_unanswered / self.prev_total_posts
+        return [
+            Trend(
+                metric="posts_week_over_week",
+                current=float(self.total_posts),
+                previous=float(self.prev_total_posts),
+                delta=float(self.total_posts - self.prev_total_posts),
+            ),
+            Trend(
+                metric="unanswered_rate_week_over_week",
+                current=self.unanswered_rate,
+                previous=prev_unanswered_rate,
+                delta=self.unanswered_rate - prev_unanswered_rate,
+            ),
+        ]
+
+
+def _post_summary(record: PostRecord) -> PostSummary:
+    return PostSummary(
+        title=record.title,
+        score=record.score,
+        comments=record.num_comments,
+        permalink=record.permalink,
+        post_id=record.id,
+        created_utc=record.created_utc,
+    )
+
+
+class SectionSelector:
+    """
+    Bounded selection of the unanswered, aging-unanswered and rising sections.
+
+    Unanswered posts rank question-like first, then longest waiting. Rising posts
+    (under 48h old) rank by score velocity: lifetime average by default, or, with a
+    ``VelocityStore``, velocity since the previous run projected an hour ahead by
+    its acceleration.
+    """
+
+    def __init__(
+        self,
+        unanswered_limit: int,
+        rising_limit: int,
+        velocity: Optional[VelocityStore] = None,
+        now: float = 0.0,
+        classifier: TitleClassifier = DEFAULT_CLASSIFIER,
+    ) -> None:
+        self.unanswered = TopK(unanswered_limit)
+        self.aging = TopK(unanswered_limit)
+        self.rising = TopK(rising_limit)
+        self.velocity = velocity
+        self.now = now
+        self.classifier = classifier
+
+    def add(self, record: PostRecord, hours_old: float) -> None:
+        if record.num_comments == 0:
+            question_like = record.question_like
+            if question_like is None:
+                question_like = self.classifier.classify(record.id, record.title)
+            rank = (question_like, hours_old)
+            aging = 48 <= hours_old <= 120
+            # Build the summary only for posts that make the cut.
+            if self.unanswered.would_keep(rank) or (aging and self.aging.would_keep(rank)):
+                summary = UnansweredSummary(
+                    title=record.title,
+                    permalink=record.permalink,
+                    question_like=question_like,
+                    post_id=record.id,
+                    created_utc=record.created_utc,
+                )
+                self.unanswered.push(rank, summary)
+                if aging:
+                    self.aging.push(rank, summary)
+
+        if 0 < hours_old <= 48:
+            if self.velocity is not None and record.id:
+                velocity = self.velocity.record(
+                    record.id, record.created_utc, record.score, record.num_comments, self.now
+                )
+                score_velocity = velocity.score_per_hour
+                rank = (velocity.projected(), score_velocity)
+            else:
+                score_velocity = record.score / hours_old
+                rank = (score_velocity, score_velocity)
+            if score_velocity >= RISING_MIN_VELOCITY and self.rising.would_keep(rank):
+                self.rising.push(rank, _post_summary(record))
 
 
 def collect_weekly_report(
@@ -49,132 +314,107 @@ def collect_weekly_report(
     top_posts_limit: int = 10,
     unanswered_limit: int = 10,
     include_sections: Optional[dict] = None,
+    instrumentation: Optional[RunInstrumentation] = None,
+    window_days: int = 7,
+    scan_limit: Optional[int] = None,
+    tracked_posts: Optional[Iterable[PostRecord]] = None,
+    velocity: Optional[VelocityStore] = None,
+    classifier: Optional[TitleClassifier] = None,
+    heatmap: Optional[SubredditHeatmap] = None,
+    refresh_tracked: Optional[Callable[[List[PostRecord], List[PostRecord]], Iterable[PostRecord]]] = None,
 ) -> SubredditReport:
+    """
+    Build a report in one streaming pass over the subreddit's listings.
+
+    Posts are consumed one record at a time; everything kept across records is
+    bounded by the configured limits (top-k heaps, capped lists, fixed-size
+    counters), so memory does not grow with ``window_days`` or ``scan_limit``.
+    ``window_days`` sets the length of the current and previous comparison
+    windows (the "week" in the trend names). ``scan_limit`` overrides how many
+    /new posts are read; ``None`` uses ``recent_listing_limit``. ``tracked_posts``
+    (refreshed records from earlier runs) also compete for the unanswered, aging and
+    rising sections when the /new scan does not reach them; they do not affect metrics.
+    ``refresh_tracked`` is called after the scan with the tracked records it did not
+    reach and the fresh records of those it did; it returns the unreached ones with
+    current counts, so posts the scan already returned are not looked up again.
+    With ``velocity``, every post under 48h old gets a score snapshot and rising
+    posts are ranked by recent velocity and acceleration. ``classifier`` decides
+    which unanswered titles are question-like (e.g. with per-subreddit keywords);
+    titles are classified a listing page at a time. ``heatmap`` accumulates
+    settled posts and TTF samples from the /new scan by weekday and hour, and
+    keeps newer posts pending until they settle; only posts past its watermarks
+    cost anything.
+    """
+    instr = instrumentation or NULL_INSTRUMENTATION
     subreddit = reddit.subreddit(subreddit_name)
-    now = datetime.now(timezone.utc)
-    one_week_ago = now - timedelta(days=7)
-    two_weeks_ago = now - timedelta(days=14)
-
-    top_posts: List[PostSummary] = []
-    unanswered_posts: List[UnansweredSummary] = []
-    rising_posts: List[PostSummary] = []
-    aging_unanswered: List[UnansweredSummary] = []
-
-    # Metrics containers
-    post_type_mix: Counter[str] = Counter()
-    flair_distribution: Counter[str] = Counter()
-    time_to_first_comment_samples: List[float] = []
-    total_posts_week = 0
-    unanswered_week = 0
-    total_posts_prev = 0
-    unanswered_prev = 0
-
-    # Top posts (current week)
-    for post in subreddit.top(time_filter="week", limit=top_posts_limit):
-        top_posts.append(
-            PostSummary(
-                title=post.title,
-                score=post.score,
-                comments=post.num_comments,
-                permalink=f"https://reddit.com{post.permalink}",
-            )
-        )
+    now = datetime.now(timezone.utc).timestamp()
+    window_start = now - window_days * 86400
+    prev_start = now - 2 * window_days * 86400
+
+    # Top posts (current window)
+    top = TopK(top_posts_limit)
+    time_filter = _top_time_filter(window_days)
+    # "year" is wider than the window, so stream the whole listing and filter it.
+    top_fetch_limit = top_posts_limit if time_filter != "year" else None
+    with instr.stage(subreddit_name, "top"):
+        for record in iter_post_records(subreddit.top(time_filter=time_filter, limit=top_fetch_limit)):
+            if top_fetch_limit is not None or record.created_utc >= window_start:
+                top.push(record.score, _post_summary(record))
 
     # Recent posts for metrics and unanswered detection
-    recent_limit = max(max(top_posts_limit, unanswered_limit) * 5, 50)
-    ttf_cap = 30  # limit time-to-first-comment sampling to avoid excessive API calls
-    ttf_checked = 0
-
-    for post in subreddit.new(limit=recent_limit):
-        created = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
-        flair = post.link_flair_text or "None"
-        if created >= one_week_ago:
-            total_posts_week += 1
-            flair_distribution[flair] += 1
-            post_type_mix[_detect_post_type(post)] += 1
-            hours_old = (now - created).total_seconds() / 3600.0
-            if post.num_comments == 0 and len(unanswered_posts) < unanswered_limit:
-                unanswered_week += 1
-                question_like = _looks_like_question(post.title)
-                unanswered_summary = UnansweredSummary(
-                    title=post.title,
-                    permalink=f"https://reddit.com{post.permalink}",
-                    question_like=question_like,
-                )
-                unanswered_posts.append(unanswered_summary)
-                if 48 <= hours_old <= 120 and len(aging_unanswered) < unanswered_limit:
-                    aging_unanswered.append(unanswered_summary)
-            elif ttf_checked < ttf_cap:
-                ttf = _time_to_first_comment_minutes(post)
-                if ttf is not None:
-                    time_to_first_comment_samples.append(ttf)
-                ttf_checked += 1
-
-            # rising posts: simple heuristic of score velocity for fresh posts (<48h)
-            if hours_old <= 48 and hours_old > 0:
-                score_velocity = post.score / hours_old
-                if score_velocity >= 5 and len(rising_posts) < top_posts_limit:
-                    rising_posts.append(
-                        PostSummary(
-                            title=post.title,
-                            score=post.score,
-                            comments=post.num_comments,
-                            permalink=f"https://reddit.com{post.permalink}",
-                        )
-                    )
-        elif two_weeks_ago <= created < one_week_ago:
-            total_posts_prev += 1
-            if post.num_comments == 0:
-                unanswered_prev += 1
-
-    unanswered_rate = (unanswered_week / total_posts_week) if total_posts_week else 0.0
-    median_ttf = median(time_to_first_comment_samples) if time_to_first_comment_samples else None
-
-    metrics = MetricsSnapshot(
-        total_posts=total_posts_week,
-        unanswered=unanswered_week,
-        unanswered_rate=unanswered_rate,
-        median_time_to_first_comment_minutes=median_ttf,
-        post_type_mix=dict(post_type_mix),
-        flair_distribution=dict(flair_distribution),
-    )
+    recent_limit = scan_limit if scan_limit is not None else recent_listing_limit(top_posts_limit, unanswered_limit)
+    stats = WindowStats()
+    classifier = classifier or DEFAULT_CLASSIFIER
+    sections = SectionSelector(unanswered_limit, top_posts_limit, velocity=velocity, now=now, classifier=classifier)
+    # Tracked posts the scan does not reach are considered after it, with their refreshed counts.
+    pending_tracked = {record.id: record for record in tracked_posts or () if record.id}
+    reached_tracked: List[PostRecord] = []
 
-    trends: List[Trend] = []
-    if total_posts_prev:
-        delta_posts = total_posts_week - total_posts_prev
-        trends.append(
-            Trend(
-                metric="posts_week_over_week",
-                current=float(total_posts_week),
-                previous=float(total_posts_prev),
-                delta=float(delta_posts),
-            )
-        )
-    if total_posts_prev:
-        prev_unanswered_rate = unanswered_prev / total_posts_prev if total_posts_prev else 0.0
-        delta_unanswered_rate = unanswered_rate - prev_unanswered_rate
-        trends.append(
-            Trend(
-                metric="unanswered_rate_week_over_week",
-                current=unanswered_rate,
-                previous=prev_unanswered_rate,
-                delta=delta_unanswered_rate,
-            )
-        )
+    with instr.stage(subreddit_name, "new"):
+        for record in _classified(iter_post_records(subreddit.new(limit=recent_limit)), classifier):
+            if record.created_utc >= window_start:
+                if pending_tracked.pop(record.id, None) is not None:
+                    reached_tracked.append(record)
+                stats.add_current(record)
+                sections.add(record, (now - record.created_utc) / 3600.0)
+                if heatmap is not None:
+                    heatmap.observe(record.id, record.created_utc, record.num_comments, now)
+                if record.num_comments == 0:
+                    stats.unanswered += 1
+                elif stats.wants_ttf_sample():
+                    with instr.stage(subreddit_name, "ttf"):
+                        minutes = _time_to_first_comment_minutes(record.submission)
+                    stats.add_ttf(minutes)
+                    if heatmap is not None:
+                        heatmap.add_ttf(record.created_utc, minutes)
+            elif prev_start <= record.created_utc < window_start:
+                stats.add_previous(record)
+
+    unreached: Iterable[PostRecord] = pending_tracked.values()
+    if refresh_tracked is not None:
+        with instr.stage(subreddit_name, "refresh"):
+            unreached = list(refresh_tracked(list(unreached), reached_tracked))
+    for record in _classified(unreached, classifier):
+        if record.created_utc >= window_start:
+            sections.add(record, (now - record.created_utc) / 3600.0)
+    if heatmap is not None:
+        heatmap.advance()
 
     report = SubredditReport(
-        top_posts=top_posts,
-        rising_posts=rising_posts,
-        unanswered=unanswered_posts,
-        aging_unanswered=aging_unanswered,
-        metrics=metrics,
-        trends=trends,
+        top_posts=top.items(),
+        rising_posts=sections.rising.items(),
+        unanswered=sections.unanswered.items(),
+        aging_unanswered=sections.aging.items(),
+        metrics=stats.metrics(),
+        trends=stats.trends(),
+        heatmap=heatmap.snapshot() if heatmap is not None else None,
         include_sections=include_sections
         or {
             "stats": True,
             "trends": True,
             "top_posts": True,
             "unanswered": True,
+            "heatmap": True,
         },
     )
     return report
@@ -0,0 +1,202 @@
+"""
+Content-addressed, gzip-compressed archive of rendered summaries.
+
+Each distinct summary is stored once as ``OUTPUT_DIR/archive/<digest>.md.gz``,
+named by the BLAKE2b digest of its text. Runs that render an identical summary
+(e.g. hourly runs with no new activity) only refresh the object's mtime.
+``index.jsonl`` records when each version was produced. ``stream_output``
+hashes and compresses the summary chunk by chunk through an ``ArchiveWriter``;
+the object is written to a temp file and renamed, so readers never see a
+partial one. Index and object changes happen under a lock file. ``purge`` drops
+versions older than the retention window, which defaults to the same 48 hours
+as the rest of ``OUTPUT_DIR``. ``drop_citing`` removes versions that link to
+posts found to be deleted since they were archived.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in this process are serialized.
+    fcntl = None
+
+ARCHIVE_DIRNAME = "archive"
+INDEX_FILENAME = "index.jsonl"
+LOCK_FILENAME = ".lock"
+# Matches purge_older_than(days=2) and the 48h data-handling policy in the README.
+DEFAULT_RETENTION_DAYS = 2
+_LOCK = threading.Lock()
+
+
+@dataclass
+class ArchivedSummary:
+    digest: str
+    generated_at: str
+    size: int
+
+
+class ArchiveWriter:
+    """
+    Hashes and gzips a summary while it is being written.
+
+    ``commit`` files the compressed temp file under its digest (or drops it when
+    that content is already archived), so the summary is never held in memory.
+    """
+
+    def __init__(self, archive: "SummaryArchive") -> None:
+        archive.directory.mkdir(parents=True, exist_ok=True)
+        self.archive = archive
+        self.size = 0
+        self.entry: Optional[ArchivedSummary] = None
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._tmp_path = archive.directory / f".incoming.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._raw = self._tmp_path.open("wb")
+        self._gzip = gzip.GzipFile(filename="", fileobj=self._raw, mode="wb", mtime=0)
+
+    def write(self, chunk: str) -> None:
+        data = chunk.encode("utf-8")
+        self._hash.update(data)
+        self._gzip.write(data)
+        self.size += len(data)
+
+    def _close(self) -> None:
+        if not self._raw.closed:
+            self._gzip.close()
+            self._raw.close()
+
+    def commit(self) -> ArchivedSummary:
+        self._close()
+        self.entry = self.archive._store(self._tmp_path, self._hash.hexdigest(), self.size)
+        return self.entry
+
+    def discard(self) -> None:
+        self._close()
+        if self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+
+class SummaryArchive:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.index_path = directory / INDEX_FILENAME
+
+    def object_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.md.gz"
+
+    def writer(self) -> ArchiveWriter:
+        return ArchiveWriter(self)
+
+    def add(self, summary_path: Path, chunk_chars: int = 1 << 16) -> ArchivedSummary:
+        """Archive an already written summary file, streaming it through a writer."""
+        writer = self.writer()
+        try:
+            with summary_path.open("r", encoding="utf-8", newline="") as fh:
+                for chunk in iter(lambda: fh.read(chunk_chars), ""):
+                    writer.write(chunk)
+        except BaseException:
+            writer.discard()
+            raise
+        return writer.commit()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize index and object changes across threads and, where flock exists, processes."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _LOCK, (self.directory / LOCK_FILENAME).open("a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _store(self, tmp_path: Path, digest: str, size: int) -> ArchivedSummary:
+        path = self.object_path(digest)
+        entry = ArchivedSummary(
+            digest=digest, generated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"), size=size
+        )
+        with self._locked():
+            if path.exists():
+                # Keeps a re-rendered version inside the retention window.
+                os.utime(path)
+                tmp_path.unlink()
+            else:
+                os.replace(tmp_path, path)
+            versions = self.versions()
+            if not versions or versions[-1].digest != digest:
+                with self.index_path.open("a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(asdict(entry)) + "\n")
+        return entry
+
+    def versions(self) -> List[ArchivedSummary]:
+        """Archived versions, oldest first."""
+        try:
+            lines = self.index_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        entries: List[ArchivedSummary] = []
+        for line in lines:
+            try:
+                entries.append(ArchivedSummary(**json.loads(line)))
+            except (TypeError, ValueError):
+                continue
+        return entries
+
+    def read(self, digest: str) -> Optional[str]:
+        try:
+            return gzip.decompress(self.object_path(digest).read_bytes()).decode("utf-8")
+        except (OSError, EOFError):
+            return None
+
+    def purge(self, days: int = DEFAULT_RETENTION_DAYS, now: Optional[float] = None) -> int:
+        """Delete versions last produced more than ``days`` ago and drop them from the index."""
+        if not self.directory.exists():
+            return 0
+        cutoff = (time.time() if now is None else now) - days * 86400
+        removed = 0
+        with self._locked():
+            # Temp files left by interrupted runs age out with the objects.
+            for path in [*self.directory.glob("*.md.gz"), *self.directory.glob(".incoming.*.tmp")]:
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += path.name.endswith(".md.gz")
+                except OSError:
+                    continue
+            if removed:
+                self._compact_index()
+        return removed
+
+    def drop_citing(self, permalinks: Iterable[str]) -> int:
+        """Delete archived versions that mention any of ``permalinks`` (e.g. posts since deleted)."""
+        # Summaries cite posts as markdown links, so match "(permalink)" exactly.
+        needles = [f"({link})" for link in permalinks if link]
+        if not needles or not self.directory.exists():
+            return 0
+        removed = 0
+        with self._locked():
+            for path in self.directory.glob("*.md.gz"):
+                text = self.read(path.name[: -len(".md.gz")])
+                if text is not None and any(link in text for link in needles):
+                    try:
+                        path.unlink()
+                        removed += 1
+                    except OSError:
+                        continue
+            if removed:
+                self._compact_index()
+        return removed
+
+    def _compact_index(self) -> None:
+        # Callers hold the lock, so no add can append between the read and the replace.
+        kept = [entry for entry in self.versions() if self.object_path(entry.digest).exists()]
+        tmp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text("".join(json.dumps(asdict(entry)) + "\n" for entry in kept), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
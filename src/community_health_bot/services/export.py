@@ -0,0 +1,267 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from ..core.models import SubredditReport
+
+# Columnar layout (all integers little-endian):
+#   magic (8 bytes) | header length (uint64) | JSON header, padded to 8 bytes | column segments
+# Each segment starts on an 8-byte boundary at header["data_start"] + column["offset"].
+# Numeric columns are packed arrays; string columns are int64 offsets (rows + 1) followed by UTF-8 bytes.
+COLUMNAR_MAGIC = b"CHBCOL01"
+_TYPECODES = {"int64": "q", "float64": "d", "bool": "B"}
+
+Column = Tuple[str, str, Sequence[Any]]  # (name, type, values)
+
+
+@contextmanager
+def _replace_atomically(path: Path) -> Iterator[Path]:
+    """Yield a temp path next to ``path`` and move it into place once the block succeeds."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def report_to_dict(name: str, report: SubredditReport) -> Dict[str, Any]:
+    return {"subreddit": name, **asdict(report)}
+
+
+def write_ndjson(path: Path, subreddit_names: Iterable[str], reports: Dict[str, SubredditReport]) -> Path:
+    """Write one JSON document per subreddit report, one per line."""
+    generated_at = datetime.now(timezone.utc).isoformat()
+    with _replace_atomically(path) as tmp_path:
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            for name in subreddit_names:
+                record = {"generated_at": generated_at, **report_to_dict(name, reports[name])}
+                fh.write(json.dumps(record, ensure_ascii=False))
+                fh.write("\n")
+    return path
+
+
+def report_tables(
+    subreddit_names: Iterable[str], reports: Dict[str, SubredditReport]
+) -> Dict[str, List[Column]]:
+    """Flatten reports into column lists for the metrics, posts, unanswered, distribution and heatmap tables."""
+    metrics: Dict[str, list] = {k: [] for k in ("subreddit", "total_posts", "unanswered", "unanswered_rate", "median_ttf")}
+    posts: Dict[str, list] = {k: [] for k in ("subreddit", "kind", "rank", "title", "score", "comments", "permalink")}
+    unanswered: Dict[str, list] = {k: [] for k in ("subreddit", "kind", "rank", "title", "permalink", "question_like")}
+    distribution: Dict[str, list] = {k: [] for k in ("subreddit", "kind", "label", "count")}
+    heatmap: Dict[str, list] = {
+        k: [] for k in ("subreddit", "weekday", "hour", "posts", "unanswered", "median_ttf", "ttf_samples")
+    }
+
+    for name in subreddit_names:
+        report = reports[name]
+        m = report.metrics
+        metrics["subreddit"].append(name)
+        metrics["total_posts"].append(m.total_posts)
+        metrics["unanswered"].append(m.unanswered)
+        metrics["unanswered_rate"].append(m.unanswered_rate)
+        ttf = m.median_time_to_first_comment_minutes
+        metrics["median_ttf"].append(float("nan") if ttf is None else ttf)
+
+        for kind, items in (("top", report.top_posts), ("rising", report.rising_posts)):
+            for rank, post in enumerate(items, start=1):
+                for key, value in (
+                    ("subreddit", name),
+                    ("kind", kind),
+                    ("rank", rank),
+                    ("title", post.title),
+                    ("score", post.score),
+                    ("comments", post.comments),
+                    ("permalink", post.permalink),
+                ):
+                    posts[key].append(value)
+
+        for kind, items in (("unanswered", report.unanswered), ("aging", report.aging_unanswered)):
+            for rank, post in enumerate(items, start=1):
+                for key, value in (
+                    ("subreddit", name),
+                    ("kind", kind),
+                    ("rank", rank),
+                    ("title", post.title),
+                    ("permalink", post.permalink),
+                    ("question_like", post.question_like),
+                ):
+                    unanswered[key].append(value)
+
+        for kind, counts in (("post_type", m.post_type_mix), ("flair", m.flair_distribution)):
+            for label, count in counts.items():
+                distribution["subreddit"].append(name)
+                distribution["kind"].append(kind)
+                distribution["label"].append(label)
+                distribution["count"].append(count)
+
+        cells = report.heatmap
+        if cells is not None:
+            # Only cells with data; weekday 0 is Monday, hours are UTC.
+            for cell, posts_count in enumerate(cells.posts):
+                if not posts_count and not cells.ttf_samples[cell]:
+                    continue
+                ttf = cells.median_ttf_minutes[cell]
+                for key, value in (
+                    ("subreddit", name),
+                    ("weekday", cell // 24),
+                    ("hour", cell % 24),
+                    ("posts", posts_count),
+                    ("unanswered", cells.unanswered[cell]),
+                    ("median_ttf", float("nan") if ttf is None else ttf),
+                    ("ttf_samples", cells.ttf_samples[cell]),
+                ):
+                    heatmap[key].append(value)
+
+    def typed(columns: Dict[str, list], types: Dict[str, str]) -> List[Column]:
+        return [(col, types.get(col, "str"), values) for col, values in columns.items()]
+
+    return {
+        "metrics": typed(
+            metrics,
+            {"total_posts": "int64", "unanswered": "int64", "unanswered_rate": "float64", "median_ttf": "float64"},
+        ),
+        "posts": typed(posts, {"rank": "int64", "score": "int64", "comments": "int64"}),
+        "unanswered": typed(unanswered, {"rank": "int64", "question_like": "bool"}),
+        "distribution": typed(distribution, {"count": "int64"}),
+        "heatmap": typed(
+            heatmap,
+            {
+                "weekday": "int64",
+                "hour": "int64",
+                "posts": "int64",
+                "unanswered": "int64",
+                "median_ttf": "float64",
+                "ttf_samples": "int64",
+            },
+        ),
+    }
+
+
+def _pack_numeric(col_type: str, values: Sequence[Any]) -> bytes:
+    packed = array(_TYPECODES[col_type], values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _pack_strings(values: Sequence[str]) -> Tuple[bytes, int]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    offsets_bytes = offsets.tobytes()
+    return offsets_bytes + b"".join(encoded), len(offsets_bytes)
+
+
+def _pad(length: int) -> int:
+    return (-length) % 8
+
+
+def write_columnar(path: Path, tables: Dict[str, List[Column]]) -> Path:
+    """Write tables to a single memory-mappable columnar file."""
+    segments: List[bytes] = []
+    header_tables: Dict[str, Any] = {}
+    offset = 0
+    for table_name, columns in tables.items():
+        rows = len(columns[0][2]) if columns else 0
+        header_columns = []
+        for col_name, col_type, values in columns:
+            if len(values) != rows:
+                raise ValueError(f"Column {table_name}.{col_name} has {len(values)} rows, expected {rows}")
+            entry: Dict[str, Any] = {"name": col_name, "type": col_type, "offset": offset}
+            if col_type == "str":
+                data, data_offset = _pack_strings(values)
+                entry["data_offset"] = offset + data_offset
+            else:
+                data = _pack_numeric(col_type, values)
+            entry["length"] = len(data)
+            header_columns.append(entry)
+            segments.append(data + b"\0" * _pad(len(data)))
+            offset += len(data) + _pad(len(data))
+        header_tables[table_name] = {"rows": rows, "columns": header_columns}
+
+    header = {"version": 1, "tables": header_tables}
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * _pad(len(header_bytes))
+    with _replace_atomically(path) as tmp_path:
+        with tmp_path.open("wb") as fh:
+            fh.write(COLUMNAR_MAGIC)
+            fh.write(struct.pack("<Q", len(header_bytes)))
+            fh.write(header_bytes)
+            for segment in segments:
+                fh.write(segment)
+    return path
+
+
+def read_columnar_header(path: Path) -> Dict[str, Any]:
+    with path.open("rb") as fh:
+        prefix = fh.read(16)
+        if len(prefix) < 16 or prefix[:8] != COLUMNAR_MAGIC:
+            raise ValueError(f"Not a columnar report file: {path}")
+        (header_len,) = struct.unpack("<Q", prefix[8:])
+        header = json.loads(fh.read(header_len))
+    header["data_start"] = 16 + header_len
+    return header
+
+
+def read_column(path: Path, table: str, column: str) -> List[Any]:
+    """
+    Load a single column by memory-mapping the file; other columns are never read.
+    """
+    header = read_columnar_header(path)
+    try:
+        spec = next(c for c in header["tables"][table]["columns"] if c["name"] == column)
+    except (KeyError, StopIteration):
+        raise KeyError(f"Unknown column {table}.{column}") from None
+    rows = header["tables"][table]["rows"]
+    start = header["data_start"] + spec["offset"]
+
+    with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if spec["type"] == "str":
+            offsets = array("q", mm[start : start + (rows + 1) * 8])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            data_start = header["data_start"] + spec["data_offset"]
+            return [
+                mm[data_start + offsets[i] : data_start + offsets[i + 1]].decode("utf-8") for i in range(rows)
+            ]
+        values = array(_TYPECODES[spec["type"]])
+        values.frombytes(mm[start : start + spec["length"]])
+        if sys.byteorder != "little":
+            values.byteswap()
+        if spec["type"] == "bool":
+            return [bool(v) for v in values]
+        return values.tolist()
+
+
+def export_reports(
+    output_dir: Path,
+    subreddit_names: Sequence[str],
+    reports: Dict[str, SubredditReport],
+    formats: Iterable[str] = ("ndjson", "columnar"),
+) -> List[Path]:
+    stamp = datetime.now().date()
+    written: List[Path] = []
+    for fmt in formats:
+        if fmt == "ndjson":
+            written.append(write_ndjson(output_dir / f"reports_{stamp}.ndjson", subreddit_names, reports))
+        elif fmt == "columnar":
+            written.append(
+                write_columnar(output_dir / f"reports_{stamp}.col", report_tables(subreddit_names, reports))
+            )
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+    return written
@@ -0,0 +1,208 @@
+"""
+Response-time heatmap by weekday and hour of posting (UTC).
+
+Each subreddit keeps 7x24 cells of post counts, unanswered counts and a small
+time-to-first-comment sketch (counts in log-spaced buckets), persisted in
+``OUTPUT_DIR/heatmap.json`` and added to on every run. A post is counted once,
+when it is at least ``SETTLE_HOURS`` old and so has had a fair chance to be
+answered. Posts the /new scan sees before then are kept as pending (id and
+creation time) and settled on a later run with a batched /api/info lookup
+(``tracking.settle_heatmap_posts``), so subreddits whose scan never reaches
+24h-old posts still fill in. A per-subreddit watermark (the newest post counted
+so far) skips posts counted by earlier runs, so each run only pays for posts
+that settled since the last one. TTF samples have their own watermark because
+they are taken from the newest posts, before those posts settle.
+"""
+
+import json
+import math
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.models import ResponseHeatmap
+
+HEATMAP_FILENAME = "heatmap.json"
+CELLS = 7 * 24
+SETTLE_HOURS = 24
+# Bucket i holds TTFs in [2**(i/2) - 1, 2**((i+1)/2) - 1) minutes; the last one is open-ended (~8 days+).
+TTF_BUCKETS = 28
+# Cap on posts waiting to settle, per subreddit.
+MAX_PENDING = 5000
+
+
+def cell_index(created_utc: float) -> int:
+    """Weekday (Monday = 0) * 24 + hour, in UTC."""
+    created = datetime.fromtimestamp(created_utc, tz=timezone.utc)
+    return created.weekday() * 24 + created.hour
+
+
+def ttf_bucket(minutes: float) -> int:
+    return min(int(2 * math.log2(max(minutes, 0.0) + 1)), TTF_BUCKETS - 1)
+
+
+def sketch_quantile(buckets: List[int], q: float) -> Optional[float]:
+    """Approximate quantile from bucket counts (geometric middle of the bucket it falls in)."""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if seen > rank:
+            return 2 ** ((index + 0.5) / 2) - 1
+    return 2 ** ((TTF_BUCKETS - 0.5) / 2) - 1
+
+
+class SubredditHeatmap:
+    def __init__(
+        self,
+        posts: Optional[List[int]] = None,
+        unanswered: Optional[List[int]] = None,
+        ttf: Optional[Dict[int, List[int]]] = None,
+        watermark: float = 0.0,
+        ttf_watermark: float = 0.0,
+        pending: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.posts = posts or [0] * CELLS
+        self.unanswered = unanswered or [0] * CELLS
+        # Sparse: cell -> bucket counts, only for cells with samples.
+        self.ttf: Dict[int, List[int]] = ttf or {}
+        self.watermark = watermark
+        self.ttf_watermark = ttf_watermark
+        # Post id -> created_utc for posts seen before they settled.
+        self.pending: Dict[str, float] = pending or {}
+        self._next_watermark = watermark
+        self._next_ttf_watermark = ttf_watermark
+
+    def observe(self, post_id: Optional[str], created_utc: float, num_comments: int, now: float) -> bool:
+        """Count a post once it has settled, or keep it pending; returns whether it was counted."""
+        if created_utc <= self.watermark:
+            return False
+        if now - created_utc < SETTLE_HOURS * 3600:
+            if post_id and (post_id in self.pending or len(self.pending) < MAX_PENDING):
+                self.pending[post_id] = created_utc
+            return False
+        if post_id:
+            self.pending.pop(post_id, None)
+        self._count(created_utc, num_comments)
+        return True
+
+    def due(self, now: float) -> List[str]:
+        """Pending post ids that are now old enough to settle."""
+        cutoff = now - SETTLE_HOURS * 3600
+        return [post_id for post_id, created_utc in self.pending.items() if created_utc <= cutoff]
+
+    def settle(self, post_id: str, num_comments: int) -> bool:
+        created_utc = self.pending.pop(post_id, None)
+        if created_utc is None or created_utc <= self.watermark:
+            return False
+        self._count(created_utc, num_comments)
+        return True
+
+    def drop_pending(self, post_ids: List[str]) -> None:
+        for post_id in post_ids:
+            self.pending.pop(post_id, None)
+
+    def _count(self, created_utc: float, num_comments: int) -> None:
+        cell = cell_index(created_utc)
+        self.posts[cell] += 1
+        if num_comments == 0:
+            self.unanswered[cell] += 1
+        self._next_watermark = max(self._next_watermark, created_utc)
+
+    def add_ttf(self, created_utc: float, minutes: Optional[float]) -> bool:
+        if minutes is None or created_utc <= self.ttf_watermark:
+            return False
+        cell = cell_index(created_utc)
+        buckets = self.ttf.get(cell)
+        if buckets is None:
+            buckets = self.ttf[cell] = [0] * TTF_BUCKETS
+        buckets[ttf_bucket(minutes)] += 1
+        self._next_ttf_watermark = max(self._next_ttf_watermark, created_utc)
+        return True
+
+    def advance(self) -> None:
+        """Move the watermarks past everything observed; call once the scan is complete."""
+        self.watermark = self._next_watermark
+        self.ttf_watermark = self._next_ttf_watermark
+
+    def snapshot(self) -> ResponseHeatmap:
+        median_ttf: List[Optional[float]] = [None] * CELLS
+        samples = [0] * CELLS
+        for cell, buckets in self.ttf.items():
+            median_ttf[cell] = sketch_quantile(buckets, 0.5)
+            samples[cell] = sum(buckets)
+        return ResponseHeatmap(
+            posts=list(self.posts),
+            unanswered=list(self.unanswered),
+            median_ttf_minutes=median_ttf,
+            ttf_samples=samples,
+        )
+
+    def to_record(self) -> Dict[str, object]:
+        return {
+            "posts": self.posts,
+            "unanswered": self.unanswered,
+            "ttf": {str(cell): buckets for cell, buckets in self.ttf.items()},
+            "watermark": self.watermark,
+            "ttf_watermark": self.ttf_watermark,
+            "pending": self.pending,
+        }
+
+    @classmethod
+    def from_record(cls, raw: Dict[str, object]) -> "SubredditHeatmap":
+        posts = [int(v) for v in raw["posts"]]
+        unanswered = [int(v) for v in raw["unanswered"]]
+        if len(posts) != CELLS or len(unanswered) != CELLS:
+            raise ValueError("heatmap must have 7x24 cells")
+        ttf = {int(cell): [int(v) for v in buckets] for cell, buckets in raw.get("ttf", {}).items()}
+        if any(len(buckets) != TTF_BUCKETS for buckets in ttf.values()):
+            raise ValueError("unexpected TTF bucket count")
+        pending = {str(post_id): float(created) for post_id, created in raw.get("pending", {}).items()}
+        return cls(
+            posts, unanswered, ttf, float(raw.get("watermark", 0)), float(raw.get("ttf_watermark", 0)), pending
+        )
+
+
+class HeatmapStore:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._heatmaps: Dict[str, SubredditHeatmap] = {}
+
+    def for_subreddit(self, subreddit: str) -> SubredditHeatmap:
+        key = subreddit.lower()
+        heatmap = self._heatmaps.get(key)
+        if heatmap is None:
+            heatmap = self._heatmaps[key] = SubredditHeatmap()
+        return heatmap
+
+    def pending_counts(self) -> Dict[str, int]:
+        """Posts waiting to settle, per (lower-cased) subreddit."""
+        return {name: len(heatmap.pending) for name, heatmap in self._heatmaps.items()}
+
+    @classmethod
+    def load(cls, path: Path) -> "HeatmapStore":
+        store = cls(path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        for name, item in raw.get("subreddits", {}).items():
+            try:
+                store._heatmaps[name] = SubredditHeatmap.from_record(item)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return store
+
+    def save(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"subreddits": {name: heatmap.to_record() for name, heatmap in self._heatmaps.items()}}
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
@@ -1,7 +1,10 @@
 import csv
+import io
+import os
+import threading
 from datetime import date
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
 
 from ..core.models import HistoryEntry
 
@@ -9,33 +12,121 @@ from ..core.models import HistoryEntry
 def read_history(path: Path) -> List[HistoryEntry]:
     if not path.exists():
         return []
-    entries: List[HistoryEntry] = []
     try:
         with path.open("r", encoding="utf-8", newline="") as fh:
-            reader = csv.DictReader(fh)
-            for row in reader:
-                try:
-                    run_date = row.get("date")
-                    subreddit = row.get("subreddit")
-                    if not run_date or not subreddit:
-                        continue
-                    entries.append(
-                        HistoryEntry(
-                            date=run_date,
-                            subreddit=subreddit,
-                            total_posts=int(row.get("total_posts", 0)),
-                            unanswered=int(row.get("unanswered", 0)),
-                            unanswered_rate=float(row.get("unanswered_rate", 0.0)),
-                            median_ttf_minutes=_parse_optional_float(row.get("median_ttf_minutes")),
-                        )
-                    )
-                except Exception:
-                    continue
+            return _parse_rows(csv.DictReader(fh))
     except Exception:
         return []
+
+
+def _parse_rows(rows: Iterable[Dict[str, str]]) -> List[HistoryEntry]:
+    entries: List[HistoryEntry] = []
+    for row in rows:
+        entry = _parse_row(row)
+        if entry is not None:
+            entries.append(entry)
     return entries
 
 
+def _parse_row(row: Dict[str, str]) -> Optional[HistoryEntry]:
+    try:
+        run_date = row.get("date")
+        subreddit = row.get("subreddit")
+        if not run_date or not subreddit:
+            return None
+        return HistoryEntry(
+            date=run_date,
+            subreddit=subreddit,
+            total_posts=int(row.get("total_posts", 0)),
+            unanswered=int(row.get("unanswered", 0)),
+            unanswered_rate=float(row.get("unanswered_rate", 0.0)),
+            median_ttf_minutes=_parse_optional_float(row.get("median_ttf_minutes")),
+        )
+    except Exception:
+        return None
+
+
+class HistoryCache:
+    """
+    Incrementally loaded copy of a history CSV.
+
+    ``load`` stats the file and returns the cached entries when size and mtime are
+    unchanged. When the file has grown, only the bytes appended since the last load
+    are parsed and added to the cached list in place. A file that shrank, was
+    replaced, or no longer matches the bytes already read is re-read from scratch.
+    The returned list is shared: treat it as read-only.
+    """
+
+    # Bytes just before the read offset that must still match to trust an append.
+    _GUARD_BYTES = 64
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self._entries: List[HistoryEntry] = []
+        self._fieldnames: Optional[Sequence[str]] = None
+        self._offset = 0
+        self._guard = b""
+        self._signature: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> List[HistoryEntry]:
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                self._reset()
+                return self._entries
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if signature == self._signature:
+                return self._entries
+            try:
+                with open(self.path, "rb") as fh:
+                    if not self._can_append(fh, stat):
+                        self._reset()
+                        self.full_loads += 1
+                    else:
+                        self.incremental_loads += 1
+                    self._read_from_offset(fh)
+            except OSError:
+                self._reset()
+                return self._entries
+            self._signature = signature
+            return self._entries
+
+    def _can_append(self, fh, stat: os.stat_result) -> bool:
+        if self._signature is None or self._signature[0] != stat.st_ino or stat.st_size < self._offset:
+            return False
+        start = self._offset - len(self._guard)
+        fh.seek(start)
+        return fh.read(len(self._guard)) == self._guard
+
+    def _read_from_offset(self, fh) -> None:
+        fh.seek(self._offset)
+        data = fh.read()
+        # Leave a partially written last line for the next load.
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        chunk = data[:end]
+        text = chunk.decode("utf-8", errors="replace")
+        if self._fieldnames is None:
+            header, _, text = text.partition("\n")
+            self._fieldnames = next(csv.reader([header]), [])
+        self._entries.extend(_parse_rows(csv.DictReader(io.StringIO(text, newline=""), fieldnames=self._fieldnames)))
+        self._offset += end
+        self._guard = (self._guard + chunk)[-self._GUARD_BYTES :]
+
+    def _reset(self) -> None:
+        # A fresh list, so callers holding the old one never see it change underneath them.
+        self._entries = []
+        self._fieldnames = None
+        self._offset = 0
+        self._guard = b""
+        self._signature = None
+
+
 def append_history(path: Path, entries: Iterable[HistoryEntry]) -> None:
     entries = list(entries)
     if not entries:
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+PROMETHEUS_FILENAME = "community_health_bot.prom"
+
+
+@dataclass
+class StageStats:
+    seconds: float = 0.0
+    calls: int = 0
+    requests: int = 0
+    bytes: int = 0
+
+
+class RunInstrumentation:
+    """
+    Per-subreddit, per-stage timings plus Reddit request counts and bytes for one run.
+
+    Stage times are exclusive: time spent in a nested stage (e.g. ``ttf`` inside
+    ``new``) is only counted once, against the innermost stage. HTTP responses seen
+    through ``attach`` are attributed to the innermost active stage on that thread.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[Tuple[str, str], StageStats] = {}
+        self.sleep_seconds = 0.0
+        self.started = time.time()
+        self._started_monotonic = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[list]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _stats(self, subreddit: str, stage: str) -> StageStats:
+        key = (subreddit, stage)
+        stats = self.stages.get(key)
+        if stats is None:
+            stats = self.stages[key] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, subreddit: str, name: str) -> Iterator[None]:
+        stack = self._stack()
+        frame = [subreddit, name, time.perf_counter(), 0.0]  # subreddit, stage, start, nested time
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - frame[2]
+            if stack:
+                stack[-1][3] += elapsed
+            with self._lock:
+                stats = self._stats(subreddit, name)
+                stats.seconds += elapsed - frame[3]
+                stats.calls += 1
+
+    def record_request(self, nbytes: int) -> None:
+        stack = self._stack()
+        subreddit, name = (stack[-1][0], stack[-1][1]) if stack else ("", "other")
+        with self._lock:
+            stats = self._stats(subreddit, name)
+            stats.requests += 1
+            stats.bytes += nbytes
+
+    def record_sleep(self, subreddit: str, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            stats = self._stats(subreddit, "rate_limit_sleep")
+            stats.seconds += seconds
+            stats.calls += 1
+            self.sleep_seconds += seconds
+
+    def attach(self, reddit) -> None:
+        """Count responses from PRAW's underlying requests session (best effort)."""
+        try:
+            session = reddit._core._requestor._http
+            session.hooks.setdefault("response", []).append(self._on_response)
+        except AttributeError:
+            return
+
+    def _on_response(self, response, *args, **kwargs):
+        length = response.headers.get("Content-Length")
+        try:
+            nbytes = int(length) if length is not None else len(response.content or b"")
+        except (TypeError, ValueError):
+            nbytes = 0
+        self.record_request(nbytes)
+        return response
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = [
+                {
+                    "subreddit": subreddit,
+                    "stage": name,
+                    "seconds": round(stats.seconds, 4),
+                    "calls": stats.calls,
+                    "requests": stats.requests,
+                    "bytes": stats.bytes,
+                }
+                for (subreddit, name), stats in sorted(self.stages.items())
+            ]
+            return {
+                "duration_seconds": round(time.perf_counter() - self._started_monotonic, 4),
+                "requests": sum(s.requests for s in self.stages.values()),
+                "bytes": sum(s.bytes for s in self.stages.values()),
+                "rate_limit_sleep_seconds": round(self.sleep_seconds, 4),
+                "stages": stages,
+            }
+
+    def write_prometheus(self, output_dir: Path) -> Path:
+        """Write a textfile-collector file atomically (the collector may read at any time)."""
+        summary = self.summary()
+        lines = []
+        per_stage = [
+            ("stage_seconds", "seconds", "Time spent per stage, excluding nested stages."),
+            ("stage_calls", "calls", "Number of times each stage ran."),
+            ("stage_requests", "requests", "Reddit API requests issued per stage."),
+            ("stage_bytes", "bytes", "Reddit API response bytes per stage."),
+        ]
+        for metric, field_name, help_text in per_stage:
+            lines.append(f"# HELP community_health_bot_{metric} {help_text}")
+            lines.append(f"# TYPE community_health_bot_{metric} gauge")
+            for entry in summary["stages"]:
+                labels = f'subreddit="{_escape_label(entry["subreddit"])}",stage="{_escape_label(entry["stage"])}"'
+                lines.append(f"community_health_bot_{metric}{{{labels}}} {entry[field_name]}")
+        for metric, value, help_text in (
+            ("run_duration_seconds", summary["duration_seconds"], "Wall-clock duration of the last run."),
+            ("rate_limit_sleep_seconds", summary["rate_limit_sleep_seconds"], "Time slept on rate-limit backoff."),
+            ("last_run_timestamp_seconds", round(self.started, 3), "Unix time the last run started."),
+        ):
+            lines.append(f"# HELP community_health_bot_{metric} {help_text}")
+            lines.append(f"# TYPE community_health_bot_{metric} gauge")
+            lines.append(f"community_health_bot_{metric} {value}")
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / PROMETHEUS_FILENAME
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+
+class NullInstrumentation(RunInstrumentation):
+    """Drop-in that records nothing; used when no instrumentation is passed."""
+
+    @contextmanager
+    def stage(self, subreddit: str, name: str) -> Iterator[None]:
+        yield
+
+    def record_request(self, nbytes: int) -> None:
+        return
+
+    def record_sleep(self, subreddit: str, seconds: float) -> None:
+        return
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
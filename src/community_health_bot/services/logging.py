@@ -1,22 +1,243 @@
+import atexit
 import json
 import logging
-from typing import Any, Dict, Optional
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
 
+# Shared encoder with json.dumps defaults, so output is unchanged but no encoder is built per call.
+_ENCODER = json.JSONEncoder()
+_STOP = None
+_listeners: List["BatchingQueueListener"] = []
+_atexit_registered = False
 
-def setup_logger(level: str = "INFO") -> logging.Logger:
+
+class JsonMessage:
+    """
+    Log message whose JSON encoding is deferred until a handler formats it.
+
+    With the queue pipeline that happens on the listener thread, so callers only
+    pay for building the payload dict.
+    """
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return _ENCODER.encode(self.payload)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.msg, JsonMessage):
+            payload = record.msg.payload
+        else:
+            payload = {"msg": record.getMessage()}
+        ts = datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat()
+        return _ENCODER.encode({"ts": ts, "level": record.levelname, **payload})
+
+
+class _BatchWriteMixin:
+    """Format a batch of records and write them with a single write/flush."""
+
+    def emit_batch(self, records: Sequence[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        text = self.terminator.join(lines) + self.terminator
+        self.acquire()
+        try:
+            self._write_batch(text)
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchStreamHandler(_BatchWriteMixin, logging.StreamHandler):
+    def _write_batch(self, text: str) -> None:
+        self.stream.write(text)
+        self.flush()
+
+
+class BatchRotatingFileHandler(_BatchWriteMixin, RotatingFileHandler):
+    def _write_batch(self, text: str) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0 and self.stream.tell() > 0:
+            # maxBytes counts bytes; only non-ASCII text needs encoding to measure.
+            size = len(text) if text.isascii() else len(text.encode(self.encoding or "utf-8"))
+            if self.stream.tell() + size >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    # doRollover does not reopen the file when delay=True.
+                    self.stream = self._open()
+        self.stream.write(text)
+        self.flush()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that never formats on the calling thread and sheds load when full.
+
+    When the queue is full, records below WARNING are dropped until ``max_dropped``
+    have been lost; after that (and always for WARNING and above) the caller blocks
+    until the listener catches up.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]", max_dropped: int = 1000) -> None:
+        super().__init__(log_queue)
+        self.max_dropped = max_dropped
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in-process, so the record can be handed over as-is.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno < logging.WARNING and self.dropped < self.max_dropped:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._drop_lock:
+                    self.dropped += 1
+            return
+        self.queue.put(record)
+
+
+class BatchingQueueListener:
+    """Drain the log queue on a background thread and hand records to handlers in batches."""
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[Any]",
+        handlers: Sequence[logging.Handler],
+        batch_size: int = 256,
+        queue_handler: Optional[BoundedQueueHandler] = None,
+    ) -> None:
+        self.queue = log_queue
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self.queue_handler = queue_handler
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        dropped = self.queue_handler.dropped if self.queue_handler else 0
+        if dropped:
+            record = logging.makeLogRecord(
+                {"msg": JsonMessage({"msg": "log_records_dropped", "dropped": dropped}), "levelno": logging.WARNING}
+            )
+            record.levelname = "WARNING"
+            self._emit([record])
+        for handler in self.handlers:
+            handler.flush()
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._emit(batch)
+            if stop:
+                return
+
+    def _emit(self, batch: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level]
+            if not records:
+                continue
+            if isinstance(handler, _BatchWriteMixin):
+                handler.emit_batch(records)
+            else:
+                for record in records:
+                    handler.handle(record)
+
+
+def shutdown_logging() -> None:
+    """Flush and stop background log writers (also registered with atexit)."""
+    logger = logging.getLogger("community_health_bot")
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        if listener.queue_handler is not None:
+            logger.removeHandler(listener.queue_handler)
+
+
+def setup_logger(
+    level: str = "INFO",
+    log_file: Optional[Path] = None,
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 3,
+    queue_size: int = 10000,
+    batch_size: int = 256,
+    max_dropped: int = 1000,
+) -> logging.Logger:
+    global _atexit_registered
     logger = logging.getLogger("community_health_bot")
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter("%(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        stream_handler = BatchStreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers: List[logging.Handler] = [stream_handler]
+        if log_file:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = BatchRotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+            file_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(file_handler)
+        log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        queue_handler = BoundedQueueHandler(log_queue, max_dropped=max_dropped)
+        listener = BatchingQueueListener(log_queue, handlers, batch_size=batch_size, queue_handler=queue_handler)
+        listener.start()
+        _listeners.append(listener)
+        logger.addHandler(queue_handler)
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     return logger
 
 
-def log_json(logger: logging.Logger, message: str, **fields: Any) -> None:
+def log_json(logger: logging.Logger, message: str, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    Log a structured message. Encoding happens when the record is written, so
+    field values should not be mutated after the call.
+    """
+    if not logger.isEnabledFor(level):
+        return
     payload: Dict[str, Any] = {"msg": message, **fields}
-    logger.info(json.dumps(payload))
+    logger.log(level, JsonMessage(payload))
 
 
 def extract_rate_limit_headers(response) -> Dict[str, Any]:
@@ -1,7 +1,26 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-from ..core.models import HistoryEntry, MetricsSnapshot, PostSummary, SubredditReport, Trend, UnansweredSummary
+from ..core.models import (
+    HistoryEntry,
+    MetricsSnapshot,
+    PostSummary,
+    ResponseHeatmap,
+    SubredditReport,
+    Trend,
+    UnansweredSummary,
+)
+
+
+def _mock_heatmap() -> ResponseHeatmap:
+    # Busier during the day, slower to answer overnight and at weekends.
+    hours = [(day, hour) for day in range(7) for hour in range(24)]
+    return ResponseHeatmap(
+        posts=[3 if 8 <= hour < 22 else 1 for _, hour in hours],
+        unanswered=[1 if hour < 6 or day >= 5 else 0 for day, hour in hours],
+        median_ttf_minutes=[5.0 + 12 * abs(13 - hour) + (120 if day >= 5 else 0) for day, hour in hours],
+        ttf_samples=[2 for _ in hours],
+    )
 
 
 def generate_mock_report(
@@ -71,6 +90,7 @@ def generate_mock_report(
         metrics=metrics,
         trends=trends,
         history=history,
+        heatmap=_mock_heatmap(),
         include_sections=include_sections
-        or {"stats": True, "trends": True, "top_posts": True, "unanswered": True},
+        or {"stats": True, "trends": True, "top_posts": True, "unanswered": True, "heatmap": True},
     )
@@ -0,0 +1,164 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from ..config.settings import SubredditConfig
+from ..core.models import HistoryEntry
+from .analytics import TTF_SAMPLE_CAP, recent_listing_limit
+from .history import recent_history_for_subreddit
+from .tracking import INFO_BATCH_SIZE
+
+# Reddit listings return at most 100 items per request.
+LISTING_PAGE_SIZE = 100
+# OAuth clients get 100 queries per minute, averaged over a 10 minute window.
+DEFAULT_QPM = 100
+DEFAULT_REQUEST_LATENCY_SECONDS = 0.6
+# One token request per run for script apps.
+AUTH_REQUESTS = 1
+# Reddit averages QPM over this window, so a run may burst up to qpm * window requests.
+RATE_LIMIT_WINDOW_MINUTES = 10
+
+
+@dataclass
+class SubredditPlan:
+    name: str
+    top_requests: int
+    new_requests: int
+    ttf_requests: int
+    weekly_posts: Optional[int]  # from history; None when estimating the worst case
+    basis: str
+    # Batched /api/info lookups for posts tracked from earlier runs.
+    refresh_requests: int = 0
+    # Batched /api/info lookups settling posts the response-time heatmap is waiting on.
+    settle_requests: int = 0
+
+    @property
+    def total_requests(self) -> int:
+        return (
+            self.top_requests + self.new_requests + self.ttf_requests + self.refresh_requests + self.settle_requests
+        )
+
+
+@dataclass
+class RunPlan:
+    subreddits: List[SubredditPlan]
+    total_requests: int
+    estimated_seconds: float
+    schedule_minutes: int
+    qpm: int
+    warnings: List[str] = field(default_factory=list)
+
+
+def _pages(limit: int) -> int:
+    return max(math.ceil(limit / LISTING_PAGE_SIZE), 1)
+
+
+def plan_subreddit(
+    sub_cfg: SubredditConfig, history: Sequence[HistoryEntry], tracked_posts: int = 0, pending_heatmap_posts: int = 0
+) -> SubredditPlan:
+    """
+    Estimate requests for one collect_weekly_report call.
+
+    /top and /new cost one request per page. Time-to-first-comment sampling costs one
+    request per post checked: every in-window post that has comments, up to TTF_SAMPLE_CAP.
+    Refreshing ``tracked_posts`` costs one /api/info request per 100 ids; this is an
+    upper bound, since tracked posts the /new scan returns are not looked up. Settling
+    ``pending_heatmap_posts`` costs the same per 100 ids (an upper bound too: only the
+    ones at least a day old are looked up).
+    """
+    recent_limit = recent_listing_limit(sub_cfg.top_posts_limit, sub_cfg.unanswered_limit)
+    recent = recent_history_for_subreddit(list(history), sub_cfg.name, limit=1)
+    if recent:
+        weekly_posts: Optional[int] = recent[0].total_posts
+        in_window = min(recent_limit, weekly_posts)
+        unanswered = round(in_window * recent[0].unanswered_rate)
+        basis = f"history {recent[0].date}"
+    else:
+        weekly_posts = None
+        in_window = recent_limit
+        unanswered = 0
+        basis = "no history (worst case)"
+    ttf_requests = min(TTF_SAMPLE_CAP, max(in_window - unanswered, 0))
+    return SubredditPlan(
+        name=sub_cfg.name,
+        top_requests=_pages(sub_cfg.top_posts_limit),
+        new_requests=_pages(recent_limit),
+        ttf_requests=ttf_requests,
+        weekly_posts=weekly_posts,
+        basis=basis,
+        refresh_requests=math.ceil(tracked_posts / INFO_BATCH_SIZE),
+        settle_requests=math.ceil(pending_heatmap_posts / INFO_BATCH_SIZE),
+    )
+
+
+def plan_run(
+    subreddit_names: Sequence[str],
+    subreddit_configs: Dict[str, SubredditConfig],
+    history: Sequence[HistoryEntry],
+    default_top_limit: int = 10,
+    schedule_minutes: int = 60,
+    qpm: int = DEFAULT_QPM,
+    request_latency_seconds: float = DEFAULT_REQUEST_LATENCY_SECONDS,
+    tracked_counts: Optional[Dict[str, int]] = None,
+    pending_heatmap_counts: Optional[Dict[str, int]] = None,
+) -> RunPlan:
+    tracked_counts = tracked_counts or {}
+    pending_heatmap_counts = pending_heatmap_counts or {}
+    plans = [
+        plan_subreddit(
+            subreddit_configs.get(name, SubredditConfig(name=name, top_posts_limit=default_top_limit)),
+            history,
+            tracked_posts=tracked_counts.get(name.lower(), 0),
+            pending_heatmap_posts=pending_heatmap_counts.get(name.lower(), 0),
+        )
+        for name in subreddit_names
+    ]
+    total = AUTH_REQUESTS + sum(p.total_requests for p in plans)
+    # Requests are sequential: bounded below by latency and by the rate limit.
+    estimated_seconds = max(total * request_latency_seconds, total / qpm * 60.0)
+
+    warnings: List[str] = []
+    # Also covers total > qpm * schedule_minutes: the estimate is never below total / qpm minutes.
+    if estimated_seconds > schedule_minutes * 60:
+        warnings.append(
+            f"Estimated run time {estimated_seconds / 60:.1f} min exceeds the {schedule_minutes} min schedule"
+        )
+    burst = qpm * RATE_LIMIT_WINDOW_MINUTES
+    if total > burst:
+        warnings.append(
+            f"{total} requests exceed one {RATE_LIMIT_WINDOW_MINUTES} min rate-limit window ({burst}); "
+            "expect backoff sleeps"
+        )
+    return RunPlan(
+        subreddits=plans,
+        total_requests=total,
+        estimated_seconds=estimated_seconds,
+        schedule_minutes=schedule_minutes,
+        qpm=qpm,
+        warnings=warnings,
+    )
+
+
+def format_plan(plan: RunPlan) -> str:
+    lines = ["# API budget plan", ""]
+    lines.append("| Subreddit | /top | /new | TTF | Refresh | Settle | Total | Basis |")
+    lines.append("|---|---:|---:|---:|---:|---:|---:|---|")
+    for p in plan.subreddits:
+        lines.append(
+            f"| {p.name} | {p.top_requests} | {p.new_requests} | {p.ttf_requests} | {p.refresh_requests} "
+            f"| {p.settle_requests} | {p.total_requests} | {p.basis} |"
+        )
+    lines.append("")
+    lines.append(f"- Total requests (incl. auth): {plan.total_requests}")
+    lines.append(f"- Estimated run time: {plan.estimated_seconds / 60:.1f} min at {plan.qpm} QPM")
+    lines.append(
+        f"- Budget used per {plan.schedule_minutes} min run: {plan.total_requests / (plan.qpm * plan.schedule_minutes):.1%}"
+    )
+    burst = plan.qpm * RATE_LIMIT_WINDOW_MINUTES
+    lines.append(
+        f"- Burst headroom: {max(burst - plan.total_requests, 0)} of {burst} requests left "
+        f"in a {RATE_LIMIT_WINDOW_MINUTES} min rate-limit window"
+    )
+    for warning in plan.warnings:
+        lines.append(f"- WARNING: {warning}")
+    return "\n".join(lines)
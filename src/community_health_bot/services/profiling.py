@@ -0,0 +1,86 @@
+import cProfile
+import io
+import pstats
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# cProfile cannot profile two runs at once (Python 3.12+ raises ValueError, older
+# versions mix their stats), so concurrent runs (UI sessions) take turns through this.
+_ACTIVE_RUN = threading.Lock()
+
+
+class RunProfiler:
+    """
+    Deterministic (cProfile) profiling of labelled regions of a run.
+
+    Each label accumulates into its own profile across repeated entries, e.g. one
+    ``collect`` profile covering every subreddit. When disabled, ``profile`` is a no-op.
+    """
+
+    def __init__(self, output_dir: Path, enabled: bool = True, top_n: int = 25) -> None:
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.top_n = top_n
+        self.profiles: Dict[str, cProfile.Profile] = {}
+
+    @contextmanager
+    def exclusive(self) -> Iterator[bool]:
+        """Hold the process-wide profiling slot for a run; yields False (and disables profiling) if it is taken."""
+        if not self.enabled or not _ACTIVE_RUN.acquire(blocking=False):
+            self.enabled = False
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _ACTIVE_RUN.release()
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        profiler = self.profiles.setdefault(label, cProfile.Profile())
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    def summary(self, sort_by: str = "cumulative") -> str:
+        """Top-N hot functions per label, then across all labels by own time."""
+        if not self.profiles:
+            return ""
+        buffer = io.StringIO()
+        for label, profiler in self.profiles.items():
+            buffer.write(f"==== {label} (top {self.top_n} by {sort_by}) ====\n")
+            pstats.Stats(profiler, stream=buffer).sort_stats(sort_by).print_stats(self.top_n)
+        combined: Optional[pstats.Stats] = None
+        for profiler in self.profiles.values():
+            if combined is None:
+                combined = pstats.Stats(profiler, stream=buffer)
+            else:
+                combined.add(profiler)
+        if combined is not None:
+            buffer.write(f"==== all regions (top {self.top_n} by tottime) ====\n")
+            combined.sort_stats("tottime").print_stats(self.top_n)
+        return buffer.getvalue()
+
+    def write(self) -> List[Path]:
+        """Dump one .prof file per label (loadable with pstats/snakeviz) plus a text summary."""
+        if not self.profiles:
+            return []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        written: List[Path] = []
+        for label, profiler in self.profiles.items():
+            path = self.output_dir / f"profile_{stamp}_{label}.prof"
+            profiler.dump_stats(str(path))
+            written.append(path)
+        summary_path = self.output_dir / f"profile_{stamp}_top.txt"
+        summary_path.write_text(self.summary(), encoding="utf-8")
+        written.append(summary_path)
+        return written
@@ -0,0 +1,148 @@
+"""
+Process-wide cache of collected subreddit reports, refreshed in the background.
+
+Reports are keyed by (subreddit, config fingerprint) and tagged with the time
+bucket they were collected in. A report from an earlier bucket is still served,
+marked stale, while a worker refreshes it. Concurrent refresh requests for the
+same (subreddit, config, bucket) share one in-flight collection, so many
+dashboard users do not multiply Reddit API calls.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from ..config.settings import SubredditConfig
+from ..core.models import SubredditReport
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass
+class CachedReport:
+    report: SubredditReport
+    fetched_at: float
+    bucket: int
+
+
+def config_fingerprint(sub_cfg: SubredditConfig) -> str:
+    """Stable hash of the settings that change what collect_weekly_report returns."""
+    payload = json.dumps(
+        [
+            sub_cfg.top_posts_limit,
+            sub_cfg.unanswered_limit,
+            sorted((sub_cfg.include_sections or {}).items()),
+            sorted(sub_cfg.question_keywords),
+        ]
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ReportCache:
+    def __init__(
+        self,
+        max_workers: int = 4,
+        bucket_seconds: int = 3600,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.deduplicated = 0
+        self._entries: "OrderedDict[CacheKey, CachedReport]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str, int], Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-refresh")
+
+    def key(self, sub_cfg: SubredditConfig) -> CacheKey:
+        return sub_cfg.name.lower(), config_fingerprint(sub_cfg)
+
+    def current_bucket(self) -> int:
+        return int(self.clock() // self.bucket_seconds)
+
+    def get(self, sub_cfg: SubredditConfig) -> Tuple[Optional[CachedReport], bool]:
+        """Return (cached report or None, whether it belongs to the current bucket)."""
+        key = self.key(sub_cfg)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            fresh = entry.bucket == self.current_bucket()
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry, fresh
+
+    def refresh(self, sub_cfg: SubredditConfig, collect: Callable[[], SubredditReport]) -> Future:
+        """
+        Collect a report on a worker thread and store it; returns a Future of the CachedReport.
+
+        If a refresh for the same subreddit, config and bucket is already running,
+        its Future is returned instead of starting another one.
+        """
+        key = self.key(sub_cfg)
+        bucket = self.current_bucket()
+        flight_key = (key[0], key[1], bucket)
+        with self._lock:
+            running = self._in_flight.get(flight_key)
+            if running is not None:
+                self.deduplicated += 1
+                return running
+            self.refreshes += 1
+            # Submitted under the lock, so _collect cannot forget the flight before it is registered.
+            future = self._executor.submit(self._collect, key, bucket, collect)
+            self._in_flight[flight_key] = future
+        return future
+
+    def get_or_refresh(
+        self, sub_cfg: SubredditConfig, collect: Callable[[], SubredditReport]
+    ) -> Tuple[Optional[CachedReport], Optional[Future]]:
+        """Serve whatever is cached and start a refresh if it is missing or stale."""
+        entry, fresh = self.get(sub_cfg)
+        if fresh:
+            return entry, None
+        return entry, self.refresh(sub_cfg, collect)
+
+    def _collect(self, key: CacheKey, bucket: int, collect: Callable[[], SubredditReport]) -> CachedReport:
+        # The flight is forgotten here, before the Future resolves, so callers never see it finished but in flight.
+        flight_key = (key[0], key[1], bucket)
+        try:
+            entry = CachedReport(report=collect(), fetched_at=self.clock(), bucket=bucket)
+        except BaseException:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+            raise
+        with self._lock:
+            self._in_flight.pop(flight_key, None)
+            current = self._entries.get(key)
+            # A slow refresh must not overwrite a newer bucket's report.
+            if current is None or current.bucket <= bucket:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
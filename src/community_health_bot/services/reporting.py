@@ -1,8 +1,16 @@
+import hashlib
+import heapq
+import os
+import shutil
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from ..core.models import HistoryEntry, SubredditReport, Trend, UnansweredSummary
+from ..core.models import Anomaly, HistoryEntry, ResponseHeatmap, SubredditReport, Trend, UnansweredSummary
+from .archive import ArchiveWriter
 
 
 def _fmt_percentage(value: float) -> str:
@@ -66,75 +74,307 @@ def _format_history(history: List[HistoryEntry]) -> List[str]:
     return lines
 
 
-def build_markdown(subreddit_names: Iterable[str], reports: Dict[str, SubredditReport]) -> str:
-    lines = []
-    lines.append("# Weekly Community Health Summary")
-    lines.append(f"_Generated on {datetime.now(timezone.utc).date()}_")
+_ANOMALY_LABELS: Dict[str, Tuple[str, Callable[[float], str]]] = {
+    "total_posts": ("Posts", lambda value: f"{value:.0f}"),
+    "unanswered_rate": ("Unanswered rate", _fmt_percentage),
+    "median_ttf_minutes": ("Median time to first comment", _fmt_minutes),
+}
 
+
+def _format_anomalies(anomalies: List[Anomaly]) -> List[str]:
+    lines: List[str] = []
+    for anomaly in anomalies:
+        label, fmt = _ANOMALY_LABELS.get(anomaly.metric, (anomaly.metric, lambda value: f"{value:g}"))
+        direction = "above" if anomaly.zscore > 0 else "below"
+        lines.append(
+            f"- {label} {fmt(anomaly.value)} is {abs(anomaly.zscore):.1f} std devs {direction} "
+            f"the recent mean of {fmt(anomaly.mean)} (EWMA {fmt(anomaly.ewma)})"
+        )
+    return lines
+
+
+def _format_header() -> List[str]:
+    return [
+        "# Weekly Community Health Summary",
+        f"_Generated on {datetime.now(timezone.utc).date()}_",
+    ]
+
+
+def _format_stats(report: SubredditReport) -> List[str]:
+    metrics = report.metrics
+    lines: List[str] = ["### Stats"]
+    lines.append(f"- Posts this week: {metrics.total_posts}")
+    lines.append(f"- Unanswered rate: {_fmt_percentage(metrics.unanswered_rate) if metrics.total_posts else 'n/a'}")
+    ttf = (
+        _fmt_minutes(metrics.median_time_to_first_comment_minutes)
+        if metrics.median_time_to_first_comment_minutes is not None
+        else "n/a"
+    )
+    lines.append(f"- Median time to first comment: {ttf}")
+    lines.append(f"- Post type mix: {_fmt_top_items(metrics.post_type_mix)}")
+    lines.append(f"- Top flairs: {_fmt_top_items(metrics.flair_distribution)}")
+    return lines
+
+
+def _format_trends_section(report: SubredditReport) -> List[str]:
+    lines: List[str] = ["### Trends vs previous week"]
+    lines.extend(_format_trends(report.trends))
+    lines.append("")
+    lines.append("### Recent history (last runs)")
+    lines.extend(_format_history(getattr(report, "history", [])))
+    anomalies = getattr(report, "anomalies", [])
+    if anomalies:
+        lines.append("### Anomalies")
+        lines.extend(_format_anomalies(anomalies))
+    return lines
+
+
+def _format_posts_section(report: SubredditReport) -> List[str]:
+    lines: List[str] = ["### Top posts this week"]
+    if not report.top_posts:
+        lines.append("- No data")
+    else:
+        for post in report.top_posts:
+            lines.append(f"- [{post.title}]({post.permalink}) | score: {post.score} | comments: {post.comments}")
+
+    lines.append("### Rising posts (score velocity)")
+    if not report.rising_posts:
+        lines.append("- None detected")
+    else:
+        for post in report.rising_posts:
+            lines.append(f"- [{post.title}]({post.permalink}) | score: {post.score} | comments: {post.comments}")
+    return lines
+
+
+def _format_unanswered_section(report: SubredditReport) -> List[str]:
+    lines: List[str] = ["### Unanswered recent posts"]
+    lines.extend(_format_unanswered(report.unanswered))
+    lines.append("### Aging unanswered (48-120h)")
+    lines.extend(_format_unanswered(getattr(report, "aging_unanswered", [])))
+    return lines
+
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# Upper bounds in minutes for a cell's median time to first comment, and the glyph for each band.
+_HEATMAP_BOUNDS = (15.0, 60.0, 240.0)
+_HEATMAP_GLYPHS = ".:+#"
+
+
+def _heatmap_row(heatmap: ResponseHeatmap, day: int) -> str:
+    glyphs: List[str] = []
+    for cell in range(day * 24, day * 24 + 24):
+        ttf = heatmap.median_ttf_minutes[cell]
+        if ttf is not None:
+            glyphs.append(_HEATMAP_GLYPHS[bisect_right(_HEATMAP_BOUNDS, ttf)])
+        elif heatmap.unanswered[cell]:
+            glyphs.append("#")
+        else:
+            glyphs.append("-" if heatmap.posts[cell] else " ")
+    return "".join(glyphs)
+
+
+def _format_heatmap_section(report: SubredditReport) -> List[str]:
+    heatmap = getattr(report, "heatmap", None)
+    if heatmap is None:
+        return []
+    lines: List[str] = ["### Response-time heatmap (UTC, by hour posted)"]
+    if not any(heatmap.posts) and not any(heatmap.ttf_samples):
+        lines.append("- No settled posts yet")
+        return lines
+    lines.append("```")
+    lines.append("    0     6     12    18")
+    for day, label in enumerate(_WEEKDAYS):
+        lines.append(f"{label} {_heatmap_row(heatmap, day)}".rstrip())
+    lines.append("```")
+    lines.append("- Median first reply: `.` <15 min, `:` <1h, `+` <4h, `#` 4h+ or unanswered, `-` no sample")
+
+    posts, unanswered, median_ttf = heatmap.posts, heatmap.unanswered, heatmap.median_ttf_minutes
+    slowest = heapq.nlargest(
+        3,
+        (cell for cell in range(len(posts)) if posts[cell]),
+        key=lambda cell: (unanswered[cell] / posts[cell], median_ttf[cell] or 0.0),
+    )
+    for cell in slowest:
+        ttf = median_ttf[cell]
+        lines.append(
+            f"- Slow slot {_WEEKDAYS[cell // 24]} {cell % 24:02d}:00: {unanswered[cell]}/{posts[cell]}"
+            f" unanswered, median first reply {_fmt_minutes(ttf) if ttf is not None else 'n/a'}"
+        )
+    return lines
+
+
+# Section key -> (content the section is rendered from, formatter).
+_SECTIONS: List[Tuple[str, Callable[[SubredditReport], object], Callable[[SubredditReport], List[str]]]] = [
+    ("stats", lambda r: r.metrics, _format_stats),
+    (
+        "trends",
+        lambda r: (r.trends, getattr(r, "history", []), getattr(r, "anomalies", [])),
+        _format_trends_section,
+    ),
+    ("top_posts", lambda r: (r.top_posts, r.rising_posts), _format_posts_section),
+    ("unanswered", lambda r: (r.unanswered, getattr(r, "aging_unanswered", [])), _format_unanswered_section),
+    ("heatmap", lambda r: getattr(r, "heatmap", None), _format_heatmap_section),
+]
+
+
+class SectionCache:
+    """
+    LRU cache of rendered report sections keyed by a hash of the section's content.
+
+    Reports that have not changed between renders (e.g. repeated UI refreshes)
+    reuse the previously formatted lines instead of formatting them again. One
+    instance may be shared by several UI sessions, so lookups and evictions take a
+    lock; formatting a miss happens outside it.
+    """
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        section: str,
+        content: object,
+        report: SubredditReport,
+        formatter: Callable[[SubredditReport], List[str]],
+    ) -> Tuple[str, ...]:
+        key = (section, hashlib.blake2b(repr(content).encode("utf-8"), digest_size=16).hexdigest())
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        rendered = tuple(formatter(report))
+        with self._lock:
+            self._entries[key] = rendered
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _format_subreddit(name: str, report: SubredditReport, cache: Optional[SectionCache] = None) -> List[str]:
+    lines: List[str] = [f"\n## {name}"]
+
+    # Decide which sections to show; default to all if not provided.
+    include_sections: Dict[str, bool] = getattr(report, "include_sections", {}) or {
+        "stats": True,
+        "trends": True,
+        "top_posts": True,
+        "unanswered": True,
+        "heatmap": True,
+    }
+
+    for section, content, formatter in _SECTIONS:
+        if not include_sections.get(section, True):
+            continue
+        if cache is None:
+            lines.extend(formatter(report))
+        else:
+            lines.extend(cache.render(section, content(report), report, formatter))
+    return lines
+
+
+def iter_markdown(
+    subreddit_names: Iterable[str],
+    reports: Dict[str, SubredditReport],
+    cache: Optional[SectionCache] = None,
+) -> Iterator[str]:
+    """
+    Yield the summary as chunks: the header, then one chunk per subreddit.
+
+    Concatenating the chunks gives exactly the same text as build_markdown.
+    """
+    yield "\n".join(_format_header())
     for name in subreddit_names:
-        report = reports[name]
-        metrics = report.metrics
-
-        lines.append(f"\n## {name}")
-
-        # Decide which sections to show; default to all if not provided.
-        include_sections: Dict[str, bool] = getattr(report, "include_sections", {}) or {
-            "stats": True,
-            "trends": True,
-            "top_posts": True,
-            "unanswered": True,
-        }
-
-        if include_sections.get("stats", True):
-            lines.append("### Stats")
-            lines.append(f"- Posts this week: {metrics.total_posts}")
-            lines.append(f"- Unanswered rate: {_fmt_percentage(metrics.unanswered_rate) if metrics.total_posts else 'n/a'}")
-            ttf = (
-                _fmt_minutes(metrics.median_time_to_first_comment_minutes)
-                if metrics.median_time_to_first_comment_minutes is not None
-                else "n/a"
-            )
-            lines.append(f"- Median time to first comment: {ttf}")
-            lines.append(f"- Post type mix: {_fmt_top_items(metrics.post_type_mix)}")
-            lines.append(f"- Top flairs: {_fmt_top_items(metrics.flair_distribution)}")
-
-        if include_sections.get("trends", True):
-            lines.append("### Trends vs previous week")
-            lines.extend(_format_trends(report.trends))
-            lines.append("")
-            lines.append("### Recent history (last runs)")
-            lines.extend(_format_history(getattr(report, "history", [])))
-
-        if include_sections.get("top_posts", True):
-            lines.append("### Top posts this week")
-            if not report.top_posts:
-                lines.append("- No data")
-            else:
-                for post in report.top_posts:
-                    lines.append(
-                        f"- [{post.title}]({post.permalink}) | score: {post.score} | comments: {post.comments}"
-                    )
-
-        if include_sections.get("top_posts", True):
-            lines.append("### Rising posts (score velocity)")
-            if not report.rising_posts:
-                lines.append("- None detected")
-            else:
-                for post in report.rising_posts:
-                    lines.append(
-                        f"- [{post.title}]({post.permalink}) | score: {post.score} | comments: {post.comments}"
-                    )
-
-        if include_sections.get("unanswered", True):
-            lines.append("### Unanswered recent posts")
-            lines.extend(_format_unanswered(report.unanswered))
-            lines.append("### Aging unanswered (48-120h)")
-            lines.extend(_format_unanswered(getattr(report, "aging_unanswered", [])))
-    return "\n".join(lines)
-
-
-def write_output(output_dir: Path, markdown: str) -> Path:
+        yield "\n" + "\n".join(_format_subreddit(name, reports[name], cache))
+
+
+def build_markdown(
+    subreddit_names: Iterable[str],
+    reports: Dict[str, SubredditReport],
+    cache: Optional[SectionCache] = None,
+) -> str:
+    return "".join(iter_markdown(subreddit_names, reports, cache))
+
+
+LATEST_SUMMARY_FILENAME = "summary_latest.md"
+
+
+def _publish_summary(tmp_path: Path, out_path: Path) -> None:
+    """
+    Move a fully written summary into place and repoint ``summary_latest.md`` at it.
+
+    The pointer is a hard link, so it carries the dated file's mtime and expires
+    with it under the 48h ``purge_older_than``; after two days without a run
+    there is deliberately no latest summary left on disk.
+    """
+    os.replace(tmp_path, out_path)
+    latest = out_path.with_name(LATEST_SUMMARY_FILENAME)
+    latest_tmp = latest.with_name(f".{latest.name}.{os.getpid()}.tmp")
+    if latest_tmp.exists():
+        latest_tmp.unlink()
+    try:
+        # A hard link avoids a second copy; fall back to copying where links are unsupported.
+        os.link(out_path, latest_tmp)
+    except OSError:
+        shutil.copyfile(out_path, latest_tmp)
+    os.replace(latest_tmp, latest)
+
+
+def stream_output(
+    output_dir: Path,
+    chunks: Iterable[str],
+    echo: Optional[TextIO] = None,
+    excerpt_chars: int = 1500,
+    archive: Optional[ArchiveWriter] = None,
+) -> Tuple[Path, str]:
+    """
+    Write markdown chunks to the summary file (and optionally echo them) in one pass.
+
+    Only the first ``excerpt_chars`` characters are retained in memory; they are
+    returned alongside the output path for use as a webhook excerpt. The file is
+    written under a temp name and renamed once complete, so readers of
+    ``summary_<date>.md`` or ``summary_latest.md`` never see a partial summary.
+    With ``archive``, each chunk is also hashed and compressed into the summary
+    archive, which is committed once the summary is in place.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
     out_path = output_dir / f"summary_{datetime.now().date()}.md"
-    out_path.write_text(markdown, encoding="utf-8")
-    return out_path
+    tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    excerpt: List[str] = []
+    excerpt_len = 0
+    try:
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+                if archive is not None:
+                    archive.write(chunk)
+                if echo is not None:
+                    echo.write(chunk)
+                if excerpt_len < excerpt_chars:
+                    piece = chunk[: excerpt_chars - excerpt_len]
+                    excerpt.append(piece)
+                    excerpt_len += len(piece)
+        _publish_summary(tmp_path, out_path)
+        if archive is not None:
+            archive.commit()
+    except BaseException:
+        if archive is not None:
+            archive.discard()
+        raise
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    if echo is not None:
+        echo.write("\n")
+    return out_path, "".join(excerpt)
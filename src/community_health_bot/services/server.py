@@ -0,0 +1,348 @@
+"""
+Read-only HTTP API over the artifacts a collector run leaves in ``OUTPUT_DIR``.
+
+Readers get the latest exported reports (``reports_<date>.ndjson``, written
+with ``--export ndjson``), the latest rendered summary and slices of
+``metrics_history.csv`` without touching the Reddit API:
+
+    GET /                    index of endpoints and known subreddits
+    GET /reports             latest reports as NDJSON
+    GET /reports/<name>      one subreddit's report as JSON
+    GET /summary             latest summary markdown (``summary_latest.md``)
+    GET /summary/<name>      one subreddit's section of it
+    GET /history[?limit=N]   history rows as JSON (newest first)
+    GET /history/<name>      one subreddit's recent history (default 6 rows)
+
+``<name>`` may be given with or without the ``r/`` prefix. Bodies are built
+once per artifact version (keyed by inode, size and mtime) and served with a
+strong ETag; ``If-None-Match`` gets a 304, and clients that accept gzip get
+the compressed body, also built once.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import Logger
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .history import HistoryCache, recent_history_for_subreddit
+from .logging import log_json
+from .reporting import LATEST_SUMMARY_FILENAME
+
+HISTORY_FILENAME = "metrics_history.csv"
+SUMMARY_GLOB = "summary_*.md"
+REPORTS_GLOB = "reports_*.ndjson"
+DEFAULT_HISTORY_LIMIT = 6
+MAX_HISTORY_LIMIT = 1000
+# Smaller bodies are not worth compressing.
+GZIP_MIN_BYTES = 256
+
+JSON_TYPE = "application/json; charset=utf-8"
+NDJSON_TYPE = "application/x-ndjson; charset=utf-8"
+MARKDOWN_TYPE = "text/markdown; charset=utf-8"
+
+
+class NotFound(Exception):
+    pass
+
+
+class Representation:
+    __slots__ = ("body", "content_type", "etag", "_gzipped")
+
+    def __init__(self, body: bytes, content_type: str) -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._gzipped: Optional[bytes] = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def subreddit_key(name: str) -> str:
+    name = name.strip().lower()
+    return name[2:] if name.startswith("r/") else name
+
+
+def latest_artifact(output_dir: Path, pattern: str) -> Optional[Path]:
+    # Names end in an ISO date, so the greatest name is the newest day.
+    return max(output_dir.glob(pattern), key=lambda path: path.name, default=None)
+
+
+def latest_summary(output_dir: Path) -> Optional[Path]:
+    """``summary_latest.md`` when present, else the newest dated summary."""
+    latest = output_dir / LATEST_SUMMARY_FILENAME
+    if latest.exists():
+        return latest
+    dated = (path for path in output_dir.glob(SUMMARY_GLOB) if path.name != LATEST_SUMMARY_FILENAME)
+    return max(dated, key=lambda path: path.name, default=None)
+
+
+def _signature(path: Optional[Path]) -> Optional[Tuple[str, int, int, int]]:
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return str(path), stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _json_body(payload: object) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _markdown_sections(text: str) -> Dict[str, str]:
+    """Split a summary into its per-subreddit sections, keyed by ``subreddit_key``."""
+    sections: Dict[str, str] = {}
+    current: Optional[str] = None
+    lines: List[str] = []
+    for line in text.splitlines():
+        if line.startswith("## "):
+            if current is not None:
+                sections[current] = "\n".join(lines).strip() + "\n"
+            current, lines = subreddit_key(line[3:]), [line]
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        sections[current] = "\n".join(lines).strip() + "\n"
+    return sections
+
+
+class ArtifactReader:
+    """Resolves API paths to response bodies, memoized per artifact version."""
+
+    def __init__(self, output_dir: Path, max_entries: int = 256) -> None:
+        self.output_dir = output_dir
+        self.max_entries = max_entries
+        self.history = HistoryCache(output_dir / HISTORY_FILENAME)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Representation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, path: str, query: Dict[str, List[str]]) -> Representation:
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        # "/reports/r/python" and "/reports/python" name the same subreddit.
+        if len(parts) == 3 and parts[1].lower() == "r":
+            parts = [parts[0], parts[2]]
+        route = parts[0] if parts else ""
+        name = subreddit_key(parts[1]) if len(parts) == 2 else None
+        if len(parts) > 2:
+            raise NotFound(path)
+
+        if route == "":
+            reports = latest_artifact(self.output_dir, REPORTS_GLOB)
+            summary = latest_summary(self.output_dir)
+            key = ("index", _signature(reports), _signature(summary))
+            return self._memo(key, lambda: self._index(reports, summary))
+        if route == "reports":
+            reports = latest_artifact(self.output_dir, REPORTS_GLOB)
+            if reports is None:
+                raise NotFound("no exported reports yet (run with --export ndjson)")
+            return self._memo(("reports", name, _signature(reports)), lambda: self._reports(reports, name))
+        if route == "summary":
+            summary = latest_summary(self.output_dir)
+            if summary is None:
+                raise NotFound("no summary yet")
+            return self._memo(("summary", name, _signature(summary)), lambda: self._summary(summary, name))
+        if route == "history":
+            limit = self._limit(query, DEFAULT_HISTORY_LIMIT if name else MAX_HISTORY_LIMIT)
+            key = ("history", name, limit, _signature(self.history.path))
+            return self._memo(key, lambda: self._history(name, limit))
+        raise NotFound(path)
+
+    def _memo(self, key: tuple, build: Callable[[], Representation]) -> Representation:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+        representation = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = representation
+            # Superseded artifact versions age out of the LRU.
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return representation
+
+    @staticmethod
+    def _limit(query: Dict[str, List[str]], default: int) -> int:
+        try:
+            limit = int(query.get("limit", [default])[0])
+        except ValueError:
+            return default
+        return max(1, min(limit, MAX_HISTORY_LIMIT))
+
+    def _read_lines(self, path: Path) -> List[str]:
+        try:
+            return path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            raise NotFound(path.name) from None
+
+    def _index(self, reports: Optional[Path], summary: Optional[Path]) -> Representation:
+        subreddits = [subreddit for subreddit, _ in self._report_lines(reports)] if reports else []
+        payload = {
+            "endpoints": ["/reports", "/reports/<name>", "/summary", "/summary/<name>", "/history", "/history/<name>"],
+            "reports": reports.name if reports else None,
+            "summary": summary.name if summary else None,
+            "subreddits": subreddits,
+        }
+        return Representation(_json_body(payload), JSON_TYPE)
+
+    def _reports(self, path: Path, name: Optional[str]) -> Representation:
+        if name is None:
+            try:
+                return Representation(path.read_bytes(), NDJSON_TYPE)
+            except OSError:
+                raise NotFound(path.name) from None
+        for subreddit, line in self._report_lines(path):
+            if subreddit_key(subreddit) == name:
+                return Representation(line.encode("utf-8"), JSON_TYPE)
+        raise NotFound(f"no report for {name}")
+
+    def _report_lines(self, path: Path) -> Iterator[Tuple[str, str]]:
+        """Yield (subreddit, line) per NDJSON report, skipping truncated or corrupt lines."""
+        for line in self._read_lines(path):
+            try:
+                subreddit = json.loads(line)["subreddit"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if isinstance(subreddit, str):
+                yield subreddit, line
+
+    def _summary(self, path: Path, name: Optional[str]) -> Representation:
+        if name is None:
+            try:
+                return Representation(path.read_bytes(), MARKDOWN_TYPE)
+            except OSError:
+                raise NotFound(path.name) from None
+        section = _markdown_sections("\n".join(self._read_lines(path))).get(name)
+        if section is None:
+            raise NotFound(f"no summary section for {name}")
+        return Representation(section.encode("utf-8"), MARKDOWN_TYPE)
+
+    def _history(self, name: Optional[str], limit: int) -> Representation:
+        entries = self.history.load()
+        if name is None:
+            rows = sorted(entries, key=lambda e: e.date, reverse=True)[:limit]
+        else:
+            matching = [entry for entry in entries if subreddit_key(entry.subreddit) == name]
+            if not matching:
+                raise NotFound(f"no history for {name}")
+            rows = recent_history_for_subreddit(matching, matching[0].subreddit, limit)
+        return Representation(_json_body([asdict(entry) for entry in rows]), JSON_TYPE)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = {tag.strip() for tag in header.split(",")}
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    return "*" in tags or etag in {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "CommunityHealthBot"
+    protocol_version = "HTTP/1.1"
+    reader: ArtifactReader
+    logger: Optional[Logger] = None
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        try:
+            representation = self.reader.resolve(url.path, parse_qs(url.query))
+        except NotFound as exc:
+            representation = Representation(_json_body({"error": str(exc) or "not found"}), JSON_TYPE)
+            self._send(404, representation, representation.body, None, send_body)
+            return
+        except Exception as exc:  # noqa: BLE001 - answer with an error instead of dropping the connection
+            if self.logger is not None:
+                log_json(self.logger, "http_error", path=url.path, error=repr(exc))
+            representation = Representation(_json_body({"error": "internal error"}), JSON_TYPE)
+            self._send(500, representation, representation.body, None, send_body)
+            return
+        use_gzip = len(representation.body) >= GZIP_MIN_BYTES and _accepts_gzip(self.headers.get("Accept-Encoding"))
+        # Each encoding is its own representation, so it gets its own ETag.
+        etag = representation.etag[:-1] + '-gz"' if use_gzip else representation.etag
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        body = representation.gzipped() if use_gzip else representation.body
+        self._send(200, representation, body, etag, send_body, "gzip" if use_gzip else None)
+
+    def _send(
+        self,
+        status: int,
+        representation: Representation,
+        body: bytes,
+        etag: Optional[str],
+        send_body: bool,
+        encoding: Optional[str] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", representation.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.logger is not None:
+            log_json(self.logger, "http_request", client=self.client_address[0], request=format % args)
+
+
+def make_server(
+    output_dir: Path, host: str = "127.0.0.1", port: int = 8080, logger: Optional[Logger] = None
+) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"reader": ArtifactReader(output_dir), "logger": logger})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(output_dir: Path, host: str = "127.0.0.1", port: int = 8080, logger: Optional[Logger] = None) -> None:
+    server = make_server(output_dir, host, port, logger)
+    if logger is not None:
+        log_json(logger, "serving", host=host, port=server.server_address[1], output_dir=str(output_dir))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
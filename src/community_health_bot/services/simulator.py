@@ -0,0 +1,328 @@
+"""
+Local stand-in for the Reddit API, for offline concurrency and rate-limit testing.
+
+Serves the OAuth token endpoint, ``/r/{sub}/top``, ``/r/{sub}/new``,
+``/comments/{id}`` and ``/api/info`` from ``SyntheticReddit`` data, paginated like Reddit
+listings, with ``X-Ratelimit-*`` headers, 429s once the window budget is spent,
+and optional latency/error injection. Point the bot at it with
+``REDDIT_API_URL=http://127.0.0.1:8765``.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .synthetic import SyntheticProfile, SyntheticReddit, SyntheticSubmission, SyntheticSubreddit
+
+_TOKEN_PATH = re.compile(r"^/api/v1/access_token/?$")
+# PRAW requests "/r/r/name/..." when given "r/name"; accept both forms.
+_LISTING_PATH = re.compile(r"^/r/(?:r/)?([^/]+)/(top|new)/?(?:\.json)?$")
+_COMMENTS_PATH = re.compile(r"^(?:/r/[^/]+)?/comments/([a-z0-9]+)(?:/[^/]*)?/?(?:\.json)?$")
+_INFO_PATH = re.compile(r"^/api/info/?(?:\.json)?$")
+_TIME_FILTERS = ("hour", "day", "week", "month", "year", "all")
+
+
+@dataclass
+class SimulatorConfig:
+    seed: int = 0
+    # Reddit's OAuth budget: 600 requests per 10 minute window.
+    budget: int = 600
+    window_seconds: int = 600
+    latency_seconds: float = 0.0
+    latency_jitter_seconds: float = 0.0
+    # Fraction of API requests answered with a 5xx error.
+    error_rate: float = 0.0
+    page_size_max: int = 100
+
+
+class RedditSimulator:
+    def __init__(self, config: Optional[SimulatorConfig] = None, profile: Optional[SyntheticProfile] = None) -> None:
+        self.config = config or SimulatorConfig()
+        self.reddit = SyntheticReddit(seed=self.config.seed, profile=profile)
+        self.request_count = 0
+        self.throttled_count = 0
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._used = 0
+        self._new_cache: Dict[str, List[SyntheticSubmission]] = {}
+        self._new_iters: Dict[str, Any] = {}
+        self._top_cache: Dict[Tuple[str, str], List[SyntheticSubmission]] = {}
+        self._new_positions: Dict[str, int] = {}
+        self._by_id: Dict[str, SyntheticSubmission] = {}
+
+    # -- rate limiting -------------------------------------------------------------
+
+    def take_request(self) -> Tuple[bool, Dict[str, str]]:
+        """Account for one API request; returns (allowed, rate-limit headers)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.config.window_seconds:
+                self._window_start = now
+                self._used = 0
+            allowed = self._used < self.config.budget
+            if allowed:
+                self._used += 1
+            else:
+                self.throttled_count += 1
+            self.request_count += 1
+            reset = max(int(self.config.window_seconds - (now - self._window_start)), 0)
+            headers = {
+                "X-Ratelimit-Used": str(self._used),
+                "X-Ratelimit-Remaining": f"{float(self.config.budget - self._used):.1f}",
+                "X-Ratelimit-Reset": str(reset),
+            }
+        return allowed, headers
+
+    def inject_faults(self) -> Optional[int]:
+        """Sleep for the configured latency; maybe return an error status to send instead."""
+        with self._lock:
+            delay = self.config.latency_seconds + self._rng.uniform(0, self.config.latency_jitter_seconds)
+            fail = self._rng.random() < self.config.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return 503 if fail else None
+
+    # -- data ----------------------------------------------------------------------
+
+    def _subreddit(self, name: str) -> SyntheticSubreddit:
+        return self.reddit.subreddit(f"r/{name}")
+
+    def _new_posts(self, name: str, upto: int) -> List[SyntheticSubmission]:
+        """Materialise /new lazily, only as deep as clients paginate."""
+        key = name.lower()
+        with self._lock:
+            cache = self._new_cache.setdefault(key, [])
+            iterator = self._new_iters.setdefault(key, self._subreddit(name).iter_posts())
+            while len(cache) < upto:
+                post = next(iterator, None)
+                if post is None:
+                    break
+                self._new_positions[post.id] = len(cache)
+                cache.append(post)
+                self._by_id[post.id] = post
+            return cache
+
+    def _top_posts(self, name: str, time_filter: str) -> List[SyntheticSubmission]:
+        key = (name.lower(), time_filter)
+        with self._lock:
+            if key not in self._top_cache:
+                posts = list(self._subreddit(name).top(time_filter=time_filter, limit=None))
+                self._top_cache[key] = posts
+                for post in posts:
+                    self._by_id[post.id] = post
+            return self._top_cache[key]
+
+    def listing(self, name: str, sort: str, params: Dict[str, str]) -> Dict[str, Any]:
+        limit = min(max(int(params.get("limit", 25) or 25), 1), self.config.page_size_max)
+        after = params.get("after")
+        after_id = after[3:] if after and after.startswith("t3_") else None
+        # Like Reddit, an ``after`` that is not in this listing yields an empty page.
+        unknown = _listing([], None)
+        if after and after_id is None:
+            return unknown
+        if sort == "top":
+            time_filter = params.get("t", "day")
+            posts = self._top_posts(name, time_filter if time_filter in _TIME_FILTERS else "day")
+            start = next((i + 1 for i, p in enumerate(posts) if p.id == after_id), None) if after_id else 0
+            if start is None:
+                return unknown
+        else:
+            start = 0
+            if after_id:
+                cache = self._new_posts(name, 0)
+                with self._lock:
+                    position = self._new_positions.get(after_id)
+                # Positions are shared by all subreddits; check the id is in this one's /new.
+                if position is None or position >= len(cache) or cache[position].id != after_id:
+                    return unknown
+                start = position + 1
+            # One extra post tells us whether there is another page.
+            posts = self._new_posts(name, start + limit + 1)
+        page = posts[start : start + limit]
+        next_after = f"t3_{page[-1].id}" if page and len(posts) > start + limit else None
+        return _listing([{"kind": "t3", "data": _submission_data(p, name)} for p in page], next_after)
+
+    def info(self, ids: str) -> Dict[str, Any]:
+        """Batched lookup of posts already served, as ``/api/info?id=t3_a,t3_b``."""
+        children = []
+        for fullname in ids.split(",")[: self.config.page_size_max]:
+            with self._lock:
+                post = self._by_id.get(fullname[3:]) if fullname.startswith("t3_") else None
+            if post is not None:
+                children.append({"kind": "t3", "data": _submission_data(post, post.permalink.split("/")[2])})
+        return _listing(children, None)
+
+    def comments(self, post_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            post = self._by_id.get(post_id)
+        if post is None:
+            return None
+        name = post.permalink.split("/")[2]
+        children = [
+            {
+                "kind": "t1",
+                "data": {
+                    "id": f"{post.id}c{i}",
+                    "name": f"t1_{post.id}c{i}",
+                    "body": "Synthetic reply",
+                    "author": f"synthetic_user_{i}",
+                    "created_utc": comment.created_utc,
+                    "parent_id": f"t3_{post.id}",
+                    "link_id": f"t3_{post.id}",
+                    "subreddit": name,
+                    "score": 1,
+                    "replies": "",
+                },
+            }
+            for i, comment in enumerate(post.comments)
+        ]
+        return [
+            _listing([{"kind": "t3", "data": _submission_data(post, name)}], None),
+            _listing(children, None),
+        ]
+
+
+def _listing(children: List[Dict[str, Any]], after: Optional[str]) -> Dict[str, Any]:
+    return {"kind": "Listing", "data": {"after": after, "before": None, "dist": len(children), "children": children}}
+
+
+def _submission_data(post: SyntheticSubmission, subreddit: str) -> Dict[str, Any]:
+    return {
+        "id": post.id,
+        "name": post.fullname,
+        "title": post.title,
+        "score": post.score,
+        "num_comments": post.num_comments,
+        "created_utc": post.created_utc,
+        "link_flair_text": post.link_flair_text,
+        "is_self": post.is_self,
+        "is_video": post.is_video,
+        "is_gallery": post.is_gallery,
+        "poll_data": post.poll_data,
+        "permalink": post.permalink,
+        "url": f"https://reddit.com{post.permalink}",
+        "subreddit": subreddit,
+        "author": "synthetic_author",
+        "selftext": "",
+    }
+
+
+def _make_handler(simulator: RedditSimulator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - signature from base class
+            return
+
+        def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            if _TOKEN_PATH.match(urlsplit(self.path).path):
+                self._send_json(
+                    200,
+                    {"access_token": "simulated-token", "token_type": "bearer", "expires_in": 86400, "scope": "*"},
+                )
+                return
+            self._send_json(404, {"message": "Not Found", "error": 404})
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if not (self.headers.get("Authorization") or "").lower().startswith("bearer "):
+                self._send_json(401, {"message": "Unauthorized", "error": 401})
+                return
+            allowed, headers = simulator.take_request()
+            if not allowed:
+                self._send_json(429, {"message": "Too Many Requests", "error": 429}, headers)
+                return
+            error_status = simulator.inject_faults()
+            if error_status:
+                self._send_json(error_status, {"message": "Service Unavailable", "error": error_status}, headers)
+                return
+
+            match = _LISTING_PATH.match(url.path)
+            if match:
+                self._send_json(200, simulator.listing(match.group(1), match.group(2), params), headers)
+                return
+            if _INFO_PATH.match(url.path):
+                self._send_json(200, simulator.info(params.get("id", "")), headers)
+                return
+            match = _COMMENTS_PATH.match(url.path)
+            if match:
+                body = simulator.comments(match.group(1))
+                if body is not None:
+                    self._send_json(200, body, headers)
+                    return
+            self._send_json(404, {"message": "Not Found", "error": 404}, headers)
+
+    return Handler
+
+
+def start_simulator(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    config: Optional[SimulatorConfig] = None,
+    profile: Optional[SyntheticProfile] = None,
+) -> Tuple[ThreadingHTTPServer, RedditSimulator]:
+    """Start the simulator on a background thread; port 0 picks a free port."""
+    simulator = RedditSimulator(config, profile)
+    server = ThreadingHTTPServer((host, port), _make_handler(simulator))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="reddit-simulator", daemon=True)
+    thread.start()
+    return server, simulator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Reddit API simulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--posts-per-day", type=float, default=200.0)
+    parser.add_argument("--budget", type=int, default=600, help="Requests allowed per rate-limit window")
+    parser.add_argument("--window-seconds", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to each API request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests answered with 503")
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        seed=args.seed,
+        budget=args.budget,
+        window_seconds=args.window_seconds,
+        latency_seconds=args.latency,
+        latency_jitter_seconds=args.jitter,
+        error_rate=args.error_rate,
+    )
+    simulator = RedditSimulator(config, SyntheticProfile(posts_per_day=args.posts_per_day))
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(simulator))
+    print(f"Reddit simulator listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Seeded synthetic Reddit data for offline load testing.
+
+``SyntheticReddit`` mimics the small part of the PRAW surface that
+``collect_weekly_report`` uses (``reddit.subreddit(name).top/new`` and
+``post.comments``), so the real analytics code runs unchanged against it.
+Posts are generated lazily, newest first, so listings of millions of posts
+never materialise in memory.
+"""
+
+import heapq
+import math
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, List, Optional
+
+# Synthetic runs write under OUTPUT_DIR/synthetic so their history, trend state and stores
+# never mix with real data.
+SYNTHETIC_OUTPUT_DIRNAME = "synthetic"
+_TIME_FILTERS = {"hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400}
+_QUESTION_STARTS = ("How do I", "Why does", "What is the best way to", "Can someone explain", "Is it normal that")
+_STATEMENT_STARTS = ("Guide:", "Finally fixed", "Showcase:", "PSA:", "Weekly thread -", "My setup for")
+_TOPICS = ("DNS", "backups", "VPN", "printer drivers", "Wi-Fi", "Active Directory", "SSD", "kernel update", "RAID")
+
+
+@dataclass
+class SyntheticProfile:
+    """Distribution parameters for one synthetic subreddit."""
+
+    posts_per_day: float = 200.0
+    # Peak-to-mean swing of the daily posting cycle (0 = uniform).
+    diurnal_amplitude: float = 0.5
+    flair_count: int = 12
+    # Zipf exponent for flair popularity; "None" is always the most common flair.
+    flair_skew: float = 1.1
+    question_ratio: float = 0.35
+    # Probability a post never receives a comment.
+    unanswered_probability: float = 0.2
+    # Log-normal time to first comment.
+    first_comment_median_minutes: float = 25.0
+    first_comment_sigma: float = 1.3
+    # Log-normal score velocity (points per hour at one hour old; grows sub-linearly with age).
+    velocity_median: float = 1.5
+    velocity_sigma: float = 1.4
+    horizon_days: float = 15.0
+    max_posts: Optional[int] = None
+
+
+class SyntheticComment:
+    __slots__ = ("created_utc",)
+
+    def __init__(self, created_utc: float) -> None:
+        self.created_utc = created_utc
+
+
+class SyntheticCommentForest:
+    __slots__ = ("_comments",)
+
+    def __init__(self, comments: List[SyntheticComment]) -> None:
+        self._comments = comments
+
+    def replace_more(self, limit: int = 0) -> list:
+        return []
+
+    def __iter__(self) -> Iterator[SyntheticComment]:
+        return iter(self._comments)
+
+    def __len__(self) -> int:
+        return len(self._comments)
+
+
+class SyntheticSubmission:
+    __slots__ = (
+        "id",
+        "title",
+        "score",
+        "num_comments",
+        "created_utc",
+        "link_flair_text",
+        "is_self",
+        "is_video",
+        "is_gallery",
+        "poll_data",
+        "permalink",
+        "first_comment_delay",
+    )
+
+    @property
+    def fullname(self) -> str:
+        return f"t3_{self.id}"
+
+    @property
+    def comments(self) -> SyntheticCommentForest:
+        if not self.num_comments or self.first_comment_delay is None:
+            return SyntheticCommentForest([])
+        # Only the earliest few comments matter for time-to-first-comment.
+        shown = min(self.num_comments, 3)
+        first = self.created_utc + self.first_comment_delay
+        return SyntheticCommentForest(
+            [SyntheticComment(first + i * self.first_comment_delay) for i in range(shown)]
+        )
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        value, rem = divmod(value, 36)
+        out = digits[rem] + out
+        if not value:
+            return out
+
+
+class SyntheticSubreddit:
+    def __init__(self, name: str, seed: int, profile: SyntheticProfile, now: float) -> None:
+        self.display_name = name.split("/")[-1]
+        self.name = name
+        self.seed = seed
+        self.profile = profile
+        self.now = now
+        weights = [1.0 / (rank**profile.flair_skew) for rank in range(1, profile.flair_count + 2)]
+        total = sum(weights)
+        self._flair_cdf = []
+        acc = 0.0
+        for weight in weights:
+            acc += weight / total
+            self._flair_cdf.append(acc)
+        self._flairs = ["None"] + [f"Flair {i}" for i in range(1, profile.flair_count + 1)]
+
+    def _rate_at(self, ts: float) -> float:
+        hour = (ts % 86400) / 3600.0
+        # Peak around 15:00 UTC.
+        return self.profile.posts_per_day * (1 + self.profile.diurnal_amplitude * math.cos((hour - 15) / 24 * 2 * math.pi))
+
+    def iter_posts(self) -> Iterator[SyntheticSubmission]:
+        """Yield posts newest first; the sequence is identical on every call."""
+        profile = self.profile
+        rng = random.Random(self.seed)
+        peak_per_second = profile.posts_per_day * (1 + profile.diurnal_amplitude) / 86400.0
+        horizon = self.now - profile.horizon_days * 86400
+        ts = self.now
+        index = 0
+        while profile.max_posts is None or index < profile.max_posts:
+            # Non-homogeneous Poisson arrivals (walking backwards in time) via thinning.
+            ts -= rng.expovariate(peak_per_second)
+            if ts < horizon:
+                return
+            if rng.random() * profile.posts_per_day * (1 + profile.diurnal_amplitude) > self._rate_at(ts):
+                continue
+            yield self._make_post(rng, index, ts)
+            index += 1
+
+    def _make_post(self, rng: random.Random, index: int, created: float) -> SyntheticSubmission:
+        profile = self.profile
+        post = SyntheticSubmission()
+        post.id = _base36(zlib.crc32(self.name.encode()) * 1_000_000_000 + index)
+        post.created_utc = created
+        age_hours = max((self.now - created) / 3600.0, 1 / 60)
+
+        topic = _TOPICS[rng.randrange(len(_TOPICS))]
+        if rng.random() < profile.question_ratio:
+            post.title = f"{_QUESTION_STARTS[rng.randrange(len(_QUESTION_STARTS))]} {topic}? (#{index})"
+        else:
+            post.title = f"{_STATEMENT_STARTS[rng.randrange(len(_STATEMENT_STARTS))]} {topic} (#{index})"
+
+        roll = rng.random()
+        post.link_flair_text = None
+        for flair, bound in zip(self._flairs, self._flair_cdf):
+            if roll <= bound:
+                post.link_flair_text = None if flair == "None" else flair
+                break
+
+        kind = rng.random()
+        post.is_self = kind < 0.7
+        post.is_video = 0.7 <= kind < 0.8
+        post.is_gallery = 0.8 <= kind < 0.85
+        post.poll_data = {"options": 3} if 0.85 <= kind < 0.87 else None
+
+        velocity = rng.lognormvariate(math.log(profile.velocity_median), profile.velocity_sigma)
+        post.score = int(velocity * age_hours**0.8)
+
+        delay = rng.lognormvariate(math.log(profile.first_comment_median_minutes * 60), profile.first_comment_sigma)
+        if rng.random() < profile.unanswered_probability or self.now - created < delay:
+            post.first_comment_delay = None
+            post.num_comments = 0
+        else:
+            post.first_comment_delay = delay
+            post.num_comments = 1 + int(rng.expovariate(1.0 / (1 + post.score * 0.1)))
+        post.permalink = f"/r/{self.display_name}/comments/{post.id}/synthetic_{index}/"
+        return post
+
+    def new(self, limit: Optional[int] = 100, **_: object) -> Iterator[SyntheticSubmission]:
+        return islice(self.iter_posts(), limit)
+
+    def top(self, time_filter: str = "all", limit: Optional[int] = 100, **_: object) -> Iterator[SyntheticSubmission]:
+        window = _TIME_FILTERS.get(time_filter)
+        cutoff = self.now - window if window else float("-inf")
+        in_window = (post for post in self.iter_posts() if post.created_utc >= cutoff)
+        if limit is None:
+            return iter(sorted(in_window, key=lambda p: p.score, reverse=True))
+        return iter(heapq.nlargest(limit, in_window, key=lambda p: p.score))
+
+
+class SyntheticReddit:
+    """
+    Fake ``praw.Reddit`` backed by seeded generators.
+
+    Each subreddit gets its own deterministic stream derived from ``seed`` and its
+    name; ``profiles`` overrides the default profile per subreddit. ``info`` only
+    resolves ids of subreddits already requested or listed in ``subreddits``.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        profile: Optional[SyntheticProfile] = None,
+        profiles: Optional[dict] = None,
+        now: Optional[float] = None,
+        subreddits: Optional[List[str]] = None,
+    ) -> None:
+        self.seed = seed
+        self.profile = profile or SyntheticProfile()
+        self.profiles = profiles or {}
+        self.now = time.time() if now is None else now
+        self._subreddits: dict = {}
+        # Register known names up front so info() can resolve their ids before they are listed.
+        for name in subreddits or []:
+            self.subreddit(name)
+
+    def subreddit(self, name: str) -> SyntheticSubreddit:
+        key = name.lower()
+        if key not in self._subreddits:
+            seed = zlib.crc32(f"{self.seed}:{key}".encode("utf-8"))
+            self._subreddits[key] = SyntheticSubreddit(name, seed, self.profiles.get(name, self.profile), self.now)
+        return self._subreddits[key]
+
+    def info(self, fullnames: Optional[List[str]] = None) -> Iterator[SyntheticSubmission]:
+        """Look posts up by fullname, like ``praw.Reddit.info``; unknown ids are skipped."""
+        wanted: dict = {}
+        by_crc = {zlib.crc32(sub.name.encode()): sub for sub in self._subreddits.values()}
+        for fullname in fullnames or []:
+            if not fullname.startswith("t3_"):
+                continue
+            try:
+                crc, index = divmod(int(fullname[3:], 36), 1_000_000_000)
+            except ValueError:
+                continue
+            if crc in by_crc:
+                wanted.setdefault(crc, set()).add(index)
+        for crc, indexes in wanted.items():
+            # Posts are regenerated deterministically; walk the stream up to the deepest index.
+            for index, post in enumerate(islice(by_crc[crc].iter_posts(), max(indexes) + 1)):
+                if index in indexes:
+                    yield post
+
@@ -0,0 +1,152 @@
+"""
+Question-likeness of post titles.
+
+A title is question-like when it contains "?", starts with an interrogative
+word, or contains one of the subreddit's extra ``question_keywords`` from
+``config.yaml``. Words are matched whole by precompiled patterns, so
+"isolated" no longer counts as starting with "is". Titles are immutable on
+Reddit, so results are memoized by post id in an LRU memo (hits move to the
+end, the least recently used id is evicted). ``TitleMemoStore`` keeps the memo,
+in that order, across runs in ``OUTPUT_DIR/title_memo.json``.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Pattern, Sequence
+
+TITLE_MEMO_FILENAME = "title_memo.json"
+INTERROGATIVES = ("who", "what", "when", "where", "why", "how", "does", "is", "are", "can", "should")
+DEFAULT_MEMO_SIZE = 20_000
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Longest first so multi-word keywords win over their prefixes.
+    unique = sorted({w.strip().lower() for w in words if w and w.strip()}, key=len, reverse=True)
+    return "|".join(re.escape(word) for word in unique)
+
+
+_INTERROGATIVE_PREFIX = re.compile(rf"\s*(?:{_alternation(INTERROGATIVES)})(?!\w)", re.IGNORECASE)
+
+
+def build_keyword_pattern(keywords: Sequence[str]) -> Optional[Pattern[str]]:
+    extra = _alternation(keywords)
+    if not extra:
+        return None
+    return re.compile(rf"(?<!\w)(?:{extra})(?!\w)", re.IGNORECASE)
+
+
+def keywords_fingerprint(keywords: Sequence[str] = ()) -> str:
+    payload = json.dumps(sorted({w.strip().lower() for w in keywords if w and w.strip()}))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class TitleClassifier:
+    def __init__(
+        self,
+        keywords: Sequence[str] = (),
+        memo: Optional["OrderedDict[str, bool]"] = None,
+        max_memo: int = DEFAULT_MEMO_SIZE,
+    ) -> None:
+        self.keywords = list(keywords)
+        self.fingerprint = keywords_fingerprint(self.keywords)
+        self.max_memo = max_memo
+        self.memo: "OrderedDict[str, bool]" = memo if memo is not None else OrderedDict()
+        self.memo_hits = 0
+        keyword_pattern = build_keyword_pattern(self.keywords)
+        self._keyword_search = keyword_pattern.search if keyword_pattern else None
+
+    def is_question(self, title: str) -> bool:
+        # Cheapest checks first; the prefix pattern is anchored, so it never scans the whole title.
+        if "?" in title or _INTERROGATIVE_PREFIX.match(title) is not None:
+            return True
+        return self._keyword_search is not None and self._keyword_search(title) is not None
+
+    def classify(self, post_id: Optional[str], title: str) -> bool:
+        if post_id:
+            cached = self.memo.get(post_id)
+            if cached is not None:
+                self.memo.move_to_end(post_id)
+                self.memo_hits += 1
+                return cached
+        result = self.is_question(title)
+        if post_id:
+            self._remember(post_id, result)
+        return result
+
+    def annotate(self, records: Iterable) -> None:
+        """Set ``question_like`` on a batch of records (anything with ``id`` and ``title``)."""
+        memo_get = self.memo.get
+        touch = self.memo.move_to_end
+        is_question = self.is_question
+        for record in records:
+            cached = memo_get(record.id) if record.id else None
+            if cached is not None:
+                touch(record.id)
+                self.memo_hits += 1
+                record.question_like = cached
+                continue
+            record.question_like = is_question(record.title)
+            if record.id:
+                self._remember(record.id, record.question_like)
+
+    def _remember(self, post_id: str, result: bool) -> None:
+        if self.max_memo <= 0:
+            return
+        self.memo[post_id] = result
+        if len(self.memo) > self.max_memo:
+            self.memo.popitem(last=False)
+
+
+# Shared and unpersisted, so it does not memoize: a process-wide memo would only grow.
+DEFAULT_CLASSIFIER = TitleClassifier(max_memo=0)
+
+
+class TitleMemoStore:
+    """Per-subreddit memos, dropped when that subreddit's keyword list changes."""
+
+    def __init__(self, path: Optional[Path] = None, max_memo: int = DEFAULT_MEMO_SIZE) -> None:
+        self.path = path
+        self.max_memo = max_memo
+        self._memos: Dict[str, Dict[str, object]] = {}
+        self._classifiers: Dict[str, TitleClassifier] = {}
+
+    @classmethod
+    def load(cls, path: Path, max_memo: int = DEFAULT_MEMO_SIZE) -> "TitleMemoStore":
+        store = cls(path, max_memo)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        for name, entry in raw.get("subreddits", {}).items():
+            if isinstance(entry, dict) and isinstance(entry.get("ids"), dict):
+                store._memos[name] = entry
+        return store
+
+    def classifier_for(self, subreddit: str, keywords: Sequence[str] = ()) -> TitleClassifier:
+        key = subreddit.lower()
+        classifier = self._classifiers.get(key)
+        if classifier is not None and classifier.fingerprint == keywords_fingerprint(keywords):
+            return classifier
+        memo: "OrderedDict[str, bool]" = OrderedDict()
+        saved = self._memos.get(key)
+        if saved and saved.get("keywords") == keywords_fingerprint(keywords):
+            memo.update((post_id, bool(flag)) for post_id, flag in saved["ids"].items())
+        classifier = TitleClassifier(keywords, memo=memo, max_memo=self.max_memo)
+        self._classifiers[key] = classifier
+        return classifier
+
+    def save(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        for key, classifier in self._classifiers.items():
+            ids = {post_id: int(flag) for post_id, flag in classifier.memo.items()}
+            self._memos[key] = {"keywords": classifier.fingerprint, "ids": ids}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"subreddits": self._memos}, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
@@ -0,0 +1,232 @@
+"""
+Posts of interest carried across runs and refreshed with batched id lookups.
+
+After each run the posts shown in a subreddit's unanswered, aging, rising and
+top sections are remembered in ``OUTPUT_DIR/tracked_posts.json``. The next run
+hands them to ``collect_weekly_report``. Posts its /new scan returns already carry
+current counts; only the rest are refreshed through ``reddit.info`` (up to 100
+fullnames per request, see ``TrackedRefresher``). Posts older than the /new
+scan still compete for those sections, without paginating the listings again.
+Deleted, removed or vanished posts are dropped from the store.
+The same lookups settle posts the response-time heatmap is waiting on.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ..core.models import SubredditReport
+from .analytics import PostRecord
+from .heatmap import SubredditHeatmap
+
+TRACKED_POSTS_FILENAME = "tracked_posts.json"
+# Reddit's /api/info accepts at most 100 fullnames per request.
+INFO_BATCH_SIZE = 100
+# Nothing older than the report window can appear in a section.
+TRACK_MAX_AGE_HOURS = 7 * 24
+
+
+@dataclass
+class TrackedPost:
+    id: str
+    subreddit: str
+    title: str
+    permalink: str
+    created_utc: float
+    score: int = 0
+    num_comments: int = 0
+    flair: str = "None"
+    sections: List[str] = field(default_factory=list)
+    refreshed_at: Optional[float] = None
+
+    @property
+    def fullname(self) -> str:
+        return f"t3_{self.id}"
+
+    def to_record(self) -> PostRecord:
+        return PostRecord(
+            title=self.title,
+            score=self.score,
+            num_comments=self.num_comments,
+            created_utc=self.created_utc,
+            flair=self.flair,
+            post_type="",
+            permalink=self.permalink,
+            id=self.id,
+        )
+
+
+class TrackedPostStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.posts: Dict[str, TrackedPost] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "TrackedPostStore":
+        store = cls(path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        for item in raw.get("posts", []):
+            try:
+                post = TrackedPost(**item)
+            except TypeError:
+                continue
+            store.posts[post.id] = post
+        return store
+
+    def for_subreddit(self, subreddit: str) -> List[TrackedPost]:
+        key = subreddit.lower()
+        return [post for post in self.posts.values() if post.subreddit.lower() == key]
+
+    def counts_by_subreddit(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for post in self.posts.values():
+            counts[post.subreddit.lower()] = counts.get(post.subreddit.lower(), 0) + 1
+        return counts
+
+    def replace_subreddit(self, subreddit: str, report: SubredditReport) -> None:
+        """Track exactly the posts shown in this report's sections (those with ids)."""
+        previous = {post.id: post for post in self.for_subreddit(subreddit)}
+        for post_id in previous:
+            del self.posts[post_id]
+        sections = (
+            ("unanswered", report.unanswered),
+            ("aging", report.aging_unanswered),
+            ("rising", report.rising_posts),
+            ("top", report.top_posts),
+        )
+        for section, items in sections:
+            for item in items:
+                if not item.post_id or item.created_utc is None:
+                    continue
+                post = self.posts.get(item.post_id)
+                if post is None:
+                    old = previous.get(item.post_id)
+                    post = TrackedPost(
+                        id=item.post_id,
+                        subreddit=subreddit,
+                        title=item.title,
+                        permalink=item.permalink,
+                        created_utc=item.created_utc,
+                        # Unanswered summaries carry no score or comment count.
+                        score=getattr(item, "score", old.score if old else 0),
+                        num_comments=getattr(item, "comments", 0),
+                        flair=old.flair if old else "None",
+                        refreshed_at=old.refreshed_at if old else None,
+                    )
+                    self.posts[item.post_id] = post
+                if section not in post.sections:
+                    post.sections.append(section)
+
+    def prune(self, now: Optional[float] = None, max_age_hours: float = TRACK_MAX_AGE_HOURS) -> int:
+        cutoff = (time.time() if now is None else now) - max_age_hours * 3600
+        stale = [post_id for post_id, post in self.posts.items() if post.created_utc < cutoff]
+        for post_id in stale:
+            del self.posts[post_id]
+        return len(stale)
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"posts": [asdict(post) for post in self.posts.values()]}
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def _batches(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _is_gone(submission: object) -> bool:
+    # Deleted posts come back with no author; removed ones carry a removal category.
+    return getattr(submission, "removed_by_category", None) is not None or getattr(submission, "author", True) is None
+
+
+def refresh_tracked_posts(
+    reddit, posts: List[TrackedPost], batch_size: int = INFO_BATCH_SIZE, now: Optional[float] = None
+) -> List[TrackedPost]:
+    """
+    Update score and comment counts in place with one /api/info request per batch.
+
+    Returns the posts still available; deleted, removed and missing posts are left out.
+    """
+    if not posts:
+        return []
+    refreshed_at = time.time() if now is None else now
+    by_fullname = {post.fullname: post for post in posts}
+    alive: List[TrackedPost] = []
+    for submission in lookup_live(reddit, list(by_fullname), batch_size):
+        post = by_fullname.get(getattr(submission, "fullname", None) or f"t3_{submission.id}")
+        if post is None:
+            continue
+        post.score = submission.score
+        post.num_comments = submission.num_comments
+        post.flair = getattr(submission, "link_flair_text", None) or "None"
+        post.refreshed_at = refreshed_at
+        alive.append(post)
+    return alive
+
+
+class TrackedRefresher:
+    """
+    Refreshes, after the /new scan, only the tracked posts it did not reach.
+
+    Pass ``records()`` as ``tracked_posts`` and the refresher itself as
+    ``refresh_tracked`` to ``collect_weekly_report``. Tracked posts that turn out
+    to be deleted, removed or missing are collected in ``gone``.
+    """
+
+    def __init__(self, reddit, posts: List[TrackedPost], batch_size: int = INFO_BATCH_SIZE) -> None:
+        self.reddit = reddit
+        self.batch_size = batch_size
+        self.posts = {post.id: post for post in posts}
+        self.gone: List[TrackedPost] = []
+
+    def records(self) -> List[PostRecord]:
+        return [post.to_record() for post in self.posts.values()]
+
+    def __call__(self, unreached: List[PostRecord], reached: List[PostRecord]) -> List[PostRecord]:
+        self.gone.extend(
+            self.posts[record.id] for record in reached if record.id in self.posts and _is_gone(record.submission)
+        )
+        stale = [self.posts[record.id] for record in unreached if record.id in self.posts]
+        alive = refresh_tracked_posts(self.reddit, stale, self.batch_size)
+        alive_ids = {post.id for post in alive}
+        self.gone.extend(post for post in stale if post.id not in alive_ids)
+        return [post.to_record() for post in alive]
+
+
+def lookup_live(reddit, fullnames: List[str], batch_size: int = INFO_BATCH_SIZE) -> Iterator[object]:
+    """Yield the submissions for ``fullnames`` that still exist, one /api/info request per batch."""
+    for batch in _batches(fullnames, batch_size):
+        for submission in reddit.info(fullnames=batch):
+            if not _is_gone(submission):
+                yield submission
+
+
+def settle_heatmap_posts(
+    reddit, heatmap: SubredditHeatmap, batch_size: int = INFO_BATCH_SIZE, now: Optional[float] = None
+) -> int:
+    """
+    Count the heatmap's pending posts that are now old enough to settle.
+
+    Their current comment counts come from batched /api/info lookups, so busy
+    subreddits whose /new scan never reaches 24h-old posts still fill the grid.
+    Returns the number of posts counted; deleted or missing ones are dropped.
+    """
+    now = time.time() if now is None else now
+    due = heatmap.due(now)
+    counted = 0
+    for submission in lookup_live(reddit, [f"t3_{post_id}" for post_id in due], batch_size):
+        if heatmap.settle(submission.id, submission.num_comments):
+            counted += 1
+    heatmap.drop_pending(due)
+    heatmap.advance()
+    return counted
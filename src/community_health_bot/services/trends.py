@@ -0,0 +1,160 @@
+"""
+Incremental trend and anomaly state over the metrics history.
+
+For each subreddit and metric (posts, unanswered rate, median time to first
+comment) the engine keeps an EWMA and a rolling window with running sum and
+sum of squares. Each new history row updates that state in O(1). A value
+whose z-score against the window *before* it was added exceeds the threshold
+is flagged as an anomaly. The state lives in ``OUTPUT_DIR/trend_state.json``
+next to ``metrics_history.csv``. The full history is only replayed when it
+has more rows than the state has seen (no state yet, or rows appended by a
+writer that did not update it).
+"""
+
+import json
+import math
+import os
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..core.models import Anomaly, HistoryEntry
+
+TREND_STATE_FILENAME = "trend_state.json"
+TREND_METRICS: Tuple[str, ...] = ("total_posts", "unanswered_rate", "median_ttf_minutes")
+DEFAULT_WINDOW = 8
+DEFAULT_ALPHA = 0.3
+DEFAULT_Z_THRESHOLD = 2.5
+# Runs needed before anything is flagged.
+DEFAULT_MIN_PERIODS = 4
+# Stddev floor, as a fraction of the window mean, so a jump after a flat series is still scored.
+STD_FLOOR_RATIO = 0.05
+_MIN_STD = 1e-6
+
+
+class MetricState:
+    __slots__ = ("values", "total", "total_sq", "ewma")
+
+    def __init__(self, window: int, values: Iterable[float] = (), ewma: Optional[float] = None) -> None:
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ewma = ewma
+        for value in values:
+            self._push(value)
+
+    def _push(self, value: float) -> None:
+        if len(self.values) == self.values.maxlen:
+            evicted = self.values[0]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    def mean_std(self) -> Tuple[float, float]:
+        n = len(self.values)
+        if not n:
+            return 0.0, 0.0
+        mean = self.total / n
+        if n < 2:
+            return mean, 0.0
+        variance = max((self.total_sq - n * mean * mean) / (n - 1), 0.0)
+        return mean, math.sqrt(variance)
+
+    def update(self, value: float, alpha: float) -> Tuple[int, float, float]:
+        """Add a value; returns (count, mean, stddev) of the window before it."""
+        count = len(self.values)
+        mean, std = self.mean_std()
+        self._push(value)
+        self.ewma = value if self.ewma is None else alpha * value + (1 - alpha) * self.ewma
+        return count, mean, std
+
+
+def _metric_value(entry: HistoryEntry, metric: str) -> Optional[float]:
+    value = getattr(entry, metric)
+    return None if value is None else float(value)
+
+
+class TrendEngine:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        window: int = DEFAULT_WINDOW,
+        alpha: float = DEFAULT_ALPHA,
+        z_threshold: float = DEFAULT_Z_THRESHOLD,
+        min_periods: int = DEFAULT_MIN_PERIODS,
+    ) -> None:
+        self.path = path
+        self.window = window
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_periods = min_periods
+        self.rows = 0
+        self._state: Dict[str, Dict[str, MetricState]] = {}
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "TrendEngine":
+        engine = cls(path, **kwargs)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return engine
+        engine.rows = int(raw.get("rows", 0))
+        for subreddit, metrics in raw.get("subreddits", {}).items():
+            engine._state[subreddit] = {
+                metric: MetricState(engine.window, item.get("values", []), item.get("ewma"))
+                for metric, item in metrics.items()
+            }
+        return engine
+
+    def bootstrap(self, entries: Iterable[HistoryEntry]) -> None:
+        """Rebuild from the history, oldest first, when it has rows the saved state has not seen."""
+        entries = list(entries)
+        if self.rows >= len(entries):
+            return
+        self.rows = 0
+        self._state = {}
+        for entry in sorted(entries, key=lambda e: e.date):
+            self.update(entry)
+
+    def update(self, entry: HistoryEntry) -> List[Anomaly]:
+        """Fold one history row into its subreddit's state; returns anomalies in that row."""
+        self.rows += 1
+        state = self._state.setdefault(entry.subreddit, {})
+        anomalies: List[Anomaly] = []
+        for metric in TREND_METRICS:
+            value = _metric_value(entry, metric)
+            if value is None:
+                continue
+            metric_state = state.get(metric)
+            if metric_state is None:
+                metric_state = state[metric] = MetricState(self.window)
+            count, mean, std = metric_state.update(value, self.alpha)
+            if count < self.min_periods:
+                continue
+            std = max(std, abs(mean) * STD_FLOOR_RATIO, _MIN_STD)
+            zscore = (value - mean) / std
+            if abs(zscore) >= self.z_threshold:
+                anomalies.append(
+                    Anomaly(metric=metric, value=value, mean=mean, stddev=std, zscore=zscore, ewma=metric_state.ewma)
+                )
+        return anomalies
+
+    def save(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        payload = {
+            "rows": self.rows,
+            "subreddits": {
+                subreddit: {
+                    metric: {"ewma": state.ewma, "values": list(state.values)} for metric, state in metrics.items()
+                }
+                for subreddit, metrics in self._state.items()
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
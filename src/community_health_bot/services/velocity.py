@@ -0,0 +1,138 @@
+"""
+Per-post score snapshots kept across runs, for recent velocity and acceleration.
+
+Each post seen while under 48h old gets a fixed-size ring buffer of
+(timestamp, score, comments) snapshots, persisted in
+``OUTPUT_DIR/score_snapshots.json``. Velocity is measured between the two most
+recent snapshots rather than over the post's lifetime, so a post that is
+gaining points now outranks an older post that was popular hours ago.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+SCORE_SNAPSHOTS_FILENAME = "score_snapshots.json"
+# Three snapshots give velocity and acceleration; a few more keep some recent history.
+DEFAULT_MAX_SNAPSHOTS = 6
+DEFAULT_MAX_AGE_HOURS = 48
+# Snapshots closer together than this replace the previous one (e.g. repeated UI runs).
+MIN_SNAPSHOT_INTERVAL_SECONDS = 300
+
+Snapshot = Tuple[float, int, int]  # (timestamp, score, comments)
+
+
+@dataclass
+class Velocity:
+    # Points per hour between the two latest snapshots.
+    score_per_hour: float
+    # Change in points per hour, per hour.
+    acceleration: float
+    comments_per_hour: float
+
+    def projected(self, hours: float = 1.0) -> float:
+        """Velocity expected ``hours`` from now if the acceleration holds."""
+        return self.score_per_hour + self.acceleration * hours
+
+
+class _PostSeries:
+    __slots__ = ("created_utc", "snapshots")
+
+    def __init__(self, created_utc: float, max_snapshots: int) -> None:
+        self.created_utc = created_utc
+        self.snapshots: Deque[Snapshot] = deque(maxlen=max_snapshots)
+
+
+def _rate(earlier: Snapshot, later: Snapshot) -> Tuple[float, float]:
+    hours = max((later[0] - earlier[0]) / 3600.0, 1 / 60)
+    return (later[1] - earlier[1]) / hours, (later[2] - earlier[2]) / hours
+
+
+class VelocityStore:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_snapshots: int = DEFAULT_MAX_SNAPSHOTS,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+    ) -> None:
+        self.path = path
+        self.max_snapshots = max_snapshots
+        self.max_age_hours = max_age_hours
+        self._series: Dict[str, _PostSeries] = {}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def record(self, post_id: str, created_utc: float, score: int, comments: int, now: float) -> Velocity:
+        """
+        Add a snapshot and return the post's current velocity.
+
+        Only the new snapshot and the two before it are looked at. A post's
+        creation counts as a zero-score snapshot, so a first sighting falls back to
+        the lifetime average.
+        """
+        series = self._series.get(post_id)
+        if series is None:
+            series = self._series[post_id] = _PostSeries(created_utc, self.max_snapshots)
+        snapshots = series.snapshots
+        if snapshots and now - snapshots[-1][0] < MIN_SNAPSHOT_INTERVAL_SECONDS:
+            snapshots.pop()
+        snapshots.append((now, score, comments))
+
+        origin: Snapshot = (series.created_utc, 0, 0)
+        latest = snapshots[-1]
+        previous = snapshots[-2] if len(snapshots) >= 2 else origin
+        score_rate, comment_rate = _rate(previous, latest)
+        if len(snapshots) >= 2:
+            before = snapshots[-3] if len(snapshots) >= 3 else origin
+            previous_rate, _ = _rate(before, previous)
+            # Rates apply at the midpoints of their intervals.
+            span_hours = max(((latest[0] + previous[0]) - (previous[0] + before[0])) / 7200.0, 1 / 60)
+            acceleration = (score_rate - previous_rate) / span_hours
+        else:
+            acceleration = 0.0
+        return Velocity(score_per_hour=score_rate, acceleration=acceleration, comments_per_hour=comment_rate)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        cutoff = (time.time() if now is None else now) - self.max_age_hours * 3600
+        stale = [post_id for post_id, series in self._series.items() if series.created_utc < cutoff]
+        for post_id in stale:
+            del self._series[post_id]
+        return len(stale)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "VelocityStore":
+        store = cls(path, **kwargs)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        for post_id, item in raw.get("posts", {}).items():
+            try:
+                series = _PostSeries(float(item["created_utc"]), store.max_snapshots)
+                series.snapshots.extend(
+                    (float(ts), int(score), int(comments)) for ts, score, comments in item["snapshots"]
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            store._series[post_id] = series
+        return store
+
+    def save(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "posts": {
+                post_id: {"created_utc": series.created_utc, "snapshots": [list(s) for s in series.snapshots]}
+                for post_id, series in self._series.items()
+            }
+        }
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
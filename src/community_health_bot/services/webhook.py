@@ -1,22 +1,343 @@
+import hashlib
 import json
-from typing import Optional
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .logging import log_json
 
-def send_webhook(webhook_url: Optional[str], title: str, content: str) -> None:
-    if not webhook_url:
-        return
+_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Outbox limits: entries past them are dropped (with a warning) when the outbox is replayed.
+OUTBOX_MAX_ENTRIES = 200
+# Same 48h as the rest of OUTPUT_DIR; summaries older than that are purged anyway.
+OUTBOX_MAX_AGE_HOURS = 48
+# Runs in which an entry failed, counting the one that first queued it.
+OUTBOX_MAX_ATTEMPTS = 5
+
+
+def build_payload(title: str, content: str) -> Dict[str, str]:
     excerpt = content if len(content) <= 1800 else content[:1800] + "\n…(truncated)"
-    payload = {
+    return {
         # Slack-compatible
         "text": f"*{title}*\n{excerpt}",
         # Discord-compatible
         "content": f"**{title}**\n{excerpt}",
     }
-    headers = {"Content-Type": "application/json"}
+
+
+def create_session(pool_size: int = 4) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+def _target_id(url: str) -> str:
+    # Outbox entries reference targets by hash so webhook secrets are not written to disk.
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+class WebhookDispatcher:
+    """
+    Deliver webhook payloads from background threads with retries and a persistent outbox.
+
+    Each target URL gets its own worker thread, so targets are delivered concurrently
+    and a slow endpoint only delays itself. Failed attempts are retried with
+    exponential backoff and full jitter; payloads that still fail (or are pending when
+    ``close`` times out) are appended to the outbox and replayed on the next ``start``.
+    Replayed entries stay in the outbox until they are delivered: ``close`` rewrites it
+    atomically without them, so a crash mid-replay loses nothing (it may resend).
+    Entries older than ``outbox_max_age_hours`` or failed in ``outbox_max_attempts``
+    runs are dropped, as are the oldest beyond ``outbox_max_entries``. Once a replay
+    to a target fails, its other replays wait for the next run, so a target that is
+    down costs one replay per run rather than one per entry.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        outbox_path: Optional[Path] = None,
+        max_attempts: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        timeout: float = 5.0,
+        session: Optional[requests.Session] = None,
+        logger: Optional[logging.Logger] = None,
+        outbox_max_entries: int = OUTBOX_MAX_ENTRIES,
+        outbox_max_age_hours: float = OUTBOX_MAX_AGE_HOURS,
+        outbox_max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+    ) -> None:
+        self.urls = list(dict.fromkeys(url for url in urls if url))
+        self.outbox_path = outbox_path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = session or create_session(pool_size=max(len(self.urls), 1))
+        self.logger = logger
+        self.outbox_max_entries = outbox_max_entries
+        self.outbox_max_age_hours = outbox_max_age_hours
+        self.outbox_max_attempts = outbox_max_attempts
+        self.delivered = 0
+        self.failed = 0
+        self._queues: Dict[str, "queue.Queue[Any]"] = {url: queue.Queue() for url in self.urls}
+        # Queue items are (outbox key, payload); the key is None for payloads submitted this run.
+        self._in_flight: Dict[str, Optional[Tuple[Optional[str], Dict[str, Any]]]] = {url: None for url in self.urls}
+        self._threads: List[threading.Thread] = []
+        self._abort = threading.Event()
+        self._outbox_lock = threading.Lock()
+        # Mirror of the outbox file, and the replayed entries in it by key.
+        self._outbox: List[Dict[str, Any]] = []
+        self._replayed: Dict[str, Dict[str, Any]] = {}
+        self._replay_down: Set[str] = set()
+        self._outbox_changed = False
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> "WebhookDispatcher":
+        if self._threads:
+            return self
+        self._outbox = self._expire(self._read_outbox())
+        for entry in self._outbox:
+            url = next((u for u in self.urls if _target_id(u) == entry.get("target")), None)
+            if url is None:
+                # Target no longer configured; the entry stays for when it comes back.
+                continue
+            self._replayed[entry["key"]] = entry
+            self._queues[url].put((entry["key"], entry["payload"]))
+        for url in self.urls:
+            thread = threading.Thread(target=self._worker, args=(url,), name="webhook-sender", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, title: str, content: str) -> None:
+        payload = build_payload(title, content)
+        for url in self.urls:
+            self._queues[url].put((None, payload))
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Wait for queued deliveries, move anything still pending to the outbox, then drop settled replays."""
+        for url in self.urls:
+            self._queues[url].put(self._STOP)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            thread.join(remaining)
+        if any(thread.is_alive() for thread in self._threads):
+            self._abort.set()
+            pending: List[Dict[str, Any]] = []
+            for url in self.urls:
+                in_flight = self._in_flight.get(url)
+                # Replayed items (with a key) are still in the outbox.
+                if in_flight is not None and in_flight[0] is None:
+                    pending.append(self._outbox_entry(url, in_flight[1], "shutdown"))
+                while True:
+                    try:
+                        item = self._queues[url].get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not self._STOP and item[0] is None:
+                        pending.append(self._outbox_entry(url, item[1], "shutdown"))
+            self._write_outbox(pending)
+        self._threads = []
+        self._rewrite_outbox()
+
+    def _worker(self, url: str) -> None:
+        q = self._queues[url]
+        while True:
+            item = q.get()
+            if item is self._STOP:
+                return
+            key, payload = item
+            if key is not None and url in self._replay_down:
+                # An earlier replay to this target failed; leave the rest for the next run.
+                continue
+            self._in_flight[url] = item
+            ok, retryable, reason = self._deliver(url, payload)
+            if ok:
+                self._in_flight[url] = None
+                self._count(delivered=1)
+                self._settle(key)
+                continue
+            if self._abort.is_set():
+                # close() persists the in-flight payload.
+                return
+            self._in_flight[url] = None
+            self._count(failed=1)
+            if not retryable:
+                self._settle(key)
+            elif key is None:
+                self._write_outbox([self._outbox_entry(url, payload, reason)])
+            else:
+                # Still in the outbox; count the failed run against the entry.
+                self._replay_down.add(url)
+                self._retry_later(key, reason)
+            if self.logger:
+                log_json(
+                    self.logger, "webhook_delivery_failed", target=_target_id(url), reason=reason, queued=retryable
+                )
+
+    def _count(self, delivered: int = 0, failed: int = 0) -> None:
+        with self._stats_lock:
+            self.delivered += delivered
+            self.failed += failed
+
+    def _deliver(self, url: str, payload: Dict[str, Any]) -> Tuple[bool, bool, str]:
+        """Return (delivered, retryable, reason)."""
+        body = json.dumps(payload)
+        reason = "unknown"
+        for attempt in range(self.max_attempts):
+            retry_after: Optional[float] = None
+            try:
+                response = self.session.post(url, data=body, timeout=self.timeout)
+                if 200 <= response.status_code < 300:
+                    return True, False, "ok"
+                reason = f"http_{response.status_code}"
+                if response.status_code not in _RETRYABLE_STATUS:
+                    # Other 4xx responses will not succeed on retry; do not keep them in the outbox.
+                    return False, False, reason
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            except requests.RequestException as exc:
+                reason = type(exc).__name__
+            if attempt + 1 < self.max_attempts:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.backoff_max))
+                if self._abort.wait(delay):
+                    break
+        return False, True, reason
+
+    def _outbox_entry(self, url: str, payload: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        return {
+            "key": uuid.uuid4().hex,
+            "target": _target_id(url),
+            "payload": payload,
+            "reason": reason,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "attempts": 1,
+        }
+
+    def _expire(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop entries past the outbox limits, oldest first, and log how many went."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.outbox_max_age_hours)
+        kept: List[Dict[str, Any]] = []
+        expired = exhausted = 0
+        for entry in entries:
+            if _failed_at(entry) < cutoff:
+                expired += 1
+            elif entry.get("attempts", 1) >= self.outbox_max_attempts:
+                exhausted += 1
+            else:
+                kept.append(entry)
+        overflow = max(len(kept) - self.outbox_max_entries, 0)
+        kept = kept[overflow:]
+        if expired or exhausted or overflow:
+            self._outbox_changed = True
+            if self.logger:
+                log_json(
+                    self.logger,
+                    "webhook_outbox_dropped",
+                    level=logging.WARNING,
+                    expired=expired,
+                    exhausted=exhausted,
+                    overflow=overflow,
+                )
+        return kept
+
+    def _write_outbox(self, entries: List[Dict[str, Any]]) -> None:
+        if not self.outbox_path or not entries:
+            return
+        with self._outbox_lock:
+            self._outbox.extend(entries)
+            self.outbox_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.outbox_path.open("a", encoding="utf-8") as fh:
+                for entry in entries:
+                    fh.write(json.dumps(entry) + "\n")
+
+    def _settle(self, key: Optional[str]) -> None:
+        """Forget a replayed entry that was delivered or never will be."""
+        if key is None:
+            return
+        with self._outbox_lock:
+            entry = self._replayed.pop(key, None)
+            if entry is not None:
+                self._outbox = [item for item in self._outbox if item is not entry]
+                self._outbox_changed = True
+
+    def _retry_later(self, key: str, reason: str) -> None:
+        with self._outbox_lock:
+            entry = self._replayed.pop(key, None)
+            if entry is not None:
+                entry["attempts"] = entry.get("attempts", 1) + 1
+                entry["reason"] = reason
+                self._outbox_changed = True
+
+    def _rewrite_outbox(self) -> None:
+        if not self.outbox_path or not self._outbox_changed:
+            return
+        with self._outbox_lock:
+            try:
+                if not self._outbox:
+                    self.outbox_path.unlink(missing_ok=True)
+                else:
+                    tmp_path = self.outbox_path.with_name(f".{self.outbox_path.name}.{os.getpid()}.tmp")
+                    tmp_path.write_text("".join(json.dumps(entry) + "\n" for entry in self._outbox), encoding="utf-8")
+                    os.replace(tmp_path, self.outbox_path)
+            except OSError:
+                return
+            self._outbox_changed = False
+
+    def _read_outbox(self) -> List[Dict[str, Any]]:
+        if not self.outbox_path or not self.outbox_path.exists():
+            return []
+        with self._outbox_lock:
+            try:
+                lines = self.outbox_path.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                return []
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or "payload" not in entry:
+                continue
+            if "key" not in entry:
+                # Written before entries had keys; persist the one given here.
+                entry["key"] = uuid.uuid4().hex
+                self._outbox_changed = True
+            entries.append(entry)
+        return entries
+
+
+def _failed_at(entry: Dict[str, Any]) -> datetime:
+    try:
+        failed_at = datetime.fromisoformat(entry["failed_at"])
+    except (KeyError, TypeError, ValueError):
+        # Unknown age: keep it until the attempt limit drops it.
+        return datetime.now(timezone.utc)
+    return failed_at if failed_at.tzinfo else failed_at.replace(tzinfo=timezone.utc)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
     try:
-        requests.post(webhook_url, data=json.dumps(payload), headers=headers, timeout=5)
-    except Exception:
-        # Fail silently to avoid interrupting main flow.
-        return
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
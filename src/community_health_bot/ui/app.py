@@ -1,8 +1,11 @@
+import dataclasses
 import os
 import sys
+import threading
+from concurrent.futures import Future, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import streamlit as st
 
@@ -11,17 +14,96 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from community_health_bot.config.settings import SubredditConfig, load_settings, validate_user_agent
+from community_health_bot.config.settings import Settings, SubredditConfig, load_settings, validate_user_agent
 from community_health_bot.core.models import HistoryEntry, SubredditReport
 from community_health_bot.reddit.client import create_reddit_client
 from community_health_bot.services.analytics import collect_weekly_report
-from community_health_bot.services.history import append_history, read_history, recent_history_for_subreddit
-from community_health_bot.services.reporting import build_markdown
+from community_health_bot.services.history import HistoryCache, append_history, recent_history_for_subreddit
+from community_health_bot.services.profiling import RunProfiler
+from community_health_bot.services.report_cache import CachedReport, ReportCache
+from community_health_bot.services.reporting import SectionCache, build_markdown
+from community_health_bot.services.titles import TitleClassifier
+from community_health_bot.services.trends import TREND_STATE_FILENAME, TrendEngine
+
+
+@st.cache_resource(show_spinner=False)
+def get_history_cache(path: Path) -> HistoryCache:
+    return HistoryCache(path)
 
 
-@st.cache_data(show_spinner=False)
 def load_history(path: Path) -> List[HistoryEntry]:
-    return read_history(path)
+    # Revalidated against the file's size and mtime on every call; only appended rows are parsed.
+    return get_history_cache(path).load()
+
+
+@st.cache_resource(show_spinner=False)
+def get_section_cache() -> SectionCache:
+    # Shared across reruns so unchanged sections are not re-formatted on every click.
+    return SectionCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_report_cache() -> ReportCache:
+    # One cache per server process: every session shares collected reports and in-flight refreshes.
+    return ReportCache()
+
+
+_thread_clients = threading.local()
+# Serializes history appends and trend state updates between sessions.
+_history_lock = threading.Lock()
+
+
+def _thread_reddit_client(settings: Settings):
+    # PRAW instances are not thread-safe; each refresh worker keeps its own.
+    key = (settings.client_id, settings.username, settings.user_agent, settings.reddit_api_url)
+    if getattr(_thread_clients, "key", None) != key:
+        _thread_clients.client = create_reddit_client(settings)
+        _thread_clients.key = key
+    return _thread_clients.client
+
+
+def _record_history(history: HistoryCache, reports: Dict[str, SubredditReport]) -> None:
+    """Append a history row per report and fold it into the trend state, as the CLI does; sets the anomalies."""
+    date = datetime.utcnow().date().isoformat()
+    entries = [
+        HistoryEntry(
+            date=date,
+            subreddit=name,
+            total_posts=report.metrics.total_posts,
+            unanswered=report.metrics.unanswered,
+            unanswered_rate=report.metrics.unanswered_rate,
+            median_ttf_minutes=report.metrics.median_time_to_first_comment_minutes,
+        )
+        for name, report in reports.items()
+    ]
+    with _history_lock:
+        engine = TrendEngine.load(history.path.parent / TREND_STATE_FILENAME)
+        engine.bootstrap(history.load())
+        for entry in entries:
+            reports[entry.subreddit].anomalies = engine.update(entry)
+        append_history(history.path, entries)
+        engine.save()
+
+
+def _report_collector(settings: Settings, sub_cfg: SubredditConfig):
+    # Resolved here, on the script thread; collect() runs on a cache worker.
+    history = get_history_cache(settings.output_dir / "metrics_history.csv")
+
+    def collect() -> SubredditReport:
+        report = collect_weekly_report(
+            _thread_reddit_client(settings),
+            sub_cfg.name,
+            top_posts_limit=sub_cfg.top_posts_limit,
+            unanswered_limit=sub_cfg.unanswered_limit,
+            include_sections=sub_cfg.include_sections,
+            classifier=TitleClassifier(sub_cfg.question_keywords) if sub_cfg.question_keywords else None,
+        )
+        # The cache runs this once per completed refresh (background and deduplicated ones
+        # included), so each collection adds exactly one history row.
+        _record_history(history, {sub_cfg.name: report})
+        return report
+
+    return collect
 
 
 def main() -> None:
@@ -44,6 +126,7 @@ def main() -> None:
     post_to = st.text_input("Post to subreddit (required for post mode)", value="")
     top_limit = st.slider("Top posts limit (default if not in YAML)", min_value=5, max_value=20, value=10)
     use_mock = st.checkbox("Use mock data (no Reddit calls)", value=False)
+    use_profile = st.checkbox("Profile this run (writes profile artifacts to OUTPUT_DIR)", value=False)
 
     if st.button("Generate summary"):
         run_summary(
@@ -54,6 +137,7 @@ def main() -> None:
             post_to=post_to or None,
             default_top_limit=top_limit,
             use_mock=use_mock,
+            profile=use_profile,
         )
 
 
@@ -65,6 +149,7 @@ def run_summary(
     post_to: str,
     default_top_limit: int,
     use_mock: bool = False,
+    profile: bool = False,
 ) -> None:
     if mode == "post" and not post_to:
         st.error("Post mode requires a target subreddit.")
@@ -83,55 +168,133 @@ def run_summary(
     if not use_mock:
         validate_user_agent(settings.user_agent)
 
+    profiler = RunProfiler(settings.output_dir, enabled=profile)
+    with profiler.exclusive() as profiling:
+        if profile and not profiling:
+            st.warning("Another session is being profiled; this run is not profiled.")
+        _summarize(settings, profiler, subreddit_names, mode, default_top_limit, use_mock)
+
+
+def _summarize(
+    settings: Settings,
+    profiler: RunProfiler,
+    subreddit_names: List[str],
+    mode: str,
+    default_top_limit: int,
+    use_mock: bool,
+) -> None:
     history_path = settings.output_dir / "metrics_history.csv"
-    history_entries = load_history(history_path)
-    reddit = None if use_mock else create_reddit_client(settings)
+    with profiler.profile("history"):
+        history_entries = load_history(history_path)
+    sub_cfgs = {
+        name: settings.subreddit_configs.get(name, SubredditConfig(name=name, top_posts_limit=default_top_limit))
+        for name in subreddit_names
+    }
 
-    reports = {}
-    new_history = []
-    with st.spinner("Fetching subreddit data..."):
-        for name in subreddit_names:
-            sub_cfg: SubredditConfig = settings.subreddit_configs.get(
-                name, SubredditConfig(name=name, top_posts_limit=default_top_limit)
-            )
-            if use_mock:
-                from community_health_bot.services.mock_data import generate_mock_report
-
-                report: SubredditReport = generate_mock_report(
+    collected: Dict[str, SubredditReport] = {}
+    if use_mock:
+        from community_health_bot.services.mock_data import generate_mock_report
+
+        with profiler.profile("collect"):
+            for name, sub_cfg in sub_cfgs.items():
+                collected[name] = generate_mock_report(
                     name,
                     top_posts_limit=sub_cfg.top_posts_limit,
                     unanswered_limit=sub_cfg.unanswered_limit,
                     include_sections=sub_cfg.include_sections,
                 )
+        # Mock reports bypass the cache, so their history is recorded here.
+        with profiler.profile("history"):
+            _record_history(get_history_cache(history_path), collected)
+    else:
+        with profiler.profile("collect"):
+            if profiler.enabled:
+                # cProfile only sees this thread, so a profiled run bypasses the cache workers.
+                collected = _collect_direct(settings, sub_cfgs)
             else:
-                report = collect_weekly_report(
-                    reddit,
-                    name,
-                    top_posts_limit=sub_cfg.top_posts_limit,
-                    unanswered_limit=sub_cfg.unanswered_limit,
-                    include_sections=sub_cfg.include_sections,
-                )
-            report.history = recent_history_for_subreddit(history_entries, name)
-            reports[name] = report
-            new_history.append(
-                HistoryEntry(
-                    date=datetime.utcnow().date().isoformat(),
-                    subreddit=name,
-                    total_posts=report.metrics.total_posts,
-                    unanswered=report.metrics.unanswered,
-                    unanswered_rate=report.metrics.unanswered_rate,
-                    median_ttf_minutes=report.metrics.median_time_to_first_comment_minutes,
-                )
-            )
+                collected = _collect_cached(settings, sub_cfgs)
 
-    append_history(history_path, new_history)
-    markdown = build_markdown(subreddit_names, reports)
+    reports = {}
+    for name in subreddit_names:
+        if name not in collected:
+            continue
+        # Cached reports are shared between sessions; attach history to a copy.
+        history = recent_history_for_subreddit(history_entries, name)
+        reports[name] = dataclasses.replace(collected[name], history=history)
+    if not reports:
+        st.error("No reports could be collected.")
+        return
+    subreddit_names = [name for name in subreddit_names if name in reports]
+
+    with profiler.profile("render"):
+        markdown = build_markdown(subreddit_names, reports, cache=get_section_cache())
     st.success("Summary generated")
     st.code(markdown, language="markdown")
 
+    if profiler.enabled:
+        written = profiler.write()
+        with st.expander("Profile (hot functions)"):
+            st.caption("Artifacts: " + ", ".join(str(path) for path in written))
+            st.text(profiler.summary())
+
     if mode == "post":
         st.info("Posting via CLI mode is recommended. This UI is report-focused.")
 
 
+def _collect_direct(settings: Settings, sub_cfgs: Dict[str, SubredditConfig]) -> Dict[str, SubredditReport]:
+    """Collect every report on the calling thread, skipping the cache (used when profiling)."""
+    reports: Dict[str, SubredditReport] = {}
+    st.markdown("**Subreddits**")
+    for name, sub_cfg in sub_cfgs.items():
+        row = st.empty()
+        row.markdown(f"- {name}: fetching...")
+        try:
+            reports[name] = _report_collector(settings, sub_cfg)()
+        except Exception as exc:  # noqa: BLE001 - show the failure and keep the other subreddits
+            row.markdown(f"- {name}: failed ({exc})")
+        else:
+            row.markdown(f"- {name}: fetched")
+    return reports
+
+
+def _collect_cached(settings: Settings, sub_cfgs: Dict[str, SubredditConfig]) -> Dict[str, SubredditReport]:
+    """
+    Serve reports from the shared cache, refreshing missing or stale ones in the background.
+
+    Stale reports are shown immediately while their refresh runs; only subreddits with
+    nothing cached are waited for. History is recorded by the refresh itself.
+    """
+    cache = get_report_cache()
+    reports: Dict[str, SubredditReport] = {}
+    pending: Dict[Future, str] = {}
+    rows = {}
+    st.markdown("**Subreddits**")
+    for name, sub_cfg in sub_cfgs.items():
+        rows[name] = st.empty()
+        entry, future = cache.get_or_refresh(sub_cfg, _report_collector(settings, sub_cfg))
+        if entry is not None:
+            reports[name] = entry.report
+            fetched = datetime.fromtimestamp(entry.fetched_at).strftime("%H:%M")
+            note = " (stale; refreshing in the background, rerun to see it)" if future else ""
+            rows[name].markdown(f"- {name}: cached from {fetched}{note}")
+        else:
+            pending[future] = name
+            rows[name].markdown(f"- {name}: fetching...")
+
+    if pending:
+        progress = st.progress(0.0, text=f"Fetching {len(pending)} subreddit(s)")
+        for done, future in enumerate(as_completed(pending), start=1):
+            name = pending[future]
+            try:
+                entry: CachedReport = future.result()
+            except Exception as exc:  # noqa: BLE001 - show the failure and keep the other subreddits
+                rows[name].markdown(f"- {name}: failed ({exc})")
+            else:
+                reports[name] = entry.report
+                rows[name].markdown(f"- {name}: fetched")
+            progress.progress(done / len(pending), text=f"Fetched {done}/{len(pending)}")
+    return reports
+
+
 if __name__ == "__main__":
     main()
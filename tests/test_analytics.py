@@ -0,0 +1,107 @@
+import time
+import tracemalloc
+
+from community_health_bot.services.analytics import TopK, collect_weekly_report
+from community_health_bot.services.synthetic import SyntheticProfile, SyntheticReddit
+from community_health_bot.services.velocity import VelocityStore
+
+
+def test_top_k_keeps_largest_items_and_first_seen_on_ties():
+    top = TopK(3)
+    for key, item in [(5, "a"), (1, "b"), (9, "c"), (5, "d"), (7, "e"), (5, "f")]:
+        top.push(key, item)
+    assert top.items() == ["c", "e", "a"]
+    assert len(top) == 3
+
+
+def test_collect_weekly_report_memory_does_not_grow_with_window():
+    peaks = {}
+    for window_days in (3, 30):
+        profile = SyntheticProfile(posts_per_day=100, horizon_days=2 * window_days)
+        reddit = SyntheticReddit(seed=5, profile=profile)
+        tracemalloc.start()
+        try:
+            report = collect_weekly_report(
+                reddit, "r/big", top_posts_limit=10, unanswered_limit=10, window_days=window_days, scan_limit=10**9
+            )
+            peaks[window_days] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert report.metrics.total_posts > 50 * window_days
+        assert len(report.top_posts) == 10
+
+    # ~6000 posts streamed for the 30 day window; only bounded state is kept.
+    assert max(peaks.values()) < 256 * 1024
+
+
+class _Post:
+    def __init__(self, title, score, num_comments, hours_old, now):
+        self.title = title
+        self.score = score
+        self.num_comments = num_comments
+        self.created_utc = now - hours_old * 3600
+        self.link_flair_text = None
+        self.is_self = True
+        self.permalink = f"/r/test/comments/{title}/"
+
+
+class _Listing:
+    def __init__(self, posts):
+        self.posts = posts
+
+    def subreddit(self, name):
+        return self
+
+    def top(self, time_filter="week", limit=None):
+        return iter(sorted(self.posts, key=lambda p: p.score, reverse=True)[:limit])
+
+    def new(self, limit=None):
+        return iter(self.posts[:limit])
+
+
+def test_rising_and_unanswered_are_ranked_not_first_seen():
+    now = time.time()
+    posts = [
+        # Slow risers are listed before the fastest ones; first-N selection would keep them.
+        _Post("slow", 60, 3, 10, now),
+        _Post("steady", 70, 3, 7, now),
+        _Post("fast", 400, 3, 20, now),
+        _Post("rocket", 450, 3, 5, now),
+        _Post("fresh statement", 0, 0, 2, now),
+        _Post("Why is DNS broken?", 0, 0, 6, now),
+        _Post("old statement", 0, 0, 60, now),
+        _Post("How do I reset RAID?", 0, 0, 72, now),
+    ]
+    report = collect_weekly_report(_Listing(posts), "r/test", top_posts_limit=2, unanswered_limit=2)
+
+    assert [p.title for p in report.rising_posts] == ["rocket", "fast"]
+    # Question-like first, then longest waiting.
+    assert [u.title for u in report.unanswered] == ["How do I reset RAID?", "Why is DNS broken?"]
+    assert [u.title for u in report.aging_unanswered] == ["How do I reset RAID?", "old statement"]
+    assert report.metrics.unanswered == 4
+
+
+def test_velocity_store_ranks_rising_posts_by_recent_velocity(tmp_path):
+    now = time.time()
+    store = VelocityStore(tmp_path / "score_snapshots.json")
+    # An old viral post has a high lifetime average but has stalled; a newer one is accelerating.
+    store.record("viral", now - 30 * 3600, 900, 50, now - 2 * 3600)
+    store.record("viral", now - 30 * 3600, 905, 51, now - 3600)
+    store.record("climber", now - 6 * 3600, 20, 2, now - 2 * 3600)
+    store.record("climber", now - 6 * 3600, 60, 5, now - 3600)
+    store.save()
+    store = VelocityStore.load(tmp_path / "score_snapshots.json")
+
+    viral = _Post("viral", 910, 52, 30, now)
+    climber = _Post("climber", 140, 9, 6, now)
+    viral.id, climber.id = "viral", "climber"
+    lifetime = collect_weekly_report(_Listing([viral, climber]), "r/test", top_posts_limit=2, unanswered_limit=2)
+    recent = collect_weekly_report(
+        _Listing([viral, climber]), "r/test", top_posts_limit=2, unanswered_limit=2, velocity=store
+    )
+
+    assert [p.title for p in lifetime.rising_posts] == ["viral", "climber"]
+    # viral gained 5 points in the last hour, below the rising threshold; climber gained 80.
+    assert [p.title for p in recent.rising_posts] == ["climber"]
+    assert len(store) == 2
+    assert store.prune(now=now + 20 * 3600) == 1
@@ -0,0 +1,38 @@
+import time
+
+from community_health_bot.services.archive import SummaryArchive
+from community_health_bot.services.reporting import LATEST_SUMMARY_FILENAME, stream_output
+
+
+def test_identical_summaries_are_archived_once(tmp_path):
+    archive = SummaryArchive(tmp_path / "archive")
+
+    def render(lines):
+        writer = archive.writer()
+        stream_output(tmp_path, lines, archive=writer)
+        return writer.entry
+
+    a = render(["# Summary\n", "- posts: 10"])
+    b = render(["# Summary\n", "- posts: 10"])
+    c = render(["# Summary\n", "- posts: 11"])
+
+    assert a.digest == b.digest != c.digest
+    assert len(list((tmp_path / "archive").glob("*.md.gz"))) == 2
+    assert [v.digest for v in archive.versions()] == [a.digest, c.digest]
+    assert archive.read(a.digest) == "# Summary\n- posts: 10"
+    # The latest pointer holds the newest summary and no temp files are left behind.
+    assert (tmp_path / LATEST_SUMMARY_FILENAME).read_text(encoding="utf-8") == "# Summary\n- posts: 11"
+    assert not list(tmp_path.glob(".*.tmp")) and not list((tmp_path / "archive").glob(".*.tmp"))
+
+    assert archive.purge() == 0
+    assert archive.purge(now=time.time() + 3 * 86400) == 2
+    assert archive.versions() == []
+
+
+def test_versions_citing_deleted_posts_are_dropped(tmp_path):
+    archive = SummaryArchive(tmp_path / "archive")
+    kept = archive.add(stream_output(tmp_path, ["- [a](https://x/p10)"])[0])
+    archive.add(stream_output(tmp_path, ["- [b](https://x/p1)"])[0])
+
+    assert archive.drop_citing(["https://x/p1"]) == 1
+    assert [v.digest for v in archive.versions()] == [kept.digest]
@@ -0,0 +1,39 @@
+import json
+import math
+from pathlib import Path
+
+from community_health_bot.services.export import (
+    read_column,
+    read_columnar_header,
+    report_tables,
+    write_columnar,
+    write_ndjson,
+)
+from community_health_bot.services.mock_data import generate_mock_report
+
+
+def test_write_ndjson_one_line_per_subreddit(tmp_path: Path):
+    names = ["r/one", "r/two"]
+    reports = {name: generate_mock_report(name, top_posts_limit=2) for name in names}
+
+    path = write_ndjson(tmp_path / "reports.ndjson", names, reports)
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    assert [json.loads(line)["subreddit"] for line in lines] == names
+    assert len(json.loads(lines[0])["top_posts"]) == 2
+
+
+def test_columnar_round_trip_single_column(tmp_path: Path):
+    names = ["r/one", "r/two"]
+    reports = {name: generate_mock_report(name, top_posts_limit=3, unanswered_limit=2) for name in names}
+    reports["r/two"].metrics.median_time_to_first_comment_minutes = None
+
+    path = write_columnar(tmp_path / "reports.col", report_tables(names, reports))
+
+    header = read_columnar_header(path)
+    assert header["tables"]["metrics"]["rows"] == 2
+    assert read_column(path, "metrics", "subreddit") == names
+    ttf = read_column(path, "metrics", "median_ttf")
+    assert ttf[0] == 12.5 and math.isnan(ttf[1])
+    assert read_column(path, "posts", "score")[:3] == [140, 130, 120]
+    assert read_column(path, "unanswered", "question_like") == [True] * len(read_column(path, "unanswered", "rank"))
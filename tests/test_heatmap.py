@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from community_health_bot.services.export import read_column, report_tables, write_columnar
+from community_health_bot.services.heatmap import HeatmapStore, SubredditHeatmap, cell_index
+from community_health_bot.services.mock_data import generate_mock_report
+from community_health_bot.services.tracking import settle_heatmap_posts
+
+# A Monday, 12:00 UTC.
+NOON = datetime(2026, 1, 5, 12, tzinfo=timezone.utc).timestamp()
+
+
+def test_posts_are_counted_once_after_they_settle(tmp_path):
+    heatmap = SubredditHeatmap()
+    now = NOON + 30 * 3600
+    assert heatmap.observe("a", NOON, 0, now)
+    assert heatmap.observe("b", NOON - 3600, 2, now)
+    assert not heatmap.observe("c", now - 3600, 0, now)  # too new to judge
+    assert heatmap.add_ttf(now - 3600, 12.0)
+    assert heatmap.add_ttf(NOON, None) is False
+    heatmap.advance()
+
+    store = HeatmapStore(tmp_path / "heatmap.json")
+    store._heatmaps["r/test"] = heatmap
+    store.save()
+    reloaded = HeatmapStore.load(tmp_path / "heatmap.json").for_subreddit("r/test")
+
+    # The next run sees the same posts again; only the newly settled one is added.
+    later = now + 24 * 3600
+    assert not reloaded.observe("a", NOON, 0, later)
+    assert not reloaded.add_ttf(now - 3600, 12.0)
+    assert reloaded.observe("c", now - 3600, 0, later)
+    assert reloaded.pending == {}
+    reloaded.advance()
+
+    snapshot = reloaded.snapshot()
+    monday_noon = cell_index(NOON)
+    assert (snapshot.posts[monday_noon], snapshot.unanswered[monday_noon]) == (1, 1)
+    assert (snapshot.posts[monday_noon - 1], snapshot.unanswered[monday_noon - 1]) == (1, 0)
+    assert sum(snapshot.posts) == 3
+    ttf_cell = cell_index(now - 3600)
+    assert snapshot.ttf_samples[ttf_cell] == 1
+    # Log buckets are within ~20% of the sampled value.
+    assert abs(snapshot.median_ttf_minutes[ttf_cell] - 12.0) / 12.0 < 0.2
+
+
+def test_heatmap_table_holds_only_cells_with_data(tmp_path):
+    report = generate_mock_report("r/one")
+    heatmap = SubredditHeatmap()
+    heatmap.observe("a", NOON, 0, NOON + 48 * 3600)
+    report.heatmap = heatmap.snapshot()
+
+    path = write_columnar(tmp_path / "reports.col", report_tables(["r/one"], {"r/one": report}))
+    assert read_column(path, "heatmap", "weekday") == [0]
+    assert read_column(path, "heatmap", "hour") == [12]
+    assert read_column(path, "heatmap", "unanswered") == [1]
+    assert math.isnan(read_column(path, "heatmap", "median_ttf")[0])
+
+
+class _InfoReddit:
+    def __init__(self, live):
+        self.live = live
+        self.info_calls = []
+
+    def info(self, fullnames):
+        self.info_calls.append(len(fullnames))
+        return iter([self.live[name] for name in fullnames if name in self.live])
+
+
+def test_pending_posts_settle_through_batched_lookups():
+    # A busy subreddit: every post the scan sees is under an hour old.
+    heatmap = SubredditHeatmap()
+    for i in range(150):
+        assert not heatmap.observe(f"p{i}", NOON + i * 20, 0, NOON + 3600)
+    heatmap.advance()
+    assert len(heatmap.pending) == 150
+
+    live = {
+        f"t3_p{i}": SimpleNamespace(id=f"p{i}", num_comments=i % 2, author="someone", removed_by_category=None)
+        for i in range(1, 150)
+    }
+    reddit = _InfoReddit(live)  # p0 has been deleted since
+    assert settle_heatmap_posts(reddit, heatmap, now=NOON + 30 * 3600) == 149
+    assert reddit.info_calls == [100, 50]
+    assert heatmap.pending == {}
+    assert sum(heatmap.posts) == 149 and sum(heatmap.unanswered) == 74
+    # Already counted: the scan seeing them again adds nothing.
+    assert not heatmap.observe("p5", NOON + 100, 3, NOON + 31 * 3600)
@@ -0,0 +1,45 @@
+from community_health_bot.core.models import HistoryEntry
+from community_health_bot.services.history import HistoryCache, append_history, read_history
+
+
+def _entry(day: int, subreddit: str = "r/example") -> HistoryEntry:
+    return HistoryEntry(
+        date=f"2024-01-{day:02d}",
+        subreddit=subreddit,
+        total_posts=10 + day,
+        unanswered=day,
+        unanswered_rate=day / 100.0,
+        median_ttf_minutes=None if day % 2 else 5.0,
+    )
+
+
+def test_history_cache_reads_appended_rows_incrementally(tmp_path):
+    path = tmp_path / "metrics_history.csv"
+    cache = HistoryCache(path)
+    assert cache.load() == []
+
+    append_history(path, [_entry(1), _entry(2)])
+    first = cache.load()
+    assert [e.date for e in first] == ["2024-01-01", "2024-01-02"]
+    assert cache.load() is first
+    assert cache.full_loads == 1
+
+    append_history(path, [_entry(3, "r/other")])
+    # A half-written row is left for the next load.
+    with path.open("a", encoding="utf-8", newline="") as fh:
+        fh.write("2024-01-04,r/example,1")
+    grown = cache.load()
+    assert grown is first
+    assert cache.incremental_loads == 1
+    assert grown == read_history(path)[:3]
+    with path.open("a", encoding="utf-8", newline="") as fh:
+        fh.write("4,4,0.04,\r\n")
+    assert cache.load() == read_history(path)
+    assert len(cache.load()) == 4
+
+    # Rewriting the file (e.g. a manual edit) triggers a full re-read.
+    path.unlink()
+    append_history(path, [_entry(9)])
+    reloaded = cache.load()
+    assert [e.date for e in reloaded] == ["2024-01-09"]
+    assert cache.full_loads == 2
@@ -0,0 +1,31 @@
+import time
+from pathlib import Path
+
+from community_health_bot.services.instrumentation import PROMETHEUS_FILENAME, RunInstrumentation
+
+
+def test_nested_stages_are_exclusive_and_requests_attributed(tmp_path: Path):
+    instr = RunInstrumentation()
+    with instr.stage("r/a", "new"):
+        instr.record_request(100)
+        with instr.stage("r/a", "ttf"):
+            time.sleep(0.02)
+            instr.record_request(50)
+    instr.record_sleep("r/a", 1.5)
+
+    new = instr.stages[("r/a", "new")]
+    ttf = instr.stages[("r/a", "ttf")]
+    assert (new.requests, new.bytes) == (1, 100)
+    assert (ttf.requests, ttf.bytes) == (1, 50)
+    assert ttf.seconds >= 0.02
+    assert new.seconds < ttf.seconds
+
+    summary = instr.summary()
+    assert summary["requests"] == 2
+    assert summary["rate_limit_sleep_seconds"] == 1.5
+
+    path = instr.write_prometheus(tmp_path)
+    assert path.name == PROMETHEUS_FILENAME
+    text = path.read_text()
+    assert 'community_health_bot_stage_requests{subreddit="r/a",stage="ttf"} 1' in text
+    assert 'stage="rate_limit_sleep"' in text
@@ -0,0 +1,73 @@
+import json
+import logging
+import queue
+from pathlib import Path
+
+from community_health_bot.services.logging import (
+    BatchingQueueListener,
+    BatchRotatingFileHandler,
+    BoundedQueueHandler,
+    JsonLinesFormatter,
+    log_json,
+)
+
+
+def _pipeline(name: str, handler: logging.Handler, maxsize: int = 0, max_dropped: int = 1000):
+    log_queue = queue.Queue(maxsize=maxsize)
+    queue_handler = BoundedQueueHandler(log_queue, max_dropped=max_dropped)
+    listener = BatchingQueueListener(log_queue, [handler], queue_handler=queue_handler)
+    logger = logging.getLogger(name)
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, queue_handler, listener
+
+
+def test_json_lines_file_output(tmp_path: Path):
+    log_path = tmp_path / "bot.jsonl"
+    handler = BatchRotatingFileHandler(log_path, maxBytes=0, encoding="utf-8", delay=True)
+    handler.setFormatter(JsonLinesFormatter())
+    logger, _, listener = _pipeline("test_json_lines", handler)
+    listener.start()
+
+    for i in range(5):
+        log_json(logger, "event", index=i)
+    listener.stop()
+    handler.close()
+
+    rows = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [row["index"] for row in rows] == list(range(5))
+    assert rows[0]["msg"] == "event" and rows[0]["level"] == "INFO"
+
+
+def test_drops_are_bounded_and_reported(tmp_path: Path):
+    log_path = tmp_path / "bot.jsonl"
+    handler = BatchRotatingFileHandler(log_path, maxBytes=0, encoding="utf-8", delay=True)
+    handler.setFormatter(JsonLinesFormatter())
+    logger, queue_handler, listener = _pipeline("test_drops", handler, maxsize=2, max_dropped=3)
+
+    # Listener not started yet: the queue fills, then up to max_dropped records are shed.
+    for i in range(5):
+        log_json(logger, "event", index=i)
+    assert queue_handler.dropped == 3
+
+    listener.start()
+    listener.stop()
+    handler.close()
+    rows = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert rows[-1] == {**rows[-1], "msg": "log_records_dropped", "dropped": 3}
+
+
+def test_rotation_counts_bytes_not_characters(tmp_path: Path):
+    log_path = tmp_path / "bot.log"
+    handler = BatchRotatingFileHandler(log_path, maxBytes=100, backupCount=3, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    # 30 characters, but 90 bytes in UTF-8.
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "€" * 30, None, None)
+    for _ in range(4):
+        handler.emit_batch([record])
+    handler.close()
+
+    sizes = [path.stat().st_size for path in tmp_path.iterdir()]
+    assert len(sizes) == 4
+    assert max(sizes) <= 100
@@ -0,0 +1,41 @@
+from community_health_bot.config.settings import SubredditConfig
+from community_health_bot.core.models import HistoryEntry
+from community_health_bot.services.planner import format_plan, plan_run
+
+
+def test_plan_uses_history_volume_and_warns_when_over_budget():
+    history = [
+        HistoryEntry(
+            date="2024-01-01",
+            subreddit="r/quiet",
+            total_posts=20,
+            unanswered=10,
+            unanswered_rate=0.5,
+            median_ttf_minutes=5.0,
+        )
+    ]
+    configs = {"r/quiet": SubredditConfig(name="r/quiet", top_posts_limit=6, unanswered_limit=8)}
+
+    plan = plan_run(["r/quiet", "r/busy"], configs, history, default_top_limit=250)
+    quiet, busy = plan.subreddits
+
+    # 20 posts in the window; the 10 unanswered ones skip TTF sampling.
+    assert (quiet.top_requests, quiet.new_requests, quiet.ttf_requests) == (1, 1, 10)
+    # No history: assume the full /new listing (1250 posts, 13 pages) and a full TTF sample.
+    assert (busy.top_requests, busy.new_requests, busy.ttf_requests) == (3, 13, 30)
+    assert plan.total_requests == 1 + 12 + 46
+    assert not plan.warnings
+
+    # Tracked and pending heatmap posts add one /api/info lookup per 100 ids each.
+    settling = plan_run(
+        ["r/quiet"], configs, history, tracked_counts={"r/quiet": 120}, pending_heatmap_counts={"r/quiet": 5000}
+    )
+    assert (settling.subreddits[0].refresh_requests, settling.subreddits[0].settle_requests) == (2, 50)
+    assert settling.total_requests == 1 + 12 + 2 + 50
+
+    tight = plan_run(["r/busy"] * 20, configs, history, default_top_limit=250, schedule_minutes=5)
+    assert any("exceeds the 5 min schedule" in warning for warning in tight.warnings)
+    # Going over the per-schedule budget is reported once, by the run time warning.
+    assert not any("budget" in warning for warning in tight.warnings)
+    assert "WARNING" in format_plan(tight)
+    assert "- Burst headroom: 941 of 1000 requests left" in format_plan(plan)
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from community_health_bot.services.profiling import RunProfiler
+
+
+def _busy() -> int:
+    return sum(i * i for i in range(20000))
+
+
+def test_profiler_writes_artifacts_per_label(tmp_path: Path):
+    profiler = RunProfiler(tmp_path, top_n=5)
+    with profiler.profile("collect"):
+        _busy()
+    with profiler.profile("render"):
+        _busy()
+
+    written = profiler.write()
+
+    names = sorted(path.name.split("_", 2)[-1] for path in written)
+    assert names == ["collect.prof", "render.prof", "top.txt"]
+    assert "_busy" in (tmp_path / written[-1].name).read_text()
+
+
+def test_disabled_profiler_records_nothing(tmp_path: Path):
+    profiler = RunProfiler(tmp_path, enabled=False)
+    with profiler.profile("collect"):
+        _busy()
+    assert profiler.write() == []
+
+
+def test_only_one_run_profiles_at_a_time(tmp_path: Path):
+    first = RunProfiler(tmp_path)
+    second = RunProfiler(tmp_path)
+    with first.exclusive() as profiling:
+        assert profiling
+        with second.exclusive() as also_profiling:
+            assert not also_profiling
+            with second.profile("collect"):
+                _busy()
+    assert second.write() == []
+    with RunProfiler(tmp_path).exclusive() as profiling:
+        assert profiling
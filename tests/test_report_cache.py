@@ -0,0 +1,58 @@
+import threading
+
+from community_health_bot.config.settings import SubredditConfig
+from community_health_bot.services.mock_data import generate_mock_report
+from community_health_bot.services.report_cache import ReportCache, config_fingerprint
+
+
+def test_report_cache_deduplicates_refreshes_and_serves_stale_reports():
+    now = [7200.0]
+    cache = ReportCache(max_workers=4, bucket_seconds=3600, clock=lambda: now[0])
+    sub_cfg = SubredditConfig(name="r/example")
+    release = threading.Event()
+    calls = []
+
+    def collect():
+        calls.append(1)
+        release.wait(5)
+        return generate_mock_report("r/example")
+
+    assert cache.get(sub_cfg) == (None, False)
+    futures = [cache.refresh(sub_cfg, collect) for _ in range(5)]
+    assert all(future is futures[0] for future in futures)
+    release.set()
+    first = futures[0].result(timeout=5)
+    assert len(calls) == 1
+    assert cache.deduplicated == 4
+
+    entry, fresh = cache.get(sub_cfg)
+    assert fresh and entry is first
+
+    # Next hour: the old report is still served, marked stale, while a refresh runs.
+    now[0] += 3600
+    entry, future = cache.get_or_refresh(sub_cfg, collect)
+    assert entry is first and future is not None
+    assert future.result(timeout=5).bucket == first.bucket + 1
+    assert len(calls) == 2
+    assert cache.get(sub_cfg)[1] is True
+    # The flight is dropped before its Future resolves, so this holds right after result().
+    assert cache.in_flight() == 0
+    cache.shutdown()
+
+
+def test_config_fingerprint_tracks_report_settings():
+    base = SubredditConfig(name="r/example")
+    assert config_fingerprint(base) == config_fingerprint(SubredditConfig(name="r/Example"))
+    assert config_fingerprint(base) != config_fingerprint(SubredditConfig(name="r/example", top_posts_limit=5))
+
+
+def test_failed_refresh_is_not_left_in_flight():
+    cache = ReportCache(max_workers=1)
+
+    def collect():
+        raise RuntimeError("reddit down")
+
+    future = cache.refresh(SubredditConfig(name="r/example"), collect)
+    assert isinstance(future.exception(timeout=5), RuntimeError)
+    assert cache.in_flight() == 0
+    cache.shutdown()
@@ -1,3 +1,5 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from community_health_bot.core.models import (
@@ -8,7 +10,8 @@ from community_health_bot.core.models import (
     Trend,
     UnansweredSummary,
 )
-from community_health_bot.services.reporting import build_markdown
+from community_health_bot.services.mock_data import generate_mock_report
+from community_health_bot.services.reporting import SectionCache, build_markdown, iter_markdown, stream_output
 
 
 def test_build_markdown_basic():
@@ -51,3 +54,46 @@ def test_build_markdown_basic():
     assert "Aging unanswered" in md
     assert "(question)" in md
     assert "Recent history" in md
+
+
+def test_stream_output_matches_build_markdown(tmp_path: Path):
+    names = ["r/one", "r/two"]
+    reports = {name: generate_mock_report(name) for name in names}
+    expected = build_markdown(names, reports)
+
+    echo = io.StringIO()
+    out_path, excerpt = stream_output(tmp_path, iter_markdown(names, reports), echo=echo, excerpt_chars=200)
+
+    assert out_path.read_text(encoding="utf-8") == expected
+    assert echo.getvalue() == expected + "\n"
+    assert excerpt == expected[:200]
+
+
+def test_section_cache_reuses_unchanged_sections():
+    names = ["r/one"]
+    reports = {"r/one": generate_mock_report("r/one")}
+    cache = SectionCache()
+
+    first = build_markdown(names, reports, cache=cache)
+    second = build_markdown(names, reports, cache=cache)
+    assert first == second == build_markdown(names, reports)
+    assert cache.hits == 5
+
+    reports["r/one"].top_posts[0].score = 9999
+    changed = build_markdown(names, reports, cache=cache)
+    assert "score: 9999" in changed
+    assert cache.misses == 6
+
+
+def test_section_cache_is_safe_to_share_between_threads():
+    names = [f"r/sub{i}" for i in range(6)]
+    reports = {name: generate_mock_report(name) for name in names}
+    expected = build_markdown(names, reports)
+    # Small enough that threads keep evicting each other's entries.
+    cache = SectionCache(max_entries=4)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: build_markdown(names, reports, cache=cache), range(32)))
+
+    assert set(results) == {expected}
+    assert len(cache._entries) <= 4
@@ -0,0 +1,82 @@
+import gzip
+import http.client
+import json
+import threading
+
+from community_health_bot.core.models import HistoryEntry
+from community_health_bot.services.export import write_ndjson
+from community_health_bot.services.history import append_history
+from community_health_bot.services.mock_data import generate_mock_report
+from community_health_bot.services.reporting import build_markdown
+from community_health_bot.services.server import make_server
+
+
+def _get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_serves_latest_artifacts_with_conditional_get_and_gzip(tmp_path):
+    names = ["r/one", "r/two"]
+    reports = {name: generate_mock_report(name) for name in names}
+    write_ndjson(tmp_path / "reports_2026-01-01.ndjson", names[:1], reports)
+    write_ndjson(tmp_path / "reports_2026-01-02.ndjson", names, reports)
+    (tmp_path / "summary_2026-01-02.md").write_text(build_markdown(names, reports), encoding="utf-8")
+    append_history(
+        tmp_path / "metrics_history.csv",
+        [HistoryEntry(f"2026-01-0{day}", "r/two", 10 + day, 1, 0.1, None) for day in range(1, 9)],
+    )
+
+    server = make_server(tmp_path, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        response, body = _get(port, "/reports/two")
+        assert response.status == 200
+        assert json.loads(body)["subreddit"] == "r/two"
+        etag = response.getheader("ETag")
+
+        response, body = _get(port, "/reports/r/two", {"If-None-Match": etag})
+        assert response.status == 304 and body == b""
+
+        response, body = _get(port, "/summary/r/one", {"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        section = gzip.decompress(body).decode("utf-8")
+        assert section.startswith("## r/one") and "## r/two" not in section
+        assert response.getheader("ETag") != _get(port, "/summary/r/one")[0].getheader("ETag")
+
+        response, body = _get(port, "/history/two?limit=3")
+        assert [row["total_posts"] for row in json.loads(body)] == [18, 17, 16]
+
+        assert _get(port, "/reports/three")[0].status == 404
+        assert server.RequestHandlerClass.reader.hits >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_corrupt_ndjson_lines_are_skipped(tmp_path):
+    names = ["r/one", "r/two"]
+    reports = {name: generate_mock_report(name) for name in names}
+    path = tmp_path / "reports_2026-01-02.ndjson"
+    write_ndjson(path, names, reports)
+    # A run interrupted mid-write, plus a line from another tool.
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"foo": 1}\n{"subreddit": "r/thr')
+
+    server = make_server(tmp_path, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        response, body = _get(port, "/")
+        assert response.status == 200
+        assert json.loads(body)["subreddits"] == names
+        assert json.loads(_get(port, "/reports/two")[1])["subreddit"] == "r/two"
+        assert _get(port, "/reports/three")[0].status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import requests
+
+from community_health_bot.config.settings import Settings
+from community_health_bot.reddit.client import create_reddit_client
+from community_health_bot.services.analytics import collect_weekly_report
+from community_health_bot.services.simulator import SimulatorConfig, start_simulator
+
+AUTH = {"Authorization": "bearer simulated-token"}
+
+
+def test_listing_pagination_and_rate_limit_headers():
+    server, simulator = start_simulator(config=SimulatorConfig(budget=3, window_seconds=600))
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        first = requests.get(f"{base}/r/test/new", params={"limit": 100}, headers=AUTH, timeout=5)
+        assert first.status_code == 200
+        assert first.headers["X-Ratelimit-Used"] == "1"
+        assert first.headers["X-Ratelimit-Remaining"] == "2.0"
+        page = first.json()["data"]
+        assert len(page["children"]) == 100
+
+        second = requests.get(
+            f"{base}/r/test/new", params={"limit": 100, "after": page["after"]}, headers=AUTH, timeout=5
+        ).json()["data"]
+        first_ids = {child["data"]["id"] for child in page["children"]}
+        assert not first_ids & {child["data"]["id"] for child in second["children"]}
+
+        requests.get(f"{base}/r/test/top", params={"t": "week"}, headers=AUTH, timeout=5)
+        throttled = requests.get(f"{base}/r/test/new", headers=AUTH, timeout=5)
+        assert throttled.status_code == 429
+        assert simulator.throttled_count == 1
+    finally:
+        server.shutdown()
+
+
+def test_praw_client_collects_report_from_simulator(tmp_path: Path):
+    # A short window keeps prawcore's request pacing (reset / remaining) from slowing the test.
+    server, simulator = start_simulator(config=SimulatorConfig(window_seconds=5))
+    settings = Settings(
+        client_id="id",
+        client_secret="secret",
+        username="bot",
+        password="pw",
+        user_agent="server:community-health-bot:test (by /u/bot)",
+        output_dir=tmp_path,
+        subreddit_configs={},
+        reddit_api_url=f"http://127.0.0.1:{server.server_address[1]}",
+    )
+    try:
+        reddit = create_reddit_client(settings)
+        report = collect_weekly_report(reddit, "test", top_posts_limit=5, unanswered_limit=5)
+    finally:
+        server.shutdown()
+
+    assert len(report.top_posts) == 5
+    assert report.metrics.total_posts == 50
+    assert report.metrics.median_time_to_first_comment_minutes is not None
+    assert simulator.request_count > 2
+
+
+def test_unknown_after_returns_an_empty_page():
+    server, simulator = start_simulator()
+    try:
+        first = simulator.listing("test", "new", {"limit": "5"})["data"]
+        assert len(first["children"]) == 5
+        for sort in ("new", "top"):
+            for after in ("t3_missing", "garbage"):
+                page = simulator.listing("test", sort, {"limit": "5", "after": after})["data"]
+                assert page["children"] == [] and page["after"] is None
+        # An id from another subreddit's /new is unknown here too.
+        other = simulator.listing("other", "new", {"limit": "1"})["data"]["children"][0]["data"]["id"]
+        assert simulator.listing("test", "new", {"after": f"t3_{other}"})["data"]["children"] == []
+    finally:
+        server.shutdown()
@@ -0,0 +1,31 @@
+from community_health_bot.services.analytics import collect_weekly_report
+from community_health_bot.services.synthetic import SyntheticProfile, SyntheticReddit
+
+NOW = 1_700_000_000.0
+
+
+def test_synthetic_stream_is_seeded_and_newest_first():
+    sub = SyntheticReddit(seed=7, now=NOW).subreddit("r/test")
+    first = [(p.id, p.score, p.created_utc) for p in sub.new(limit=200)]
+    again = [(p.id, p.score, p.created_utc) for p in sub.new(limit=200)]
+    other = [(p.id, p.score) for p in SyntheticReddit(seed=8, now=NOW).subreddit("r/test").new(limit=200)]
+
+    assert first == again
+    assert first != other
+    assert [c for _, _, c in first] == sorted((c for _, _, c in first), reverse=True)
+
+
+def test_collect_weekly_report_runs_unchanged_on_synthetic_data():
+    profile = SyntheticProfile(posts_per_day=40, unanswered_probability=0.3)
+    # collect_weekly_report windows on the wall clock, so generate relative to now.
+    reddit = SyntheticReddit(seed=1, profile=profile)
+
+    report = collect_weekly_report(reddit, "r/test", top_posts_limit=5, unanswered_limit=400)
+
+    scores = [post.score for post in report.top_posts]
+    assert len(scores) == 5 and scores == sorted(scores, reverse=True)
+    # ~280 posts/week at 40/day; the /new scan (2000 posts) covers both weeks.
+    assert 200 < report.metrics.total_posts < 360
+    assert 0.2 < report.metrics.unanswered_rate < 0.45
+    assert report.metrics.median_time_to_first_comment_minutes is not None
+    assert {t.metric for t in report.trends} == {"posts_week_over_week", "unanswered_rate_week_over_week"}
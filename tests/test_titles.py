@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from community_health_bot.services.titles import TitleClassifier, TitleMemoStore
+
+
+def test_question_matching_uses_whole_words_and_subreddit_keywords():
+    classifier = TitleClassifier(keywords=["help", "any tips"])
+    assert classifier.is_question("Is my SSD dying")
+    assert classifier.is_question("  how do I mount this")
+    assert classifier.is_question("Printer offline again?")
+    assert not classifier.is_question("Isolated VLAN for IoT devices")
+    assert not classifier.is_question("Whatever works: my homelab")
+    assert classifier.is_question("Need help with DNS")
+    assert classifier.is_question("Any tips for RAID rebuilds")
+    assert not classifier.is_question("Helpful DNS guide")
+    assert not TitleClassifier().is_question("Need help with DNS")
+
+
+def test_title_memo_persists_by_post_id_and_resets_on_keyword_change(tmp_path):
+    path = tmp_path / "title_memo.json"
+    store = TitleMemoStore(path)
+    classifier = store.classifier_for("r/test", ["help"])
+    records = [
+        SimpleNamespace(id="a", title="help me", question_like=None),
+        SimpleNamespace(id="b", title="Guide", question_like=None),
+    ]
+    classifier.annotate(records)
+    assert [r.question_like for r in records] == [True, False]
+    store.save()
+
+    reloaded = TitleMemoStore.load(path).classifier_for("r/test", ["help"])
+    # Memoized by id: the stored answer wins without re-matching the title.
+    assert reloaded.classify("a", "unrelated text") is True
+    assert reloaded.memo_hits == 1
+    assert TitleMemoStore.load(path).classifier_for("r/test", ["eli5"]).memo == {}
+
+
+def test_memo_evicts_least_recently_used():
+    classifier = TitleClassifier(max_memo=2)
+    classifier.classify("a", "How?")
+    classifier.annotate([SimpleNamespace(id="b", title="Guide", question_like=None)])
+    # A hit keeps "a" recent, so adding "c" evicts "b".
+    classifier.annotate([SimpleNamespace(id="a", title="How?", question_like=None)])
+    classifier.classify("c", "Setup")
+    assert list(classifier.memo) == ["a", "c"]
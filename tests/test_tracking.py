@@ -0,0 +1,115 @@
+import time
+from types import SimpleNamespace
+
+from community_health_bot.services.analytics import collect_weekly_report
+from community_health_bot.services.tracking import (
+    TrackedPost,
+    TrackedPostStore,
+    TrackedRefresher,
+    refresh_tracked_posts,
+)
+
+
+class _InfoReddit:
+    """Answers /api/info lookups and serves an empty /new and /top listing."""
+
+    def __init__(self, live, listing=()):
+        self.live = live
+        self.listing = list(listing)
+        self.info_calls = []
+
+    def info(self, fullnames):
+        self.info_calls.append(len(fullnames))
+        return iter([self.live[name] for name in fullnames if name in self.live])
+
+    def subreddit(self, name):
+        return self
+
+    def top(self, time_filter="week", limit=None):
+        return iter([])
+
+    def new(self, limit=None):
+        return iter(self.listing)
+
+
+def _submission(post_id, score, num_comments, author="someone"):
+    return SimpleNamespace(
+        id=post_id,
+        fullname=f"t3_{post_id}",
+        score=score,
+        num_comments=num_comments,
+        author=author,
+        removed_by_category=None,
+        link_flair_text=None,
+    )
+
+
+def _tracked(post_id, title, hours_old, now):
+    return TrackedPost(
+        id=post_id,
+        subreddit="r/test",
+        title=title,
+        permalink=f"https://x/{post_id}",
+        created_utc=now - hours_old * 3600,
+    )
+
+
+def test_tracked_posts_are_refreshed_in_batches_and_fed_into_sections(tmp_path):
+    now = time.time()
+    posts = [_tracked(f"p{i}", f"post {i}", 24, now) for i in range(250)]
+    posts[0] = _tracked("old", "How do I fix DNS?", 60, now)
+    posts[1] = _tracked("answered", "Why?", 70, now)
+    posts[2] = _tracked("hot", "Showcase", 2, now)
+    live = {f"t3_p{i}": _submission(f"p{i}", 1, 2) for i in range(3, 250)}
+    live["t3_old"] = _submission("old", 1, 0)
+    live["t3_answered"] = _submission("answered", 3, 4)
+    live["t3_hot"] = _submission("hot", 300, 9)
+    live["t3_p7"] = _submission("p7", 1, 2, author=None)  # deleted since the last run
+    reddit = _InfoReddit(live)
+
+    refreshed = refresh_tracked_posts(reddit, posts)
+    assert reddit.info_calls == [100, 100, 50]
+    assert "p7" not in {post.id for post in refreshed}
+    assert len(refreshed) == 249
+
+    report = collect_weekly_report(
+        reddit, "r/test", top_posts_limit=3, unanswered_limit=3, tracked_posts=[p.to_record() for p in refreshed]
+    )
+    assert [u.title for u in report.aging_unanswered] == ["How do I fix DNS?"]
+    assert report.rising_posts[0].post_id == "hot"
+    # Tracked posts only feed the sections, not the window metrics.
+    assert report.metrics.total_posts == 0
+
+    store = TrackedPostStore(tmp_path / "tracked_posts.json")
+    store.posts = {post.id: post for post in posts}
+    store.replace_subreddit("r/test", report)
+    store.save()
+    reloaded = TrackedPostStore.load(tmp_path / "tracked_posts.json")
+    assert set(reloaded.posts) == {"old", "hot"}
+    assert reloaded.posts["old"].sections == ["unanswered", "aging"]
+    assert reloaded.prune(now=now + 200 * 3600) == 2
+
+
+def test_refresher_skips_tracked_posts_the_new_scan_returns():
+    now = time.time()
+    seen = _submission("seen", 5, 3)
+    seen.__dict__.update(
+        title="Seen again", created_utc=now - 3600, permalink="/r/test/seen", is_self=True, comments=[]
+    )
+    reddit = _InfoReddit({"t3_far": _submission("far", 2, 0)}, listing=[seen])
+    posts = [
+        _tracked("seen", "Seen again", 1, now),
+        _tracked("far", "Far back?", 60, now),
+        _tracked("gone", "x", 70, now),
+    ]
+    refresher = TrackedRefresher(reddit, posts)
+
+    report = collect_weekly_report(
+        reddit, "r/test", tracked_posts=refresher.records(), refresh_tracked=refresher, unanswered_limit=3
+    )
+
+    # One lookup, for the two posts /new did not return.
+    assert reddit.info_calls == [2]
+    assert [post.id for post in refresher.gone] == ["gone"]
+    assert [u.post_id for u in report.aging_unanswered] == ["far"]
+    assert report.metrics.total_posts == 1
@@ -0,0 +1,62 @@
+from community_health_bot.core.models import HistoryEntry
+from community_health_bot.services.trends import TrendEngine
+
+
+def _entry(day, total_posts, unanswered_rate, median_ttf=30.0, subreddit="r/test"):
+    return HistoryEntry(
+        date=f"2026-01-{day:02d}",
+        subreddit=subreddit,
+        total_posts=total_posts,
+        unanswered=int(total_posts * unanswered_rate),
+        unanswered_rate=unanswered_rate,
+        median_ttf_minutes=median_ttf,
+    )
+
+
+def test_spike_is_flagged_against_the_window_before_it(tmp_path):
+    path = tmp_path / "trend_state.json"
+    engine = TrendEngine.load(path)
+    history = [_entry(day, 100 + day % 3, 0.2 + (day % 2) * 0.01) for day in range(1, 9)]
+    engine.bootstrap(history)
+    engine.save()
+
+    reloaded = TrendEngine.load(path)
+    assert reloaded.rows == 8
+    # Already has state, so a second bootstrap does not replay the history.
+    reloaded.bootstrap(history)
+    assert reloaded.rows == 8
+
+    anomalies = reloaded.update(_entry(9, 101, 0.6))
+    assert [a.metric for a in anomalies] == ["unanswered_rate"]
+    assert anomalies[0].zscore > 2.5
+    assert 0.2 < anomalies[0].ewma < 0.6
+    assert reloaded.update(_entry(9, 101, 0.21, subreddit="r/other")) == []
+
+
+def test_no_anomalies_before_min_periods():
+    engine = TrendEngine()
+    flagged = [engine.update(_entry(day, posts, 0.2, median_ttf=None)) for day, posts in enumerate([10, 11, 10, 500], 1)]
+    assert flagged == [[], [], [], []]
+
+
+def test_spike_after_flat_series_is_flagged():
+    engine = TrendEngine()
+    for day in range(1, 6):
+        assert engine.update(_entry(day, 100, 0.2)) == []
+    # Within the floor (5% of the mean) is not a spike; a real jump is.
+    assert engine.update(_entry(6, 104, 0.2)) == []
+    assert [a.metric for a in engine.update(_entry(7, 300, 0.2))] == ["total_posts"]
+
+
+def test_bootstrap_rebuilds_when_history_has_unseen_rows(tmp_path):
+    path = tmp_path / "trend_state.json"
+    history = [_entry(day, 100, 0.2) for day in range(1, 5)]
+    engine = TrendEngine.load(path)
+    engine.bootstrap(history[:2])
+    engine.save()
+
+    # Rows appended without updating the state are picked up by the next bootstrap.
+    reloaded = TrendEngine.load(path)
+    reloaded.bootstrap(history)
+    assert reloaded.rows == 4
+    assert len(reloaded._state["r/test"]["total_posts"].values) == 4
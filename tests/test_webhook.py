@@ -0,0 +1,107 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+
+from community_health_bot.services.webhook import WebhookDispatcher, _target_id
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = dict(statuses)
+        self.calls = []
+
+    def post(self, url, data=None, timeout=None):
+        self.calls.append(url)
+        outcomes = self.statuses[url]
+        outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+        if outcome == "error":
+            raise requests.ConnectionError("boom")
+        return FakeResponse(outcome)
+
+
+def test_dispatcher_retries_then_delivers(tmp_path: Path):
+    session = FakeSession({"https://a": ["error", 503, 200], "https://b": [200]})
+    dispatcher = WebhookDispatcher(
+        ["https://a", "https://b"], outbox_path=tmp_path / "outbox.jsonl", backoff_base=0.001, session=session
+    ).start()
+
+    dispatcher.submit("Title", "body")
+    dispatcher.close(timeout=5)
+
+    assert dispatcher.delivered == 2
+    assert dispatcher.failed == 0
+    assert session.calls.count("https://a") == 3
+    assert not (tmp_path / "outbox.jsonl").exists()
+
+
+def test_dispatcher_persists_failures_and_replays(tmp_path: Path):
+    outbox = tmp_path / "outbox.jsonl"
+    failing = FakeSession({"https://a": [500]})
+    dispatcher = WebhookDispatcher(
+        ["https://a"], outbox_path=outbox, max_attempts=2, backoff_base=0.001, session=failing
+    ).start()
+    dispatcher.submit("Title", "body")
+    dispatcher.close(timeout=5)
+
+    entries = [json.loads(line) for line in outbox.read_text().splitlines()]
+    assert len(entries) == 1
+    assert "https://a" not in outbox.read_text()
+
+    healthy = FakeSession({"https://a": [200]})
+    replay = WebhookDispatcher(["https://a"], outbox_path=outbox, session=healthy).start()
+    replay.close(timeout=5)
+
+    assert replay.delivered == 1
+    assert not outbox.exists()
+
+
+def test_replayed_entries_stay_in_outbox_until_delivered(tmp_path: Path):
+    outbox = tmp_path / "outbox.jsonl"
+    lines = [{"target": "gone", "payload": {"text": "old"}}, {"target": _target_id("https://a"), "payload": {"text": "x"}}]
+    outbox.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    dispatcher = WebhookDispatcher(
+        ["https://a"], outbox_path=outbox, max_attempts=1, session=FakeSession({"https://a": [500]})
+    ).start()
+    assert len(outbox.read_text().splitlines()) == 2
+    dispatcher.close(timeout=5)
+    # The failed replay is not written a second time.
+    assert len(outbox.read_text().splitlines()) == 2
+
+    replay = WebhookDispatcher(["https://a"], outbox_path=outbox, session=FakeSession({"https://a": [200]})).start()
+    replay.close(timeout=5)
+    entries = [json.loads(line) for line in outbox.read_text().splitlines()]
+    assert [entry["target"] for entry in entries] == ["gone"]
+
+
+def test_outbox_limits_drop_old_and_exhausted_entries(tmp_path: Path, caplog):
+    outbox = tmp_path / "outbox.jsonl"
+    target = _target_id("https://a")
+    old = (datetime.now(timezone.utc) - timedelta(hours=72)).isoformat()
+    lines = [
+        {"key": "old", "target": target, "payload": {"text": "0"}, "failed_at": old},
+        {"key": "tired", "target": target, "payload": {"text": "1"}, "attempts": 5},
+    ] + [{"key": f"k{i}", "target": target, "payload": {"text": str(i)}} for i in range(2, 5)]
+    outbox.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    session = FakeSession({"https://a": [500]})
+    logger = logging.getLogger("test_webhook_outbox")
+
+    with caplog.at_level(logging.WARNING, logger="test_webhook_outbox"):
+        dispatcher = WebhookDispatcher(
+            ["https://a"], outbox_path=outbox, max_attempts=1, session=session, logger=logger, outbox_max_entries=2
+        ).start()
+        dispatcher.close(timeout=5)
+
+    assert "webhook_outbox_dropped" in caplog.text
+    # The first failed replay stops the others for this run.
+    assert session.calls == ["https://a"]
+    entries = [json.loads(line) for line in outbox.read_text().splitlines()]
+    assert [(entry["key"], entry.get("attempts", 1)) for entry in entries] == [("k3", 2), ("k4", 1)]